@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Body, BackgroundTasks, Header, Depends
-from typing import List, Dict, Optional
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Optional, Tuple
 from pydantic import BaseModel
 from config import settings
 from datetime import datetime, timedelta
@@ -16,8 +17,9 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 router = APIRouter()
 
-# 🚀 답글 게시 순차 처리를 위한 Lock
-_reply_lock = threading.Lock()
+
+# 🔑 중복 제출 확인 + 작업 생성을 한 번에 (같은 요청이 동시에 들어와도 작업은 하나)
+_submit_lock = threading.Lock()
 
 # Choose service based on configuration
 if settings.use_mock_naver:
@@ -28,6 +30,57 @@ else:
     print("✅ Using REAL Naver Service (Selenium - Python 3.13 Compatible!)")
 
 
+def _use_worker_processes() -> bool:
+    """True면 작업을 tasks 컬렉션에 pending으로 두고 worker.py 프로세스가 처리"""
+    from utils.db import is_db_available
+    return settings.task_execution_mode == "worker" and is_db_available()
+
+
+def _create_or_reuse_task(task_type: str, user_id: str, params: Dict, idempotency_key: str,
+                          active_only: bool = False) -> Tuple[str, Optional[Dict]]:
+    """
+    Create a task unless a duplicate submission is inside TASK_DEDUP_WINDOW_SECONDS
+    
+    Returns:
+        (task_id, existing task or None)
+    """
+    from utils.task_manager import task_manager
+    
+    with _submit_lock:
+        existing = task_manager.find_duplicate(
+            task_type, user_id, idempotency_key, settings.task_dedup_window_seconds, active_only=active_only
+        )
+        if existing is not None:
+            return existing['_id'], existing
+        return task_manager.create_task(task_type, user_id, params, idempotency_key=idempotency_key), None
+
+
+def _enqueue_task(task_id: str, task_type: str, user_id: str, params: Dict, on_done=None) -> int:
+    """
+    Hand a created task to the background worker pool
+    
+    - worker 모드: pending 상태로 두면 worker.py가 가져감 (대기 순번만 반환)
+    - inprocess 모드: 웹 프로세스의 job_queue에 등록
+    
+    대기열이 가득 차면 task를 실패 처리하고 429 반환
+    답글 게시는 계정별로 순차 처리 (JOB_QUEUE_SERIAL_TYPES), 다른 계정끼리는 병렬
+    """
+    from utils.task_manager import task_manager
+    from utils.job_queue import job_queue, QueueFull
+    import services.naver_tasks  # noqa: F401 - 작업 핸들러 등록
+    
+    if _use_worker_processes():
+        return task_manager.get_queue_position(task_id)
+    
+    try:
+        return job_queue.submit(task_id, task_type, user_id, params, on_done=on_done)
+    except QueueFull as e:
+        task_manager.set_error(task_id, str(e))
+        if on_done:
+            on_done()
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "10"})
+
+
 class NaverLoginRequest(BaseModel):
     username: str
     password: str
@@ -40,6 +93,13 @@ class NaverReplyRequest(BaseModel):
     reply_text: str
 
 
+class NaverBatchReplyItem(BaseModel):
+    author: str
+    date: str
+    content: str = ""
+    reply_text: str
+
+
 class NaverSessionUpload(BaseModel):
     cookies: List[Dict]
     user_id: Optional[str] = "default"
@@ -70,11 +130,11 @@ async def naver_login_status(
     🔐 보안: 현재 구글 계정의 세션만 확인
     """
     try:
-        from utils.db import get_db
+        from utils.db import get_db, is_db_available, is_mongodb_available
         import traceback
         
-        # Check if any session exists in MongoDB
-        if settings.use_mongodb and settings.mongodb_url:
+        # Check if any session exists in MongoDB (or SQLite)
+        if is_db_available():
             print(f"🔍 [API /api/naver/status] Checking for: {google_email}")
             db = get_db()
             if db is not None:
@@ -107,7 +167,8 @@ async def naver_login_status(
                         'active_user': active_user,
                         'google_email': google_email  # 디버깅용
                     }
-                else:
+                elif is_mongodb_available():
+                    # SQLite(로컬)에 업로드된 세션이 없으면 아래 파일 세션 확인으로 진행
                     print(f"❌ [API /api/naver/status] No sessions for: {google_email}")
                     return {
                         'logged_in': False,
@@ -117,7 +178,7 @@ async def naver_login_status(
             else:
                 print("❌ [API /api/naver/status] MongoDB connection failed")
         else:
-            print(f"⚠️ [API /api/naver/status] MongoDB not enabled (use_mongodb: {settings.use_mongodb})")
+            print(f"⚠️ [API /api/naver/status] Database not enabled (use_mongodb: {settings.use_mongodb}, use_sqlite: {settings.use_sqlite})")
         
         # Fallback to original check_login_status
         print("🔄 [API /api/naver/status] Fallback to check_login_status")
@@ -135,6 +196,8 @@ async def naver_login_status(
 @router.get("/places")
 async def get_naver_places(
     user_id: str = "default",
+    refresh: bool = False,
+    debug: bool = False,
     google_email: Optional[str] = Header(None, alias="X-Google-Email")
 ):
     """
@@ -144,6 +207,8 @@ async def get_naver_places(
     
     Args:
         user_id: User ID for multi-account support (default: "default")
+        refresh: True면 저장된 목록을 무시하고 다시 조회
+        debug: True면 스크린샷/HTML을 debug_artifacts 디렉토리에 저장
         google_email: 현재 로그인한 구글 이메일 (헤더)
     """
     # 🔐 권한 검증
@@ -153,7 +218,7 @@ async def get_naver_places(
     # Set active user before calling service
     naver_service.set_active_user(user_id)
     
-    places = await naver_service.get_places()
+    places = await naver_service.get_places(user_id=user_id, force_refresh=refresh, debug=debug)
     print(f"🏪 [API /api/naver/places] User: {user_id}, Response: {places}")
     print(f"🏪 [API /api/naver/places] Type: {type(places)}")
     print(f"🏪 [API /api/naver/places] Length: {len(places) if isinstance(places, list) else 'N/A'}")
@@ -165,7 +230,9 @@ async def load_reviews_async(
     place_id: str = Body(...),
     load_count: int = Body(50),
     user_id: str = Body("default"),
-    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+    debug: bool = Body(False),
+    google_email: Optional[str] = Header(None, alias="X-Google-Email"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     비동기로 리뷰 로드 (30초 타임아웃 우회)
@@ -173,119 +240,73 @@ async def load_reviews_async(
     🔐 보안: google_email과 user_id의 연결 확인
     
     즉시 task_id를 반환하고 백그라운드에서 리뷰 로드
-    프론트엔드는 /tasks/{task_id}로 진행 상황 폴링
+    프론트엔드는 /tasks/{task_id}/events(SSE)로 진행 상황 수신 (실패 시 /tasks/{task_id} 폴링)
+    
+    🔗 같은 계정/매장/개수의 로드가 이미 진행 중이면 그 task_id를 반환 (결과/진행률 공유)
+    🔑 Idempotency-Key 헤더가 있으면 TASK_DEDUP_WINDOW_SECONDS 안의 같은 키 요청은 완료된 작업도 그대로 반환
     """
     # 🔐 권한 검증
     from utils.auth_middleware import verify_naver_session_access
     await verify_naver_session_access(user_id, google_email)
     
-    from utils.task_manager import task_manager
+    from utils.task_manager import make_idempotency_key
+    from utils.single_flight import record_coalescing
     
-    # Create task
-    task_id = task_manager.create_task(
-        task_type='review_load',
-        user_id=user_id,
-        params={
-            'place_id': place_id,
-            'load_count': load_count,
-            'page': 1,
-            'page_size': 20
-        }
-    )
+    params = {
+        'place_id': place_id,
+        'load_count': load_count,
+        'page': 1,
+        'page_size': 20,
+        'debug': debug
+    }
     
-    # Start background thread
-    def background_load():
-        import time as time_module
-        
-        try:
-            # Update status to processing
-            task_manager.update_task_status(task_id, 'processing')
-            task_manager.update_progress(task_id, 0, '리뷰 로딩 시작...', total=load_count)
-            
-            # 🚀 직접 selenium 함수 호출 (wrapper 우회, Lock 문제 해결)
-            from services.naver_automation_selenium import naver_automation_selenium
-            
-            # Set active user
-            naver_automation_selenium.set_active_user(user_id)
-            
-            # 🚀 진행률 업데이트 스레드 시작
-            import threading
-            stop_progress = threading.Event()
-            
-            def update_progress_periodically():
-                while not stop_progress.is_set():
-                    try:
-                        # selenium에서 진행률 읽기
-                        progress = naver_automation_selenium.get_loading_progress(place_id)
-                        if progress:
-                            # 🔧 FIX: count가 0이어도 메시지만 있어도 업데이트 (파싱 중일 수 있음)
-                            current_count = progress.get('count', 0)
-                            message = progress.get('message', '로딩 중...')
-                            
-                            # 진행률 업데이트 (total은 load_count로 설정)
-                            task_manager.update_progress(
-                                task_id,
-                                current_count,
-                                message
-                            )
-                    except Exception as e:
-                        print(f"⚠️ Progress update error: {e}")
-                        pass
-                    time_module.sleep(1)  # 1초마다 업데이트
-            
-            progress_thread = threading.Thread(target=update_progress_periodically, daemon=True)
-            progress_thread.start()
-            
-            # Load reviews (sync 함수 직접 호출)
-            result = naver_automation_selenium.get_reviews(
-                place_id,
-                page=1,
-                page_size=20,
-                filter_type='all',
-                load_count=load_count
-            )
-            
-            # 진행률 업데이트 중지
-            stop_progress.set()
-            progress_thread.join(timeout=1)
-            
-            # Store result
-            task_manager.set_result(task_id, result)
-            task_manager.update_task_status(task_id, 'completed')
-            
-            # 🔧 FIX: result는 딕셔너리 {'reviews': [...], 'total': ...} 형태
-            # 실제 리뷰 개수는 result['reviews']의 길이
-            actual_count = 0
-            if isinstance(result, dict) and 'reviews' in result:
-                actual_count = len(result['reviews'])
-            elif isinstance(result, list):
-                actual_count = len(result)
-            
-            task_manager.update_progress(task_id, actual_count, f'✅ {actual_count}개 리뷰 로드 완료!')
-            
-        except Exception as e:
-            print(f"❌ Background task {task_id} failed: {e}")
-            import traceback
-            traceback.print_exc()
-            task_manager.set_error(task_id, str(e))
+    # 헤더가 없으면 진행 중인 같은 로드에만 합류 (완료 후 다시 요청하면 새로 로드)
+    if idempotency_key:
+        key, active_only = idempotency_key, False
+    else:
+        key = make_idempotency_key('review_load', user_id, {'place_id': place_id, 'load_count': load_count})
+        active_only = True
+    task_id, existing = _create_or_reuse_task('review_load', user_id, params, key, active_only=active_only)
+    
+    record_coalescing('review_load_task', coalesced=existing is not None)
+    if existing is not None:
+        print(f"🔗 Attaching to existing review load {task_id} ({place_id}, {load_count}, {existing['status']})")
+        return {
+            'task_id': task_id,
+            'message': '이미 진행 중인 리뷰 로딩에 합류했습니다.',
+            'status_url': f'/api/naver/tasks/{task_id}',
+            'status': existing['status'],
+            'coalesced': True
+        }
     
-    # Start thread
-    thread = threading.Thread(target=background_load, daemon=True)
-    thread.start()
+    # 📥 워커 풀 대기열에 등록
+    position = _enqueue_task(task_id, 'review_load', user_id, params)
     
     return {
         'task_id': task_id,
         'message': '리뷰 로딩을 시작했습니다. 진행 상황을 확인하세요.',
-        'status_url': f'/api/naver/tasks/{task_id}'
+        'status_url': f'/api/naver/tasks/{task_id}',
+        'queue_position': position
     }
 
 
+def _queue_position(task: Dict) -> Optional[int]:
+    """Queue position of a pending task (None once it started)"""
+    if task['status'] != 'pending':
+        return None
+    if _use_worker_processes():
+        from utils.task_manager import task_manager
+        return task_manager.get_queue_position(task['_id'])
+    from utils.job_queue import job_queue
+    return job_queue.position(task['_id'])
+
+
 @router.get("/tasks/{task_id}")
 async def get_task_status(task_id: str):
     """
     작업 진행 상황 조회
     
-    프론트엔드가 이 API를 2-3초마다 호출하여 진행 상황 확인
+    진행 중에는 /tasks/{task_id}/events(SSE) 구독 권장, 이 API는 최종 결과 조회 및 폴링 fallback용
     """
     from utils.task_manager import task_manager
     
@@ -297,8 +318,10 @@ async def get_task_status(task_id: str):
     return {
         'task_id': task['_id'],
         'status': task['status'],
+        'queue_position': _queue_position(task),
         'progress': task['progress'],
         'result': task.get('result'),
+        'result_ref': task.get('result_ref'),
         'error': task.get('error'),
         'created_at': task['created_at'].isoformat() if task.get('created_at') else None,
         'started_at': task.get('started_at').isoformat() if task.get('started_at') else None,
@@ -306,6 +329,339 @@ async def get_task_status(task_id: str):
     }
 
 
+@router.get("/tasks/{task_id}/result")
+async def get_task_result(
+    task_id: str,
+    offset: int = 0,
+    limit: int = 100,
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
+    """
+    작업 결과 목록 페이지 조회 (취소된 작업은 멈춘 시점까지의 부분 결과)
+    
+    🔐 보안: 작업을 만든 네이버 계정(task.user_id)과 google_email의 연결 확인
+    
+    리뷰 목록은 task 문서에 넣지 않고 task_results에 청크로 저장됨
+    GET /tasks/{task_id}의 result에는 요약, result_ref.count에 전체 개수
+    
+    Query params:
+        offset: 시작 위치 (기본 0)
+        limit: 페이지 크기 (기본 100, 최대 500)
+    """
+    from utils.task_manager import task_manager
+    from utils.auth_middleware import verify_naver_session_access
+    
+    task = task_manager.get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    await verify_naver_session_access(task['user_id'], google_email)
+    if task['status'] not in ('completed', 'cancelled'):
+        raise HTTPException(status_code=409, detail=f"작업이 아직 완료되지 않았습니다 (status: {task['status']})")
+    
+    offset = max(0, offset)
+    limit = max(1, min(limit, 500))
+    items, total = task_manager.get_result_page(task, offset, limit)
+    
+    return {
+        'task_id': task_id,
+        'offset': offset,
+        'limit': limit,
+        'total': total,
+        'items': items,
+        'has_more': offset + len(items) < total,
+        'summary': task.get('result')
+    }
+
+
+@router.delete("/tasks/{task_id}")
+async def cancel_task(
+    task_id: str,
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
+    """
+    작업 취소
+    
+    🔐 보안: 작업을 만든 네이버 계정(task.user_id)과 google_email의 연결 확인
+    
+    - 대기 중: 대기열에서 바로 제거 → cancelled
+    - 실행 중: 취소 요청만 기록 → 스크래퍼가 스크롤/파싱 루프에서 확인하고 멈춘 뒤
+      지금까지 로드한 리뷰를 결과로 남기고 cancelled (브라우저는 바로 반환)
+    - 이미 끝난 작업: 409
+    """
+    from utils.task_manager import task_manager, TERMINAL_STATUSES
+    from utils.job_queue import job_queue
+    from utils.auth_middleware import verify_naver_session_access
+    
+    task = task_manager.get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    await verify_naver_session_access(task['user_id'], google_email)
+    if task['status'] in TERMINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"이미 종료된 작업입니다 (status: {task['status']})")
+    
+    if task['status'] == 'pending':
+        if _use_worker_processes():
+            removed = task_manager.cancel_pending(task_id)
+        else:
+            removed = job_queue.cancel(task_id)
+            if removed:
+                task_manager.update_task_status(task_id, 'cancelled', cancel_requested=True)
+        if removed:
+            print(f"🛑 Cancelled queued task {task_id}")
+            return {'task_id': task_id, 'status': 'cancelled', 'message': '대기 중인 작업을 취소했습니다.'}
+    
+    # 실행 중 (또는 방금 시작됨) → 협조적 취소
+    task_manager.request_cancel(task_id)
+    return {
+        'task_id': task_id,
+        'status': 'cancelling',
+        'message': '작업을 중단하는 중입니다. 지금까지 불러온 결과는 유지됩니다.',
+        'status_url': f'/api/naver/tasks/{task_id}'
+    }
+
+
+@router.get("/tasks/{task_id}/events")
+async def stream_task_events(task_id: str, google_email: Optional[str] = None):
+    """
+    작업 진행 상황 실시간 스트림 (Server-Sent Events)
+    
+    🔐 보안: 작업을 만든 네이버 계정(task.user_id)과 google_email의 연결 확인
+    (EventSource는 헤더를 보낼 수 없으므로 X-Google-Email 대신 query param)
+    
+    - snapshot: 연결 직후 현재 상태 1회
+    - progress: 스크래퍼에서 진행률이 바뀔 때마다
+    - status: 상태 전환 (processing/cancelling/completed/failed/cancelled) - 종료 상태 후 스트림 종료
+    
+    결과는 completed 이후 GET /tasks/{task_id} (요약) + GET /tasks/{task_id}/result (목록)로 조회
+    다른 프로세스(worker.py)에서 실행 중인 작업은 MongoDB를 주기적으로 확인
+    """
+    from utils.task_manager import task_manager, TERMINAL_STATUSES
+    from utils.task_events import task_events
+    from utils.auth_middleware import verify_naver_session_access
+    
+    # 구독 먼저 → 스냅샷 조회 (그 사이 이벤트 유실 방지)
+    events = task_events.subscribe(task_id)
+    task = task_manager.get_task(task_id)
+    if not task:
+        task_events.unsubscribe(task_id, events)
+        raise HTTPException(status_code=404, detail="Task not found")
+    try:
+        await verify_naver_session_access(task['user_id'], google_email)
+    except HTTPException:
+        task_events.unsubscribe(task_id, events)
+        raise
+    
+    def sse(event: str, data: Dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+    
+    # 로컬 이벤트가 없는 worker 모드는 짧은 간격으로 MongoDB 확인
+    check_interval = 2 if _use_worker_processes() else 15
+    
+    async def event_stream():
+        try:
+            yield sse('snapshot', {
+                'status': task['status'],
+                'queue_position': _queue_position(task),
+                'progress': task.get('progress'),
+                'error': task.get('error')
+            })
+            if task['status'] in TERMINAL_STATUSES:
+                return
+            
+            last_progress = task.get('progress')
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(events.get(), timeout=check_interval)
+                except asyncio.TimeoutError:
+                    # keep-alive + 다른 프로세스에서 갱신된 상태 확인
+                    current = task_manager.get_task(task_id)
+                    if not current:
+                        return
+                    if current['status'] in TERMINAL_STATUSES:
+                        yield sse('status', {'status': current['status'], 'error': current.get('error')})
+                        return
+                    if current.get('progress') != last_progress:
+                        last_progress = current.get('progress')
+                        yield sse('progress', {**(last_progress or {}), 'queue_position': _queue_position(current)})
+                    else:
+                        yield ": keep-alive\n\n"
+                    continue
+                
+                yield sse(event, data)
+                if event == 'progress':
+                    last_progress = data
+                if event == 'status' and data.get('status') in TERMINAL_STATUSES:
+                    return
+        finally:
+            task_events.unsubscribe(task_id, events)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/reviews/outbox")
+async def list_reply_outbox(
+    user_id: str = "default",
+    status: Optional[str] = None,
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
+    """
+    자동 재시도 대기 중인 답글 목록 (리뷰 못 찾음 / 세션 만료 / Chrome 크래시로 실패한 답글)
+    
+    🔐 보안: google_email과 user_id의 연결 확인
+    
+    Args:
+        user_id: Naver account
+        status: pending / sending / sent / dead (없으면 전체)
+    """
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    from utils.reply_outbox import reply_outbox
+    entries = reply_outbox.list(user_id, status)
+    return {
+        'user_id': user_id,
+        'count': len(entries),
+        'entries': [{'id': entry.pop('_id'), **entry} for entry in entries]
+    }
+
+
+@router.get("/reviews/drafts")
+async def list_reply_drafts(
+    user_id: str = "default",
+    place_id: Optional[str] = None,
+    status: Optional[str] = None,
+    batch_id: Optional[str] = None,
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
+    """
+    배치로 만든 답글 초안 목록 (/reviews/draft-batch)
+    
+    🔐 보안: google_email과 user_id의 연결 확인
+    
+    Args:
+        status: pending / draft / failed (없으면 전체)
+        batch_id: 지정하면 해당 배치의 초안만
+    """
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    from utils.db import get_reply_drafts
+    drafts = get_reply_drafts(user_id, place_id, status=status, batch_id=batch_id, limit=settings.openai_batch_max_items)
+    return {
+        'user_id': user_id,
+        'count': len(drafts),
+        'drafts': [{'id': draft.pop('_id'), **draft} for draft in drafts]
+    }
+
+
+@router.get("/reviews/draft-batches")
+async def list_reply_draft_batches(
+    user_id: str = "default",
+    place_id: Optional[str] = None,
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
+    """
+    제출한 답글 초안 배치 목록 (최근 50개)
+    
+    🔐 보안: google_email과 user_id의 연결 확인
+    """
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    from utils.draft_batches import draft_batches
+    batches = draft_batches.list(user_id, place_id)
+    return {
+        'user_id': user_id,
+        'count': len(batches),
+        'batches': [{'batch_id': batch.pop('_id'), **batch} for batch in batches]
+    }
+
+
+@router.get("/reviews/draft-batches/{batch_id}")
+async def get_reply_draft_batch(
+    batch_id: str,
+    user_id: str = "default",
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
+    """
+    답글 초안 배치 상태 (polling / completed / failed, request_counts)
+    
+    🔐 보안: google_email과 user_id의 연결 확인
+    """
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    from utils.draft_batches import draft_batches
+    batch = draft_batches.get(batch_id, user_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail=f"Draft batch not found: {batch_id}")
+    return {'batch_id': batch.pop('_id'), **batch}
+
+
+@router.delete("/reviews/draft-batches/{batch_id}")
+async def cancel_reply_draft_batch(
+    batch_id: str,
+    user_id: str = "default",
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
+    """
+    진행 중인 답글 초안 배치 취소 (이미 생성된 초안은 배치가 끝나면 기록)
+    
+    🔐 보안: google_email과 user_id의 연결 확인
+    """
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    from utils.draft_batches import draft_batches
+    if not await asyncio.get_event_loop().run_in_executor(None, draft_batches.request_cancel, batch_id, user_id):
+        raise HTTPException(status_code=409, detail=f"Draft batch is not running: {batch_id}")
+    return {'success': True, 'batch_id': batch_id, 'status': 'cancelling'}
+
+
+@router.post("/reviews/outbox/{entry_id}/retry")
+async def retry_reply_outbox_entry(
+    entry_id: str,
+    user_id: str = "default",
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
+    """
+    대기 중(pending) 또는 포기된(dead) 답글을 바로 다시 시도
+    
+    🔐 보안: google_email과 user_id의 연결 확인
+    """
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    from utils.reply_outbox import reply_outbox
+    if not reply_outbox.retry_now(entry_id, user_id):
+        raise HTTPException(status_code=404, detail="Retryable outbox entry not found")
+    return {'success': True, 'id': entry_id}
+
+
+@router.delete("/reviews/outbox/{entry_id}")
+async def discard_reply_outbox_entry(
+    entry_id: str,
+    user_id: str = "default",
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
+    """
+    재시도 대기 답글 삭제 (게시 중인 답글은 삭제 불가)
+    
+    🔐 보안: google_email과 user_id의 연결 확인
+    """
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    from utils.reply_outbox import reply_outbox
+    if not reply_outbox.discard(entry_id, user_id):
+        raise HTTPException(status_code=404, detail="Outbox entry not found or being posted")
+    return {'success': True, 'id': entry_id}
+
+
 @router.get("/reviews/{place_id}")
 async def get_naver_reviews(
     place_id: str,
@@ -313,6 +669,7 @@ async def get_naver_reviews(
     page_size: int = 20,
     load_count: int = 300,
     user_id: str = "default",
+    debug: bool = False,
     google_email: Optional[str] = Header(None, alias="X-Google-Email")
 ):
     """
@@ -330,6 +687,7 @@ async def get_naver_reviews(
         page_size: Number of reviews per page (default 20)
         load_count: Total number of reviews to load (50/150/300/500/1000)
         user_id: User ID for multi-account support (default: "default")
+        debug: True면 스크린샷/HTML을 debug_artifacts 디렉토리에 저장
         google_email: 현재 로그인한 구글 이메일 (헤더)
     """
     # 🔐 권한 검증
@@ -339,7 +697,34 @@ async def get_naver_reviews(
     # Set active user before calling service
     naver_service.set_active_user(user_id)
     
-    return await naver_service.get_reviews(place_id, page=page, page_size=page_size, filter_type='all', load_count=load_count)
+    return await naver_service.get_reviews(place_id, page=page, page_size=page_size, filter_type='all', load_count=load_count, user_id=user_id, debug=debug)
+
+
+@router.delete("/reviews/cache")
+async def invalidate_reviews_cache(
+    user_id: str = "default",
+    place_id: Optional[str] = None,
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
+    """
+    Invalidate cached reviews for one Naver account
+    
+    🔐 보안: google_email과 user_id의 연결 확인
+    
+    Args:
+        user_id: Naver account whose cache is dropped
+        place_id: 지정하면 해당 매장 캐시만 삭제 (없으면 계정 전체)
+    """
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    removed = naver_service.invalidate_reviews_cache(user_id, place_id)
+    return {
+        'success': True,
+        'user_id': user_id,
+        'place_id': place_id,
+        'removed_entries': removed
+    }
 
 
 @router.post("/reviews/reply-async")
@@ -351,7 +736,9 @@ async def post_reply_async(
     reply_text: str = Body(...),
     user_id: str = Body("default"),
     expected_review_count: int = Body(50),  # 목표 렌더링 개수
-    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+    debug: bool = Body(False),
+    google_email: Optional[str] = Header(None, alias="X-Google-Email"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     비동기로 답글 게시 (30초 타임아웃 우회)
@@ -359,73 +746,272 @@ async def post_reply_async(
     🔐 보안: google_email과 user_id의 연결 확인
     
     작성자 + 날짜 + 내용 3중 매칭 - 가장 확실한 방법
+    
+    🔑 중복 게시 방지: TASK_DEDUP_WINDOW_SECONDS 안에 같은 답글(또는 같은 Idempotency-Key)이
+    다시 들어오면 새 작업 없이 기존 task_id 반환 (실패한 작업은 제외 → 재시도 가능)
     """
     # 🔐 권한 검증
     from utils.auth_middleware import verify_naver_session_access
     await verify_naver_session_access(user_id, google_email)
     
-    from utils.task_manager import task_manager
+    from utils.task_manager import make_idempotency_key
+    from utils.metrics import metrics
     
-    # Create task
-    task_id = task_manager.create_task(
-        task_type='reply_post',
-        user_id=user_id,
-        params={
-            'place_id': place_id,
-            'author': author,
-            'date': date,
-            'content': content[:100] if content else "",
-            'reply_text': reply_text,
-            'expected_count': expected_review_count  # 목표 개수
-        }
-    )
+    params = {
+        'place_id': place_id,
+        'author': author,
+        'date': date,
+        'content': content[:100] if content else "",  # 매칭에는 앞 50자만 사용
+        'reply_text': reply_text,
+        'expected_count': expected_review_count,  # 목표 개수
+        'debug': debug
+    }
     
-    # Start background thread
-    def background_reply():
-        # 🚀 CRITICAL: Lock으로 순차 처리 (동시 실행 방지)
-        with _reply_lock:
-            print(f"🔒 Acquired lock for task {task_id}")
-            
-            try:
-                task_manager.update_task_status(task_id, 'processing')
-                task_manager.update_progress(task_id, 0, '대기열에서 처리 중...')
-                
-                # 🚀 직접 selenium 함수 호출
-                from services.naver_automation_selenium import naver_automation_selenium
-                
-                task_manager.update_progress(task_id, 0, '답글 게시 중...')
-                
-                # 🚀 작성자 + 날짜 + 내용 3중 매칭
-                result = naver_automation_selenium.post_reply_by_composite(
-                    place_id=place_id,
-                    author=author,
-                    date=date,
-                    content=content,
-                    reply_text=reply_text,
-                    user_id=user_id,
-                    expected_count=expected_review_count  # 목표 개수 전달
-                )
-                
-                task_manager.set_result(task_id, result)
-                task_manager.update_task_status(task_id, 'completed')
-                task_manager.update_progress(task_id, 1, '✅ 답글 게시 완료!')
-                
-            except Exception as e:
-                print(f"❌ Background reply task {task_id} failed: {e}")
-                import traceback
-                traceback.print_exc()
-                task_manager.set_error(task_id, str(e))
-            
-            finally:
-                print(f"🔓 Released lock for task {task_id}")
+    key = idempotency_key or make_idempotency_key('reply_post', user_id, {
+        'place_id': place_id,
+        'author': author,
+        'date': date,
+        'content': params['content'],
+        'reply_text': reply_text
+    })
+    task_id, existing = _create_or_reuse_task('reply_post', user_id, params, key)
     
-    thread = threading.Thread(target=background_reply, daemon=True)
-    thread.start()
+    if existing is not None:
+        metrics.incr('tasks.reply_post.deduplicated')
+        print(f"🔑 Duplicate reply submission → existing task {task_id} ({existing['status']})")
+        return {
+            'task_id': task_id,
+            'message': '이미 요청된 답글입니다. 기존 작업을 확인하세요.',
+            'status_url': f'/api/naver/tasks/{task_id}',
+            'status': existing['status'],
+            'deduplicated': True
+        }
+    
+    position = _enqueue_task(task_id, 'reply_post', user_id, params)
     
     return {
         'task_id': task_id,
         'message': '답글을 게시하고 있습니다.',
-        'status_url': f'/api/naver/tasks/{task_id}'
+        'status_url': f'/api/naver/tasks/{task_id}',
+        'queue_position': position
+    }
+
+
+@router.post("/reviews/reply-batch")
+async def post_reply_batch(
+    place_id: str = Body(...),
+    items: List[NaverBatchReplyItem] = Body(...),
+    user_id: str = Body("default"),
+    expected_review_count: int = Body(50),  # 목표 렌더링 개수
+    debug: bool = Body(False),
+    google_email: Optional[str] = Header(None, alias="X-Google-Email"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    여러 답글을 하나의 작업으로 일괄 게시
+    
+    미답글 목록을 한 번만 열고 같은 페이지에서 순서대로 게시 (답글마다 페이지 로드 X)
+    항목별 결과(posted / failed / cancelled)는 작업 결과의 results로 확인
+    
+    🔑 중복 게시 방지: /reviews/reply-async와 같은 방식 (같은 목록 또는 같은 Idempotency-Key)
+    """
+    # 🔐 권한 검증
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    from utils.task_manager import make_idempotency_key
+    from utils.metrics import metrics
+    
+    if not items:
+        raise HTTPException(status_code=400, detail="items가 비어 있습니다")
+    if len(items) > settings.reply_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.reply_batch_max_items}개까지 게시할 수 있습니다 (요청: {len(items)}개)"
+        )
+    
+    params = {
+        'place_id': place_id,
+        'items': [
+            {
+                'author': item.author,
+                'date': item.date,
+                'content': item.content[:100] if item.content else "",  # 매칭에는 앞 50자만 사용
+                'reply_text': item.reply_text
+            }
+            for item in items
+        ],
+        'expected_count': expected_review_count,
+        'debug': debug
+    }
+    
+    key = idempotency_key or make_idempotency_key('reply_batch', user_id, {
+        'place_id': place_id,
+        'items': params['items']
+    })
+    task_id, existing = _create_or_reuse_task('reply_batch', user_id, params, key)
+    
+    if existing is not None:
+        metrics.incr('tasks.reply_batch.deduplicated')
+        print(f"🔑 Duplicate reply batch submission → existing task {task_id} ({existing['status']})")
+        return {
+            'task_id': task_id,
+            'message': '이미 요청된 답글 목록입니다. 기존 작업을 확인하세요.',
+            'status_url': f'/api/naver/tasks/{task_id}',
+            'status': existing['status'],
+            'deduplicated': True
+        }
+    
+    position = _enqueue_task(task_id, 'reply_batch', user_id, params)
+    
+    return {
+        'task_id': task_id,
+        'message': f'답글 {len(items)}개를 게시하고 있습니다.',
+        'status_url': f'/api/naver/tasks/{task_id}',
+        'queue_position': position,
+        'total': len(items)
+    }
+
+
+@router.post("/reviews/auto-reply")
+async def start_auto_reply(
+    place_id: str = Body(...),
+    user_id: str = Body("default"),
+    store_name: Optional[str] = Body(None),
+    max_reviews: int = Body(20),
+    require_approval: bool = Body(False),  # True면 생성만 하고 게시 전 확인 (drafts → /reviews/reply-batch)
+    debug: bool = Body(False),
+    google_email: Optional[str] = Header(None, alias="X-Google-Email"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    미답글 리뷰 자동 답글 (생성 → 게시를 하나의 작업으로)
+    
+    마지막으로 불러온 리뷰 목록의 미답글 리뷰를 대상으로, 매장 AI 설정(place_ai_settings)으로
+    답글을 동시에 생성하면서 같은 브라우저 세션에서 순서대로 게시
+    """
+    # 🔐 권한 검증
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    from utils.task_manager import make_idempotency_key
+    from utils.db import get_place_ai_settings
+    from utils.metrics import metrics
+    
+    if not 1 <= max_reviews <= settings.reply_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_reviews는 1~{settings.reply_batch_max_items} 사이여야 합니다 (요청: {max_reviews})"
+        )
+    
+    # 🎨 매장 AI 설정 (없으면 기본값으로 생성)
+    settings_doc = get_place_ai_settings(place_id, google_email) if google_email else None
+    
+    params = {
+        'place_id': place_id,
+        'store_name': store_name,
+        'place_settings': settings_doc.get('settings') if settings_doc else None,
+        'max_reviews': max_reviews,
+        'require_approval': require_approval,
+        'debug': debug
+    }
+    
+    # 🔑 같은 매장의 자동 답글이 대기/실행 중이면 그 작업 반환
+    key = idempotency_key or make_idempotency_key('auto_reply', user_id, {
+        'place_id': place_id,
+        'max_reviews': max_reviews,
+        'require_approval': require_approval
+    })
+    task_id, existing = _create_or_reuse_task('auto_reply', user_id, params, key, active_only=True)
+    
+    if existing is not None:
+        metrics.incr('tasks.auto_reply.coalesced')
+        print(f"🔑 Auto reply already running for {place_id} → existing task {task_id} ({existing['status']})")
+        return {
+            'task_id': task_id,
+            'message': '이미 진행 중인 자동 답글 작업이 있습니다.',
+            'status_url': f'/api/naver/tasks/{task_id}',
+            'status': existing['status'],
+            'coalesced': True
+        }
+    
+    position = _enqueue_task(task_id, 'auto_reply', user_id, params)
+    
+    return {
+        'task_id': task_id,
+        'message': '답글을 생성하고 있습니다.' if require_approval else '답글을 생성하고 게시하고 있습니다.',
+        'status_url': f'/api/naver/tasks/{task_id}',
+        'queue_position': position
+    }
+
+
+@router.post("/reviews/draft-batch")
+async def start_reply_draft_batch(
+    place_id: str = Body(...),
+    user_id: str = Body("default"),
+    store_name: Optional[str] = Body(None),
+    max_reviews: int = Body(1000),
+    google_email: Optional[str] = Header(None, alias="X-Google-Email"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    미답글 리뷰가 많을 때 OpenAI Batch API로 답글 초안 생성 (실시간 생성보다 저렴, 최대 24시간)
+    
+    작업은 배치 제출까지만 (task result의 batch_id) → 진행 상황은 GET /reviews/draft-batches/{batch_id}
+    결과는 reply_drafts에 저장 → GET /reviews/drafts로 확인 후 /reviews/reply-batch로 게시
+    """
+    # 🔐 권한 검증
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    from utils.task_manager import make_idempotency_key
+    from utils.db import get_place_ai_settings, is_db_available
+    from utils.metrics import metrics
+    
+    if not is_db_available():
+        raise HTTPException(status_code=400, detail="배치 초안은 DB가 필요합니다 (MongoDB 또는 USE_SQLITE=true)")
+    
+    if not 1 <= max_reviews <= settings.openai_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_reviews는 1~{settings.openai_batch_max_items} 사이여야 합니다 (요청: {max_reviews})"
+        )
+    
+    # 🎨 매장 AI 설정 (없으면 기본값으로 생성)
+    settings_doc = get_place_ai_settings(place_id, google_email) if google_email else None
+    
+    params = {
+        'place_id': place_id,
+        'store_name': store_name,
+        'place_settings': settings_doc.get('settings') if settings_doc else None,
+        'max_reviews': max_reviews
+    }
+    
+    # 🔑 같은 매장의 배치 초안 작업이 대기/실행 중이면 그 작업 반환
+    key = idempotency_key or make_idempotency_key('reply_drafts', user_id, {
+        'place_id': place_id,
+        'max_reviews': max_reviews
+    })
+    task_id, existing = _create_or_reuse_task('reply_drafts', user_id, params, key, active_only=True)
+    
+    if existing is not None:
+        metrics.incr('tasks.reply_drafts.coalesced')
+        print(f"🔑 Draft batch already running for {place_id} → existing task {task_id} ({existing['status']})")
+        return {
+            'task_id': task_id,
+            'message': '이미 진행 중인 배치 초안 작업이 있습니다.',
+            'status_url': f'/api/naver/tasks/{task_id}',
+            'status': existing['status'],
+            'coalesced': True
+        }
+    
+    position = _enqueue_task(task_id, 'reply_drafts', user_id, params)
+    
+    return {
+        'task_id': task_id,
+        'message': '답글 초안 배치를 제출하고 있습니다. 결과는 완료되면 초안 목록에 기록됩니다 (최대 24시간).',
+        'status_url': f'/api/naver/tasks/{task_id}',
+        'queue_position': position
     }
 
 
@@ -461,18 +1047,42 @@ async def post_naver_reply(
     )
 
 
+@router.get("/rate-limits")
+async def get_post_rate_limits():
+    """
+    계정별 답글 게시 속도 제한 (토큰 버킷) 설정과 남은 토큰
+    
+    worker 모드에서는 게시가 worker.py에서 실행되므로 이 프로세스의 버킷은 비어 있음
+    """
+    from services.naver_automation_selenium import naver_automation_selenium
+    return {
+        'execution_mode': 'worker' if _use_worker_processes() else 'inprocess',
+        **naver_automation_selenium.get_post_rate_limits()
+    }
+
+
 @router.get("/reviews/progress/{place_id}")
-async def get_reviews_progress(place_id: str):
+async def get_reviews_progress(
+    place_id: str,
+    user_id: str = "default",
+    google_email: Optional[str] = Header(None, alias="X-Google-Email")
+):
     """
     Get real-time loading progress for reviews
     
+    🔐 보안: google_email과 user_id의 연결 확인
+    
     Args:
         place_id: Naver place ID
+        user_id: 진행률은 계정별로 분리 (같은 매장을 다른 계정이 로드해도 섞이지 않음)
     
     Returns:
         Progress status with count and message
     """
-    progress = await naver_service.get_loading_progress(place_id)
+    from utils.auth_middleware import verify_naver_session_access
+    await verify_naver_session_access(user_id, google_email)
+    
+    progress = await naver_service.get_loading_progress(place_id, user_id)
     # Debug log to see what we're returning
     if progress.get('count', 0) > 0:
         print(f"📤 Sending progress: {progress}")
@@ -499,17 +1109,17 @@ async def upload_session(
     ?google_email=user@gmail.com
     """
     try:
-        from utils.db import get_db
+        from utils.db import get_db, is_db_available
         
         # 🔧 FIX: Heroku Cold Start 대비 - MongoDB 연결 재시도
         max_db_retries = 3
         db = None
         for retry in range(max_db_retries):
             try:
-                if not settings.use_mongodb or not settings.mongodb_url:
+                if not is_db_available():
                     raise HTTPException(
                         status_code=500, 
-                        detail="MongoDB not configured. Session upload requires MongoDB."
+                        detail="Database not configured. Session upload requires MongoDB or SQLite."
                     )
                 
                 db = get_db()
@@ -691,9 +1301,9 @@ async def list_sessions(
     헤더에도 없으면 빈 배열 반환 (보안)
     """
     try:
-        from utils.db import get_db
+        from utils.db import get_db, is_db_available
         
-        if not settings.use_mongodb or not settings.mongodb_url:
+        if not is_db_available():
             return {"sessions": []}
         
         db = get_db()
@@ -762,12 +1372,12 @@ async def get_session_status(user_id: str = "default"):
     Get current session status from MongoDB
     """
     try:
-        from utils.db import get_db
+        from utils.db import get_db, is_db_available
         
-        if not settings.use_mongodb or not settings.mongodb_url:
+        if not is_db_available():
             return {
                 "exists": False,
-                "message": "MongoDB not configured"
+                "message": "Database not configured"
             }
         
         db = get_db()
@@ -836,10 +1446,10 @@ async def switch_session(
         from utils.auth_middleware import verify_naver_session_access
         await verify_naver_session_access(user_id, google_email)
         
-        from utils.db import get_db
+        from utils.db import get_db, is_db_available
         
-        if not settings.use_mongodb or not settings.mongodb_url:
-            raise HTTPException(status_code=500, detail="MongoDB not configured")
+        if not is_db_available():
+            raise HTTPException(status_code=500, detail="Database not configured")
         
         db = get_db()
         if db is None:
@@ -885,10 +1495,10 @@ async def delete_session(
         from utils.auth_middleware import verify_naver_session_access
         await verify_naver_session_access(user_id, google_email)
         
-        from utils.db import get_db
+        from utils.db import get_db, is_db_available
         
-        if not settings.use_mongodb or not settings.mongodb_url:
-            raise HTTPException(status_code=500, detail="MongoDB not configured")
+        if not is_db_available():
+            raise HTTPException(status_code=500, detail="Database not configured")
         
         db = get_db()
         if db is None:
@@ -904,6 +1514,13 @@ async def delete_session(
         
         google_emails = session.get("google_emails", [])
         
+        # 세션이 바뀌므로 저장된 매장 목록 / 리뷰 목록 삭제 (다음 조회 시 새로 가져옴)
+        if not settings.use_mock_naver:
+            from services.naver_automation_selenium import naver_automation_selenium
+            from utils.db import delete_naver_reviews
+            naver_automation_selenium.invalidate_places_cache(user_id)
+            delete_naver_reviews(user_id)
+        
         # 🔐 현재 사용자의 이메일만 제거
         if google_email in google_emails:
             google_emails.remove(google_email)
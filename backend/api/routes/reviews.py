@@ -1,10 +1,28 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from config import settings
 from services.llm_service import llm_service
-from models.schemas import GenerateReplyRequest, GenerateReplyResponse
+from models.schemas import GenerateReplyRequest, GenerateReplyResponse, GenerateRepliesRequest
+import json
+import time
 
 router = APIRouter()
 
 
+def _parse_place_settings(place_settings: dict):
+    """Convert a place_settings dict to PlaceAISettings (잘못된 값이면 기본 설정)"""
+    if not place_settings:
+        return None
+    try:
+        from models.schemas import PlaceAISettings
+        place_settings_obj = PlaceAISettings(**place_settings)
+        print(f"🎨 Using custom AI settings: friendliness={place_settings_obj.friendliness}, formality={place_settings_obj.formality}")
+        return place_settings_obj
+    except Exception as e:
+        print(f"⚠️ Failed to parse place_settings, using defaults: {e}")
+        return None
+
+
 @router.post("/generate-reply", response_model=GenerateReplyResponse)
 async def generate_review_reply(request: GenerateReplyRequest):
     """
@@ -17,16 +35,84 @@ async def generate_review_reply(request: GenerateReplyRequest):
         GenerateReplyResponse with generated reply text
     """
     # Convert place_settings dict to PlaceAISettings if provided
-    place_settings_obj = None
-    if request.place_settings:
-        try:
-            from models.schemas import PlaceAISettings
-            place_settings_obj = PlaceAISettings(**request.place_settings)
-            print(f"🎨 Using custom AI settings: friendliness={place_settings_obj.friendliness}, formality={place_settings_obj.formality}")
-        except Exception as e:
-            print(f"⚠️ Failed to parse place_settings, using defaults: {e}")
+    place_settings_obj = _parse_place_settings(request.place_settings)
+    
+    # 🚀 AsyncOpenAI - OpenAI 응답을 기다리는 동안 다른 요청(진행률 조회 등) 처리
+    return await llm_service.agenerate_reply(request, place_settings=place_settings_obj)
+
+
+@router.post("/generate-replies")
+async def generate_review_replies(request: GenerateRepliesRequest):
+    """
+    Generate replies for many reviews with one place-settings object
+    
+    리뷰마다 요청을 보내는 대신 한 번에 보내면 서버가 concurrency개씩 동시에 생성하고,
+    완료되는 순서대로 NDJSON 한 줄씩 스트리밍 (application/x-ndjson)
+    
+    - {"type": "result", "index", "review_id", "status", "generated_reply" | "error", "latency_ms", "usage"}
+    - 마지막 줄: {"type": "summary", "total", "completed", "failed", "elapsed_ms", "latency_ms", "usage"}
+    """
+    if not request.reviews:
+        raise HTTPException(status_code=400, detail="reviews must not be empty")
+    if len(request.reviews) > settings.generate_replies_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many reviews ({len(request.reviews)}), max {settings.generate_replies_max_items}"
+        )
+    
+    place_settings_obj = _parse_place_settings(request.place_settings)
+    requests = [
+        GenerateReplyRequest(
+            review_text=review.review_text,
+            rating=review.rating,
+            store_name=request.store_name,
+            custom_instructions=review.custom_instructions
+        )
+        for review in request.reviews
+    ]
+    concurrency = min(request.concurrency or settings.openai_max_concurrency, settings.openai_max_concurrency)
+    print(f"🚀 Generating {len(requests)} replies (concurrency {concurrency})")
+    
+    async def result_stream():
+        started = time.monotonic()
+        latencies = []
+        usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        completed = failed = 0
+        
+        async for result in llm_service.agenerate_replies(requests, place_settings=place_settings_obj, concurrency=concurrency):
+            result = {'type': 'result', 'review_id': request.reviews[result['index']].review_id, **result}
+            if result['status'] == 'completed':
+                completed += 1
+                latencies.append(result['latency_ms'])
+                for key, value in (result.get('usage') or {}).items():
+                    usage[key] += value
+            else:
+                failed += 1
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        
+        latencies.sort()
+        summary = {
+            'type': 'summary',
+            'total': len(requests),
+            'completed': completed,
+            'failed': failed,
+            'concurrency': concurrency,
+            'elapsed_ms': round((time.monotonic() - started) * 1000),
+            'latency_ms': {
+                'avg': round(sum(latencies) / len(latencies)) if latencies else None,
+                'p50': latencies[len(latencies) // 2] if latencies else None,
+                'max': latencies[-1] if latencies else None
+            },
+            'usage': usage
+        }
+        print(f"✅ Generated {completed}/{len(requests)} replies in {summary['elapsed_ms']}ms ({usage['total_tokens']} tokens)")
+        yield json.dumps(summary, ensure_ascii=False) + "\n"
     
-    return llm_service.generate_reply(request, place_settings=place_settings_obj)
+    return StreamingResponse(
+        result_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post("/reload-prompts")
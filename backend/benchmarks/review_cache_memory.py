@@ -0,0 +1,98 @@
+"""
+Review cache memory benchmark
+
+dict 기반 캐시와 compact 레코드(ReviewRecord) 캐시의 메모리 사용량 비교
+합성 리뷰 데이터(기본 100,000개)로 측정
+
+Usage:
+    cd backend
+    python benchmarks/review_cache_memory.py [count]
+"""
+
+import gc
+import hashlib
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.review_cache import ReviewCache  # noqa: E402
+
+
+PLACES = ["1234567", "2345678", "3456789", "4567890", "5678901"]
+AUTHORS = [f"고객{n:03d}" for n in range(800)] + ["맛집탐방러", "동네주민", "단골손님", "kim***", "lee***"]
+CONTENTS = [
+    "음식이 정말 맛있어요! 직원분들도 친절하시고 분위기도 좋아서 또 오고 싶어요.",
+    "가격 대비 양이 많고 맛있습니다. 주차가 조금 불편했어요.",
+    "웨이팅이 길었지만 기다린 보람이 있었습니다.",
+    "",
+    "재방문 의사 있어요",
+]
+
+
+def synthetic_reviews(count: int, seed: int = 42):
+    """Generate scraper-shaped review dicts with fresh string objects
+
+    실제 스크래핑처럼 매 리뷰마다 새 문자열 객체를 생성 (중복 문자열도 별도 객체)
+    """
+    rng = random.Random(seed)
+    reviews = []
+    for i in range(count):
+        place_id = "".join(rng.choice(PLACES))
+        author = "".join(rng.choice(AUTHORS))
+        date = f"{rng.choice([2024, 2025])}. {rng.randint(1, 12)}. {rng.randint(1, 28)}({rng.choice('월화수목금토일')})"
+        content = "".join(rng.choice(CONTENTS)) + (f" #{i}" if i % 3 else "")
+        has_reply = rng.random() < 0.6
+        reply = f"방문해주셔서 감사합니다! 다음에 또 뵙겠습니다 ({i})" if has_reply else None
+        reply_date = f"{rng.choice([2024, 2025])}. {rng.randint(1, 12)}. {rng.randint(1, 28)}" if has_reply else None
+        rid = hashlib.md5(f"{author}-{date}-{content[:30]}-{i}".encode()).hexdigest()[:8]
+        reviews.append({
+            'review_id': f"naver-{place_id}-{rid}",
+            'place_id': place_id,
+            'author': author,
+            'date': date,
+            'content': content,
+            'has_reply': bool(reply),
+            'reply': reply,
+            'reply_date': reply_date
+        })
+    return reviews
+
+
+def measure(build):
+    """Return (bytes retained, object) for the structure built by `build`"""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, obj
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"📊 Review cache memory benchmark ({count:,} synthetic reviews)")
+
+    # Before: list of dicts (기존 캐시 구조)
+    dict_bytes, dict_cache = measure(lambda: {'data': synthetic_reviews(count)})
+
+    # After: compact records (생성 중간 dict 리스트는 버려지므로 최종 보유량만 측정)
+    def build_compact():
+        cache = ReviewCache()
+        cache.put("bench", "bench:all:100000", synthetic_reviews(count), total=count)
+        return cache
+    compact_bytes, compact_cache = measure(build_compact)
+
+    entry = compact_cache.get("bench", "bench:all:100000")
+    assert entry.to_dicts() == dict_cache['data'], "compact cache must round-trip to identical dicts"
+
+    print(f"   dict cache:    {dict_bytes / 1024 / 1024:8.1f} MB ({dict_bytes / count:6.0f} B/review)")
+    print(f"   compact cache: {compact_bytes / 1024 / 1024:8.1f} MB ({compact_bytes / count:6.0f} B/review)")
+    print(f"   reduction:     {(1 - compact_bytes / dict_bytes) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
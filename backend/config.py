@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -30,13 +30,73 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: Optional[str] = None
     openai_model: str = "gpt-4o-mini"  # Fast & cost-effective model
+    openai_base_url: str = "https://api.openai.com/v1"  # 프록시 / 로컬 스텁 서버 테스트용
+    openai_timeout_seconds: float = 60.0  # 응답 대기 (read/write) 최대 시간
+    openai_connect_timeout_seconds: float = 10.0
+    openai_max_retries: int = 2  # 429 / 5xx / 연결 오류 시 SDK 재시도 횟수
+    openai_max_connections: int = 20  # 비동기 클라이언트 연결 풀 크기 (요청 간 keep-alive 재사용)
+    openai_max_concurrency: int = 8  # 비동기 생성 동시 요청 수 (초과분은 대기)
+    generate_replies_max_items: int = 100  # /api/reviews/generate-replies 한 번에 생성할 수 있는 답글 수
+    openai_batch_max_items: int = 2000  # /api/naver/reviews/draft-batch 한 번에 초안을 만들 수 있는 리뷰 수
+    openai_batch_completion_window: str = "24h"
+    openai_batch_poll_seconds: float = 30.0  # 배치 상태 확인 간격 (draft_batches poller, 작업 슬롯은 사용하지 않음)
+    openai_batch_max_poll_errors: int = 20  # 상태 확인이 연속으로 이만큼 실패하면 배치를 failed로
     
     # MongoDB
     mongodb_url: Optional[str] = None
     use_mongodb: bool = False  # Set to True for production
     
+    # SQLite (MongoDB 미사용 시 내장 저장소: 작업/세션/토큰/AI 설정)
+    use_sqlite: bool = True
+    sqlite_path: str = "data/review_system.db"
+    
     # Naver Settings (Stage 2)
     naver_rate_limit_delay: int = 3
+    naver_post_burst: int = 1  # 계정별 토큰 버킷: 연속으로 바로 게시할 수 있는 답글 수
+    naver_post_interval_seconds: float = 3.0  # 계정별 토큰 버킷: 토큰 충전 간격 (평균 게시 간격)
+    naver_places_ttl_minutes: int = 720  # 매장 목록 캐시 유지 시간 (MongoDB 저장, 재시작 후에도 유지)
+    reply_input_mode: str = "native"  # native: 스크립트로 한 번에 입력 (이모지 유지) / typed: send_keys로 한 글자씩
+    reply_verify_timeout_seconds: float = 8.0  # 등록 후 대상 리뷰에 답글이 나타나길 기다리는 최대 시간 (초과 시 전체 스캔)
+    reply_locate_window: int = 5  # 답글 대상 위치 힌트(마지막 로드 기준) 앞뒤로 확인할 리뷰 수 (0이면 힌트 미사용)
+
+    # Debug Artifacts (스크린샷 + HTML 덤프)
+    debug_artifacts_mode: str = "off"  # off / error / sample / always
+    debug_artifacts_sample_rate: float = 0.0  # sample 모드에서 캡처 비율 (0.0 ~ 1.0)
+    debug_artifacts_keep: int = 20  # 최근 N건만 보관
+    debug_artifacts_dir: str = "data/debug_artifacts"
+
+    # Background Job Queue (리뷰 로드 / 답글 게시 / 답글 일괄 게시 / 자동 답글 / 답글 재시도 / 배치 초안)
+    job_queue_workers: int = 3
+    job_queue_max_size: int = 50  # 대기열 초과 시 429
+    job_queue_type_limits: Dict[str, int] = {"review_load": 2, "reply_post": 2, "reply_batch": 1, "auto_reply": 1, "reply_outbox": 1}  # 타입별 동시 실행 수
+    job_queue_serial_types: List[str] = ["reply_post", "reply_batch", "auto_reply", "reply_outbox"]  # 같은 네이버 계정끼리는 하나씩 (다른 계정은 병렬, worker 모드는 account_leases로 프로세스 간에도 보장)
+    job_queue_drain_seconds: int = 30  # 종료 시 작업 마무리 대기 시간
+    reply_batch_max_items: int = 50  # /reviews/reply-batch, /reviews/auto-reply 한 번에 게시할 수 있는 답글 수
+    auto_reply_generate_concurrency: int = 4  # 자동 답글: 게시하는 동안 미리 생성해 두는 LLM 동시 요청 수
+
+    # Reply Outbox (리뷰 못 찾음 / 세션 만료 / Chrome 크래시로 실패한 답글 자동 재시도, DB 필요)
+    reply_outbox_enabled: bool = True
+    reply_outbox_poll_seconds: float = 15.0  # 재시도 기한이 된 답글 확인 간격
+    reply_outbox_base_delay_seconds: int = 60  # 첫 재시도까지 대기 (이후 두 배씩)
+    reply_outbox_max_delay_seconds: int = 3600
+    reply_outbox_max_attempts: int = 5  # 원래 게시 포함, 초과 시 dead
+    reply_outbox_batch_size: int = 20  # 계정+매장별로 한 작업(브라우저 한 번)에서 재시도할 답글 수
+    reply_outbox_sending_timeout_seconds: int = 1800  # 이 시간 넘게 sending이면 작업이 죽은 것으로 보고 다시 pending
+
+    # Task Execution (inprocess: 웹 프로세스의 job_queue / worker: worker.py 별도 프로세스)
+    task_execution_mode: str = "inprocess"  # worker 모드는 DB 필요 (MongoDB 또는 같은 서버의 SQLite)
+    worker_concurrency: int = 2  # worker.py 프로세스당 동시 실행 작업 수
+    worker_poll_seconds: float = 1.0  # 대기 작업이 없을 때 조회 간격
+    task_lease_seconds: int = 60  # 하트비트가 끊기면 이 시간 후 다른 워커가 재시도
+    task_heartbeat_seconds: int = 15
+    task_cancel_poll_seconds: float = 2.0  # worker.py가 취소 요청을 확인하는 간격
+    task_max_attempts: int = 3
+    task_no_retry_types: List[str] = ["reply_post", "reply_batch", "auto_reply", "reply_outbox"]  # lease 만료 시 다시 실행하지 않음 (중복 게시 방지 → 답글은 outbox로)
+    task_flush_interval_seconds: float = 5.0  # 진행률 DB 기록 간격 (상태 전환은 즉시 기록)
+    task_live_retention_seconds: int = 120  # 완료된 작업을 메모리에 유지하는 시간 (결과 조회용)
+    task_result_chunk_size: int = 200  # 리뷰 결과를 task_results에 나눠 저장하는 단위
+    task_retention_days: int = 7  # 작업/결과 보관 기간 (MongoDB TTL 인덱스)
+    task_dedup_window_seconds: int = 600  # 같은 Idempotency-Key / 같은 답글 재요청 시 기존 작업 반환
     
     # Naver OAuth (Session auto-creation)
     naver_client_id: Optional[str] = None
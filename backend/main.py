@@ -20,16 +20,22 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# MongoDB initialization
-if settings.use_mongodb and settings.mongodb_url:
-    from utils.db import init_mongodb
-    mongodb_connected = init_mongodb(settings.mongodb_url)
-    if mongodb_connected:
-        print("✅ MongoDB 연결 성공!")
+# Database initialization (MongoDB → SQLite → file)
+from utils.db import init_database
+storage_backend = init_database()
+if storage_backend == "mongodb":
+    print("✅ MongoDB 연결 성공!")
+elif storage_backend == "sqlite":
+    if settings.use_mongodb and settings.mongodb_url:
+        print(f"⚠️ MongoDB 연결 실패. SQLite 저장소 사용: {settings.sqlite_path}")
     else:
-        print("⚠️ MongoDB 연결 실패. 파일 기반 저장소 사용.")
+        print(f"ℹ️ MongoDB 사용 안 함. SQLite 저장소 사용: {settings.sqlite_path}")
 else:
-    print("ℹ️ MongoDB 사용 안 함. 파일 기반 저장소 사용.")
+    print("ℹ️ MongoDB/SQLite 사용 안 함. 파일 기반 저장소 사용.")
+
+if storage_backend != "file":
+    from utils.db import ensure_indexes
+    print(f"📇 DB 인덱스 준비 완료 ({ensure_indexes():.2f}초)")
 
 # CORS configuration
 # 🔥 Vercel 도메인 명시적 허용
@@ -63,6 +69,50 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def warm_start():
+    """Restore persisted caches so the first request after a deploy skips the browser"""
+    if not settings.use_mock_naver:
+        from services.naver_automation_selenium import naver_automation_selenium
+        naver_automation_selenium.warm_start_places_cache()
+
+
+@app.on_event("startup")
+async def start_reply_outbox():
+    """Retry replies that failed for transient reasons (DB 필요)"""
+    if storage_backend != "file" and not settings.use_mock_naver:
+        from utils.reply_outbox import reply_outbox
+        reply_outbox.start()
+
+
+@app.on_event("startup")
+async def start_draft_batches():
+    """Collect the results of submitted OpenAI draft batches (DB 필요)"""
+    if storage_backend != "file":
+        from utils.draft_batches import draft_batches
+        draft_batches.start()
+
+
+@app.on_event("shutdown")
+async def drain_job_queue():
+    """Let queued/running background tasks finish before the process exits"""
+    from utils.job_queue import job_queue
+    from utils.reply_outbox import reply_outbox
+    from utils.draft_batches import draft_batches
+    reply_outbox.stop()  # 새 재시도 작업은 만들지 않음
+    draft_batches.stop()  # 제출된 배치는 DB에 남아 있으므로 다음 시작 때 이어서 확인
+    await asyncio.get_event_loop().run_in_executor(None, job_queue.shutdown, settings.job_queue_drain_seconds)
+    
+    from services.llm_service import llm_service
+    await llm_service.aclose()
+    
+    # 메모리에 남아있는 작업 상태 기록 (write-behind)
+    from utils.db import is_db_available
+    if is_db_available():
+        from utils.task_manager import task_manager
+        task_manager.flush()
+
+
 @app.get("/")
 async def root():
     return {
@@ -91,6 +141,13 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """In-process operational metrics (cache invalidations, timings, ...)"""
+    from utils.metrics import metrics
+    return metrics.snapshot()
+
+
 # Import and include routers
 from api.routes import auth, gbp, reviews, naver
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
@@ -77,6 +77,20 @@ class GenerateReplyResponse(BaseModel):
     prompt_used: str
 
 
+class ReplyGenerationItem(BaseModel):
+    review_id: Optional[str] = None  # 결과를 리뷰와 연결하기 위한 값 (그대로 반환)
+    review_text: Optional[str] = None
+    rating: Optional[int] = Field(default=3, ge=1, le=5)
+    custom_instructions: Optional[str] = None
+
+
+class GenerateRepliesRequest(BaseModel):
+    reviews: List[ReplyGenerationItem]
+    store_name: Optional[str] = None
+    place_settings: Optional[dict] = None  # 모든 리뷰에 같은 매장 AI 설정 적용
+    concurrency: Optional[int] = Field(default=None, ge=1)  # 최대 OPENAI_MAX_CONCURRENCY
+
+
 # Reply Posting
 class PostReplyRequest(BaseModel):
     review_id: str
@@ -1,47 +1,100 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+import asyncio
 import json
 import os
-from typing import Optional
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from config import settings
 from models.schemas import GenerateReplyRequest, GenerateReplyResponse
 from fastapi import HTTPException
+from utils.metrics import metrics
 import httpx
 
 
+# Batch API 상태 중 더 이상 바뀌지 않는 상태
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
 class LLMService:
     """Service for generating review replies using OpenAI"""
     
     def __init__(self):
         self.client = None
+        self.async_client = None
+        self._async_loop = None  # async_client / semaphore가 묶인 이벤트 루프
+        self._semaphore = None
+        self._inflight = 0
+        self._batch_client: Optional[httpx.Client] = None
+        self._batch_transport: Optional[httpx.BaseTransport] = None  # Batch API 전송 계층 (테스트: httpx.MockTransport)
         self.prompts = self._load_prompts()
     
+    def _check_api_key(self):
+        if not settings.openai_api_key:
+            raise HTTPException(
+                status_code=500,
+                detail="OpenAI API key not configured. Please set OPENAI_API_KEY in .env file"
+            )
+    
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(settings.openai_timeout_seconds, connect=settings.openai_connect_timeout_seconds)
+    
     def _get_client(self) -> OpenAI:
         """Get OpenAI client"""
         if not self.client:
-            if not settings.openai_api_key:
-                raise HTTPException(
-                    status_code=500,
-                    detail="OpenAI API key not configured. Please set OPENAI_API_KEY in .env file"
-                )
+            self._check_api_key()
             
             # Create httpx client without proxies parameter
             # This fixes compatibility issues with newer versions
             try:
                 http_client = httpx.Client(
-                    timeout=60.0,
+                    timeout=self._timeout(),
                     limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
                 )
                 self.client = OpenAI(
                     api_key=settings.openai_api_key,
+                    base_url=settings.openai_base_url,
                     http_client=http_client
                 )
             except Exception as e:
                 print(f"⚠️ Error creating custom http_client: {e}")
                 # Fallback to simple initialization
-                self.client = OpenAI(api_key=settings.openai_api_key)
+                self.client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
         
         return self.client
     
+    def _get_async_client(self) -> Tuple[AsyncOpenAI, asyncio.Semaphore]:
+        """
+        Get AsyncOpenAI client (pooled httpx.AsyncClient 공유) and the concurrency semaphore
+        
+        둘 다 현재 이벤트 루프에 묶이므로 루프가 바뀌면(테스트 등) 새로 생성
+        """
+        loop = asyncio.get_running_loop()
+        if self.async_client is None or self._async_loop is not loop:
+            self._check_api_key()
+            http_client = httpx.AsyncClient(
+                timeout=self._timeout(),
+                limits=httpx.Limits(
+                    max_keepalive_connections=settings.openai_max_connections,
+                    max_connections=settings.openai_max_connections
+                )
+            )
+            self.async_client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
+                http_client=http_client,
+                max_retries=settings.openai_max_retries
+            )
+            self._semaphore = asyncio.Semaphore(max(1, settings.openai_max_concurrency))
+            self._async_loop = loop
+        return self.async_client, self._semaphore
+    
+    async def aclose(self):
+        """Close the pooled async connections (app shutdown)"""
+        if self.async_client is not None:
+            await self.async_client.close()
+            self.async_client = None
+            self._async_loop = None
+    
     def _load_prompts(self) -> dict:
         """Load prompt templates from JSON file"""
         prompts_file = settings.prompts_file
@@ -244,59 +297,56 @@ class LLMService:
         
         return result
     
-    def generate_reply(self, request: GenerateReplyRequest, place_settings=None) -> GenerateReplyResponse:
+    def _build_completion_params(self, request: GenerateReplyRequest, place_settings=None) -> Tuple[Dict, str]:
         """
-        Generate a reply to a review using OpenAI
+        Build chat.completions parameters (sync / async 공통 프롬프트 구성)
         
         Args:
             request: GenerateReplyRequest containing review details
             place_settings: Optional PlaceAISettings for customization
         
         Returns:
-            GenerateReplyResponse with generated reply
+            (chat.completions.create kwargs, prompt template)
         """
-        try:
-            client = self._get_client()
+        # Get appropriate prompt template
+        template = self._get_prompt_template(request.rating, request.store_name)
+        
+        # Determine parameters based on place_settings
+        if place_settings:
+            temperature = place_settings.diversity
+            max_tokens = int(place_settings.reply_length_max * 1.5)  # 여유를 두고 설정
+            min_length = place_settings.reply_length_min
+            max_length = place_settings.reply_length_max
+            
+            # 🔥 다양성에 따라 penalty 조정
+            # 다양성이 높을수록 더 창의적이고 반복 회피
+            frequency_penalty = 0.5 + (place_settings.diversity * 0.4)  # 0.7-0.9
+            presence_penalty = 0.3 + (place_settings.diversity * 0.4)   # 0.5-0.7
             
-            # Get appropriate prompt template
-            template = self._get_prompt_template(request.rating, request.store_name)
+            print(f"🎨 AI Parameters: temp={temperature}, freq_penalty={frequency_penalty:.2f}, presence_penalty={presence_penalty:.2f}")
+            print(f"📏 Length range: {min_length}-{max_length}, max_tokens={max_tokens}")
+            print(f"🎭 Settings: friendliness={place_settings.friendliness}, formality={place_settings.formality}")
             
-            # Determine parameters based on place_settings
-            if place_settings:
-                temperature = place_settings.diversity
-                max_tokens = int(place_settings.reply_length_max * 1.5)  # 여유를 두고 설정
-                min_length = place_settings.reply_length_min
-                max_length = place_settings.reply_length_max
-                
-                # 🔥 다양성에 따라 penalty 조정
-                # 다양성이 높을수록 더 창의적이고 반복 회피
-                frequency_penalty = 0.5 + (place_settings.diversity * 0.4)  # 0.7-0.9
-                presence_penalty = 0.3 + (place_settings.diversity * 0.4)   # 0.5-0.7
-                
-                print(f"🎨 AI Parameters: temp={temperature}, freq_penalty={frequency_penalty:.2f}, presence_penalty={presence_penalty:.2f}")
-                print(f"📏 Length range: {min_length}-{max_length}, max_tokens={max_tokens}")
-                print(f"🎭 Settings: friendliness={place_settings.friendliness}, formality={place_settings.formality}")
-                
-                # 🔥 부정 리뷰 (1-2점)는 특별 프롬프트 사용
-                if request.rating and request.rating <= 2:
-                    system_prompt = self._build_custom_system_prompt_negative(place_settings)
-                    print(f"🔥 Using NEGATIVE review prompt for rating {request.rating}")
-                else:
-                    system_prompt = self._build_custom_system_prompt(place_settings)
-                    print(f"✅ Using normal review prompt for rating {request.rating}")
+            # 🔥 부정 리뷰 (1-2점)는 특별 프롬프트 사용
+            if request.rating and request.rating <= 2:
+                system_prompt = self._build_custom_system_prompt_negative(place_settings)
+                print(f"🔥 Using NEGATIVE review prompt for rating {request.rating}")
             else:
-                # Default values
-                temperature = 0.9
-                max_tokens = 500
-                min_length = 100
-                max_length = 450
-                frequency_penalty = 0.8
-                presence_penalty = 0.6
-                
-                print(f"🎨 Using DEFAULT AI parameters")
-                
-                # Build default system prompt
-                system_prompt = """[ROLE]
+                system_prompt = self._build_custom_system_prompt(place_settings)
+                print(f"✅ Using normal review prompt for rating {request.rating}")
+        else:
+            # Default values
+            temperature = 0.9
+            max_tokens = 500
+            min_length = 100
+            max_length = 450
+            frequency_penalty = 0.8
+            presence_penalty = 0.6
+            
+            print(f"🎨 Using DEFAULT AI parameters")
+            
+            # Build default system prompt
+            system_prompt = """[ROLE]
 너는 네이버 플레이스 리뷰에 답글을 다는 "매장 CS 담당자"다. 리뷰를 정확히 읽고 이해한 뒤, 항상 친절하고 긍정적인 톤으로 답글을 작성한다.
 
 [CRITICAL: 다양성 최우선]
@@ -307,13 +357,13 @@ class LLMService:
 각 리뷰마다 서로 다른 표현/구조로 답글을 작성한다.
 브랜드 톤은 일관되게 유지: 따뜻함 / 감사 / 재방문 환영 / 짧고 자연스러움
 과장, 진부한 문구 반복은 절대 금지."""
-            
-            # Build user prompt (상세 스타일 가이드)
-            store_name = request.store_name or "저희 매장"
-            review_text = request.review_text or "방문해주셔서 감사합니다"
-            rating = request.rating or 5
-            
-            user_prompt = f"""**리뷰 정보**
+        
+        # Build user prompt (상세 스타일 가이드)
+        store_name = request.store_name or "저희 매장"
+        review_text = request.review_text or "방문해주셔서 감사합니다"
+        rating = request.rating or 5
+        
+        user_prompt = f"""**리뷰 정보**
 매장명: {store_name}
 별점: ⭐{rating}
 리뷰 내용:
@@ -406,23 +456,89 @@ class LLMService:
 □ 새로운 표현을 시도했는가?
 
 🚨 절대 금지: "감사합니다", "다음에 또 뵙겠습니다" 같은 뻔한 표현 연속 사용"""
-            
-            if request.custom_instructions:
-                user_prompt += f"\n\n**추가 요청사항**\n{request.custom_instructions}"
+        
+        if request.custom_instructions:
+            user_prompt += f"\n\n**추가 요청사항**\n{request.custom_instructions}"
+        
+        return {
+            'model': settings.openai_model,
+            'messages': [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            'temperature': temperature,  # Customizable diversity
+            'max_tokens': max_tokens,  # Customizable length
+            'frequency_penalty': frequency_penalty,  # 반복 패턴 억제 (설정 기반)
+            'presence_penalty': presence_penalty   # 새로운 표현 장려 (설정 기반)
+        }, template
+    
+    def generate_reply(self, request: GenerateReplyRequest, place_settings=None) -> GenerateReplyResponse:
+        """
+        Generate a reply to a review using OpenAI
+        
+        ⚠️ 동기 호출 - async 라우트에서는 agenerate_reply 사용 (이벤트 루프 블로킹 방지)
+        
+        Args:
+            request: GenerateReplyRequest containing review details
+            place_settings: Optional PlaceAISettings for customization
+        
+        Returns:
+            GenerateReplyResponse with generated reply
+        """
+        try:
+            client = self._get_client()
+            params, template = self._build_completion_params(request, place_settings)
             
             # Call OpenAI API with customized parameters
-            response = client.chat.completions.create(
-                model=settings.openai_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=temperature,  # Customizable diversity
-                max_tokens=max_tokens,  # Customizable length
-                frequency_penalty=frequency_penalty,  # 반복 패턴 억제 (설정 기반)
-                presence_penalty=presence_penalty   # 새로운 표현 장려 (설정 기반)
+            response = client.chat.completions.create(**params)
+            
+            generated_reply = response.choices[0].message.content.strip()
+            
+            return GenerateReplyResponse(
+                generated_reply=generated_reply,
+                rating=request.rating,
+                prompt_used=template
             )
             
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error generating reply: {str(e)}"
+            )
+    
+    async def _acreate(self, params: Dict):
+        """chat.completions.create on the shared async client, bounded by the concurrency semaphore"""
+        client, semaphore = self._get_async_client()
+        queued = time.monotonic()
+        async with semaphore:
+            started = time.monotonic()
+            metrics.observe('llm.queue_wait_seconds', started - queued)
+            self._inflight += 1
+            metrics.set_gauge('llm.inflight', self._inflight)
+            try:
+                return await client.chat.completions.create(**params)
+            finally:
+                self._inflight -= 1
+                metrics.set_gauge('llm.inflight', self._inflight)
+                metrics.observe('llm.generate_seconds', time.monotonic() - started)
+    
+    async def agenerate_reply(self, request: GenerateReplyRequest, place_settings=None) -> GenerateReplyResponse:
+        """
+        Generate a reply without blocking the event loop (AsyncOpenAI)
+        
+        동시 요청은 OPENAI_MAX_CONCURRENCY개까지, 나머지는 세마포어에서 대기
+        
+        Args:
+            request: GenerateReplyRequest containing review details
+            place_settings: Optional PlaceAISettings for customization
+        
+        Returns:
+            GenerateReplyResponse with generated reply
+        """
+        try:
+            params, template = self._build_completion_params(request, place_settings)
+            response = await self._acreate(params)
+            
             generated_reply = response.choices[0].message.content.strip()
             
             return GenerateReplyResponse(
@@ -432,11 +548,165 @@ class LLMService:
             )
             
         except Exception as e:
+            metrics.incr('llm.errors')
             raise HTTPException(
                 status_code=500,
                 detail=f"Error generating reply: {str(e)}"
             )
     
+    async def agenerate_replies(self, requests: List[GenerateReplyRequest], place_settings=None,
+                                concurrency: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        Generate replies for many reviews at once, yielding each result as soon as it completes
+        
+        동시 요청은 concurrency개 (전체 한도 OPENAI_MAX_CONCURRENCY도 적용), 완료 순서대로 반환
+        호출 측이 중간에 멈추면(클라이언트 연결 끊김) 남은 요청은 취소
+        
+        Yields:
+            {index, status: 'completed' | 'failed', generated_reply?, error?, latency_ms, usage?}
+        """
+        limit = asyncio.Semaphore(max(1, concurrency or settings.openai_max_concurrency))
+        
+        async def generate(index: int, request: GenerateReplyRequest) -> Dict:
+            async with limit:
+                started = time.monotonic()
+                try:
+                    params, _ = self._build_completion_params(request, place_settings)
+                    response = await self._acreate(params)
+                    result = {
+                        'index': index,
+                        'status': 'completed',
+                        'generated_reply': response.choices[0].message.content.strip()
+                    }
+                    if response.usage is not None:
+                        result['usage'] = {
+                            'prompt_tokens': response.usage.prompt_tokens,
+                            'completion_tokens': response.usage.completion_tokens,
+                            'total_tokens': response.usage.total_tokens
+                        }
+                except Exception as e:
+                    metrics.incr('llm.errors')
+                    result = {'index': index, 'status': 'failed', 'error': str(getattr(e, 'detail', None) or e)}
+                result['latency_ms'] = round((time.monotonic() - started) * 1000)
+                return result
+        
+        tasks = [asyncio.ensure_future(generate(index, request)) for index, request in enumerate(requests)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    # ==================== Batch API ====================
+    # 대량 초안 생성용 (실시간보다 저렴, 완료까지 최대 24시간)
+    # openai SDK 버전에 batches가 없어 REST로 직접 호출
+    # OPENAI_BASE_URL로 로컬 스텁 서버, _batch_transport로 httpx.MockTransport 테스트 가능 (tests/test_llm_batch.py)
+    
+    def _get_batch_client(self) -> httpx.Client:
+        if self._batch_client is None:
+            self._batch_client = httpx.Client(transport=self._batch_transport)
+        return self._batch_client
+    
+    def _batch_request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        self._check_api_key()
+        try:
+            response = self._get_batch_client().request(
+                method,
+                f"{settings.openai_base_url.rstrip('/')}{path}",
+                headers={"Authorization": f"Bearer {settings.openai_api_key}"},
+                timeout=self._timeout(),
+                **kwargs
+            )
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"OpenAI batch request failed ({method} {path}): {e}")
+        if response.status_code >= 400:
+            raise HTTPException(
+                status_code=502,
+                detail=f"OpenAI batch request failed ({method} {path}): {response.status_code} {response.text[:300]}"
+            )
+        return response
+    
+    def build_batch_jsonl(self, requests: List[Tuple[str, GenerateReplyRequest]], place_settings=None) -> bytes:
+        """
+        Build the Batch API input file: one chat.completions request per (custom_id, request)
+        
+        generate_reply와 같은 _build_completion_params 사용 → 실시간 생성과 같은 프롬프트/파라미터
+        """
+        lines = []
+        for custom_id, request in requests:
+            params, _ = self._build_completion_params(request, place_settings)
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": params
+            }, ensure_ascii=False))
+        return ("\n".join(lines) + "\n").encode("utf-8")
+    
+    def submit_batch(self, requests: List[Tuple[str, GenerateReplyRequest]], place_settings=None,
+                     metadata: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Upload the JSONL input and create a batch
+        
+        Returns:
+            Batch object (id, status, request_counts, ...)
+        """
+        jsonl = self.build_batch_jsonl(requests, place_settings)
+        uploaded = self._batch_request(
+            "POST", "/files",
+            data={"purpose": "batch"},
+            files={"file": ("reply_drafts.jsonl", jsonl, "application/jsonl")}
+        ).json()
+        batch = self._batch_request("POST", "/batches", json={
+            "input_file_id": uploaded["id"],
+            "endpoint": "/v1/chat/completions",
+            "completion_window": settings.openai_batch_completion_window,
+            "metadata": metadata or {}
+        }).json()
+        metrics.incr('llm.batch.submitted')
+        print(f"📦 OpenAI batch {batch['id']} submitted ({len(requests)} requests, {len(jsonl) / 1024:.0f}KB)")
+        return batch
+    
+    def get_batch(self, batch_id: str) -> Dict:
+        return self._batch_request("GET", f"/batches/{batch_id}").json()
+    
+    def cancel_batch(self, batch_id: str) -> Dict:
+        return self._batch_request("POST", f"/batches/{batch_id}/cancel").json()
+    
+    def get_batch_results(self, batch: Dict) -> Dict[str, Dict]:
+        """
+        Download the output / error files of a finished batch
+        
+        Returns:
+            custom_id -> {status: 'draft', generated_reply, usage} | {status: 'failed', error}
+        """
+        results = {}
+        for file_key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(file_key)
+            if not file_id:
+                continue
+            content = self._batch_request("GET", f"/files/{file_id}/content").text
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                response = item.get("response") or {}
+                body = response.get("body") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    error = item.get("error") or body.get("error") or {}
+                    results[item["custom_id"]] = {
+                        "status": "failed",
+                        "error": error.get("message") or f"HTTP {response.get('status_code')}"
+                    }
+                    continue
+                results[item["custom_id"]] = {
+                    "status": "draft",
+                    "generated_reply": body["choices"][0]["message"]["content"].strip(),
+                    "usage": body.get("usage")
+                }
+        return results
+    
     def reload_prompts(self):
         """Reload prompt templates from file"""
         self.prompts = self._load_prompts()
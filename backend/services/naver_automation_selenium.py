@@ -8,6 +8,7 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
@@ -17,13 +18,53 @@ import time
 import logging
 import hashlib
 import re
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from config import settings
 from fastapi import HTTPException
+from services.review_cache import ReviewCache
+from utils.single_flight import SingleFlight
+from utils.keyed_lock import KeyedLock
+from utils.rate_limiter import TokenBucketLimiter
+from utils.debug_artifacts import debug_artifacts
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# 답글 textarea 입력: React는 value setter를 가로채므로 HTMLTextAreaElement의 원래 setter로 값을 넣고
+# input 이벤트를 보내야 상태(onChange)에 반영됨 → 입력 후 값을 반환
+_NATIVE_FILL_JS = """
+const textarea = arguments[0];
+const text = arguments[1];
+const setter = Object.getOwnPropertyDescriptor(HTMLTextAreaElement.prototype, 'value').set;
+textarea.focus();
+setter.call(textarea, text);
+textarea.dispatchEvent(new InputEvent('input', { data: text, inputType: 'insertText', bubbles: true }));
+textarea.dispatchEvent(new Event('change', { bubbles: true }));
+return textarea.value;
+"""
+
+# 렌더링된 리뷰 <li>를 한 번의 스크립트 호출로 요약 (Selenium 요소별 왕복 없이 작성자/날짜/내용 확인)
+# arguments[0], arguments[1]: 요약할 인덱스 범위 [start, end) → [리뷰 수, [[index, author, date, content], ...]]
+_REVIEW_WINDOW_JS = """
+const items = Array.from(document.querySelectorAll('li')).filter(li => li.querySelector('.pui__JiVbY3'));
+const start = Math.max(0, arguments[0]);
+const end = Math.min(items.length, arguments[1]);
+const rows = [];
+for (let i = start; i < end; i++) {
+    const li = items[i];
+    const dateElem = Array.from(li.querySelectorAll('.pui__m7nkds')).find(d => /20\\d{2}\\./.test(d.textContent));
+    const contentElem = li.querySelector('.pui__vn15t2');
+    rows.push([
+        i,
+        li.querySelector('.pui__JiVbY3').textContent.trim(),
+        dateElem ? dateElem.textContent.trim() : '',
+        contentElem ? contentElem.textContent.trim().slice(0, 100) : ''
+    ]);
+}
+return [items.length, rows];
+"""
+
 
 class NaverPlaceAutomationSelenium:
     """Naver Smart Place Center automation using Selenium"""
@@ -38,32 +79,41 @@ class NaverPlaceAutomationSelenium:
         # 🔒 Thread Lock for race condition prevention
         import threading
         self._user_lock = threading.Lock()  # API 호출 간 user_id 보호
+        self._browser_locks = KeyedLock('naver.browser_lock')  # 계정 브라우저는 작업 하나씩 (답글 게시 / 리뷰 로드, 계정이 다르면 병렬)
+        # ⏳ 계정별 게시 속도 제한 (토큰 버킷) - 게시 후 고정 sleep 대신 그 계정의 다음 게시만 대기
+        self._post_rate_limiter = TokenBucketLimiter('naver.post_rate', settings.naver_post_burst, settings.naver_post_interval_seconds)
         
         # 🚀 Performance optimization: Cache for places list (user별로 분리!)
+        # MongoDB(naver_places)에 영속화 → 재시작 후 warm_start_places_cache()로 복원
         self._places_cache: Dict[str, List[Dict]] = {}  # {user_id: [places]}
-        self._places_cache_time: Dict[str, datetime] = {}  # {user_id: datetime}
-        self._cache_ttl = timedelta(minutes=5)  # 5분간 캐시 유지
+        self._places_cache_time: Dict[str, datetime] = {}  # {user_id: datetime (UTC, fetched_at)}
+        self._cache_ttl = timedelta(minutes=settings.naver_places_ttl_minutes)
 
         # 🚀 REVIEWS CACHE (Performance & Pagination Fix)
-        # Structure: { f"{place_id}:{filter_type}": { 'data': [...], 'time': datetime, 'total': int } }
-        self._reviews_cache: Dict[str, Dict] = {}
+        # Structure: { user_id: { f"{place_id}:{filter_type}:{load_count}": ReviewCacheEntry(records, time, total) } }
+        # 리뷰는 dict가 아닌 compact 레코드로 보관 (API 응답 시에만 dict 변환)
+        self._reviews_cache = ReviewCache()
         self._reviews_cache_ttl = timedelta(minutes=10)  # 10 minutes cache
         
         # 🚀 PROGRESS TRACKING (Real-time feedback)
-        # Structure: { place_id: { 'status': str, 'count': int, 'message': str, 'timestamp': datetime } }
-        self._loading_progress: Dict[str, Dict] = {}
+        # Structure: { place_id: { 'status': str, 'count': int, 'message': str, 'timestamp': datetime, 'user_id': str } }
+        self._loading_progress: Dict[Tuple[str, str], Dict] = {}  # (user_id, place_id) -> 진행률 (계정별로 분리)
+        
+        # 🔗 SINGLE-FLIGHT: 같은 계정/매장의 동시 스크래핑은 1번만 실행하고 결과 공유
+        self._places_flight = SingleFlight('places')
+        self._reviews_flight = SingleFlight('reviews')
     
     def _load_session_from_mongodb(self, user_id="default"):
-        """Load session from MongoDB (cloud storage)
+        """Load session from MongoDB (cloud storage) or the local SQLite store
         
         Returns:
             dict with 'cookies', 'user_agent', 'window_size' or None
         """
         try:
-            if not settings.use_mongodb or not settings.mongodb_url:
+            from utils.db import get_db, is_db_available
+            if not is_db_available():
                 return None
             
-            from utils.db import get_db
             db = get_db()
             if db is None:
                 return None
@@ -586,24 +636,76 @@ class NaverPlaceAutomationSelenium:
             'message': 'No session found. Please login first.'
         }
     
-    def get_places(self) -> List[Dict]:
-        """Get list of places from Smartplace Center (with 5-minute cache)"""
+    def warm_start_places_cache(self) -> int:
+        """Load persisted places lists into memory (call once at startup)
+        
+        Returns:
+            Number of accounts loaded
+        """
+        from utils.db import load_all_naver_places
+        
+        loaded = 0
+        for user_id, stored in load_all_naver_places().items():
+            fetched_at = stored.get('fetched_at')
+            if not fetched_at:
+                continue
+            self._places_cache[user_id] = stored.get('places', [])
+            self._places_cache_time[user_id] = fetched_at
+            loaded += 1
+        print(f"🔥 Warm-started places cache for {loaded} account(s)")
+        return loaded
+    
+    def _get_cached_places(self, current_user_id: str) -> Optional[List[Dict]]:
+        """Return cached places if still fresh (memory first, then persistent store)"""
+        fetched_at = self._places_cache_time.get(current_user_id)
+        if current_user_id not in self._places_cache or fetched_at is None:
+            # 다른 프로세스(워커 등)가 갱신했을 수 있으므로 저장소 확인
+            from utils.db import get_naver_places
+            stored = get_naver_places(current_user_id)
+            if stored and stored.get('fetched_at'):
+                self._places_cache[current_user_id] = stored.get('places', [])
+                self._places_cache_time[current_user_id] = stored['fetched_at']
+                fetched_at = stored['fetched_at']
+            else:
+                return None
+        
+        cache_age = datetime.utcnow() - fetched_at
+        if cache_age < self._cache_ttl:
+            print(f"⚡ Using cached places for user {current_user_id} (age: {int(cache_age.total_seconds())}s)")
+            logger.info(f"⚡ Using cached places for user {current_user_id} (age: {int(cache_age.total_seconds())}s)")
+            return self._places_cache[current_user_id]
+        
+        print(f"🔄 Cache expired for user {current_user_id} (age: {int(cache_age.total_seconds())}s), refreshing...")
+        logger.info(f"🔄 Cache expired for user {current_user_id}, refreshing...")
+        return None
+    
+    def get_places(self, user_id: str = None, force_refresh: bool = False, debug: bool = False) -> List[Dict]:
+        """Get list of places from Smartplace Center (with persisted TTL cache)
+        
+        동시에 들어온 같은 계정의 요청은 진행 중인 조회 결과를 공유 (single-flight)
+        
+        Args:
+            user_id: Naver account (if None, uses self.active_user_id)
+            force_refresh: True면 캐시를 무시하고 다시 스크래핑
+            debug: True면 스크린샷/HTML 저장 (debug_artifacts)
+        """
+        current_user_id = user_id or self.active_user_id  # Race condition 방지
+        return self._places_flight.do(current_user_id, lambda: self._fetch_places(current_user_id, force_refresh, debug))
+    
+    def _fetch_places(self, current_user_id: str, force_refresh: bool = False, debug: bool = False) -> List[Dict]:
+        """Fetch places for one account (cache check + browser scrape)"""
         
         # 🔒 Lock으로 race condition 방지
         with self._user_lock:
-            current_user_id = self.active_user_id  # Race condition 방지
             print(f"🔒 Acquired lock for get_places() - user: {current_user_id}")
             
             # 🚀 Check cache first (user별로 확인!)
-            if current_user_id in self._places_cache and current_user_id in self._places_cache_time:
-                cache_age = datetime.now() - self._places_cache_time[current_user_id]
-                if cache_age < self._cache_ttl:
-                    print(f"⚡ Using cached places for user {current_user_id} (age: {int(cache_age.total_seconds())}s)")
-                    logger.info(f"⚡ Using cached places for user {current_user_id} (age: {int(cache_age.total_seconds())}s)")
-                    return self._places_cache[current_user_id]
-                else:
-                    print(f"🔄 Cache expired for user {current_user_id} (age: {int(cache_age.total_seconds())}s), refreshing...")
-                    logger.info(f"🔄 Cache expired for user {current_user_id}, refreshing...")
+            if force_refresh:
+                print(f"🔄 Refresh requested for user {current_user_id}, skipping cache")
+            else:
+                cached_places = self._get_cached_places(current_user_id)
+                if cached_places is not None:
+                    return cached_places
             
             driver = None
             driver_is_persistent = False
@@ -707,17 +809,8 @@ class NaverPlaceAutomationSelenium:
                     print("❌ Not logged in")
                     raise HTTPException(status_code=401, detail="Not logged in")
                 
-                # Take screenshot for debugging
-                screenshot_path = os.path.join(settings.data_dir, "naver_sessions", "bizes_list.png")
-                driver.save_screenshot(screenshot_path)
-                print(f"📸 Screenshot saved: {screenshot_path}")
-            
-                # Save page source for debugging
-                page_source = driver.page_source
-                page_source_file = os.path.join(settings.data_dir, "naver_sessions", "bizes_list.html")
-                with open(page_source_file, 'w', encoding='utf-8') as f:
-                    f.write(page_source)
-                print(f"📄 Page source saved: {page_source_file}")
+                # 📸 Debug artifacts (기본 비활성화, 설정/요청 시에만 백그라운드 저장)
+                debug_artifacts.capture(driver, f"places_{current_user_id}", debug=debug)
                 
                 places = []
                 
@@ -765,6 +858,7 @@ class NaverPlaceAutomationSelenium:
                     print("🔍 No places found in links - trying regex extraction from page source...")
                     try:
                         import re
+                        page_source = driver.page_source  # 필요할 때만 DOM 전체 직렬화
                         # Look for place IDs in the page source
                         place_id_pattern = r'/bizes/place/(\d+)'
                         matches = re.finditer(place_id_pattern, page_source)
@@ -809,15 +903,22 @@ class NaverPlaceAutomationSelenium:
                 logger.info(f"✅ Found {len(places)} places")
                 
                 # 🚀 Save to cache (user별로 저장!)
+                fetched_at = datetime.utcnow()
                 self._places_cache[current_user_id] = places
-                self._places_cache_time[current_user_id] = datetime.now()
-                print(f"💾 Cached {len(places)} places for user {current_user_id} (5 minutes)")
+                self._places_cache_time[current_user_id] = fetched_at
+                print(f"💾 Cached {len(places)} places for user {current_user_id} ({settings.naver_places_ttl_minutes} minutes)")
+                
+                # 💾 영속화 (빈 목록은 세션 문제일 수 있으므로 저장하지 않음)
+                if places:
+                    from utils.db import save_naver_places
+                    save_naver_places(current_user_id, places, fetched_at)
                 
                 return places
                 
             except Exception as e:
                 print(f"❌ Error getting places: {e}")
                 logger.error(f"Error getting places: {e}")
+                debug_artifacts.capture(driver, f"places_{current_user_id}", debug=debug, error=str(e))
                 raise HTTPException(status_code=500, detail=f"Error getting places: {str(e)}")
                 
             finally:
@@ -828,7 +929,32 @@ class NaverPlaceAutomationSelenium:
                 elif driver and driver_is_persistent:
                     print("♻️ Keeping persistent browser alive")
     
-    def get_reviews(self, place_id: str, page: int = 1, page_size: int = 20, filter_type: str = 'all', load_count: int = 300) -> List[Dict]:
+    def get_reviews(self, place_id: str, page: int = 1, page_size: int = 20, filter_type: str = 'all', load_count: int = 300, user_id: str = None, debug: bool = False, progress_callback: Optional[Callable[[Dict], None]] = None, cancel_check: Optional[Callable[[], bool]] = None) -> List[Dict]:
+        """Get reviews for a place (single-flight per account/place/load_count)
+        
+        같은 계정 + 매장 + load_count 요청이 이미 실행 중이면 새 브라우저 작업 없이
+        진행 중인 작업에 합류하여 결과와 진행률(_loading_progress)을 공유
+        
+        progress_callback: 진행률이 바뀔 때마다 _loading_progress 복사본으로 호출 (스크래핑 스레드에서 호출됨)
+        cancel_check: True를 반환하면 스크롤/파싱을 멈추고 그때까지의 부분 결과 반환 ('cancelled': True, 캐시 안 함)
+        """
+        current_user_id = user_id or self.active_user_id  # race condition 방지
+        flight_key = (current_user_id, place_id, filter_type, load_count)
+        return self._reviews_flight.do(
+            flight_key,
+            lambda: self._load_reviews(place_id, page, page_size, filter_type, load_count, current_user_id, debug, progress_callback, cancel_check)
+        )
+    
+    def _report_progress(self, progress_key: Tuple[str, str], progress_callback: Optional[Callable[[Dict], None]]):
+        """Push the current _loading_progress of (account, place) to the caller's callback"""
+        if progress_callback is None:
+            return
+        try:
+            progress_callback(dict(self._loading_progress[progress_key]))
+        except Exception as e:
+            print(f"⚠️ Progress callback error: {e}")
+    
+    def _load_reviews(self, place_id: str, page: int, page_size: int, filter_type: str, load_count: int, current_user_id: str, debug: bool = False, progress_callback: Optional[Callable[[Dict], None]] = None, cancel_check: Optional[Callable[[], bool]] = None) -> List[Dict]:
         """Get reviews for a place from Smartplace Center (BATCH LOADING + CACHE)
         
         New Strategy: Load specified number of reviews, then filter on frontend
@@ -839,29 +965,37 @@ class NaverPlaceAutomationSelenium:
             page_size: Reviews per page
             filter_type: 'all' (frontend filters)
             load_count: Number of reviews to load (50/150/300/500/1000)
+            current_user_id: Naver account
+            debug: True면 스크린샷/HTML 저장 (debug_artifacts)
+            progress_callback: 진행률 변경 시 호출 (task 진행률 push용)
+            cancel_check: 취소 확인 (스크롤/파싱 루프마다 호출)
         """
-        print(f"📝 Getting reviews for place: {place_id} (page {page}, size {page_size}, load_count={load_count})")
+        print(f"📝 Getting reviews for place: {place_id} (page {page}, size {page_size}, load_count={load_count}, user: {current_user_id})")
         
         # 🚀 CRITICAL FIX: Initialize progress BEFORE cache check!
         # This ensures progress is always visible, even when serving from cache
-        if place_id not in self._loading_progress or self._loading_progress[place_id]['status'] != 'loading':
+        # 계정별로 분리 (다른 계정이 같은 매장을 로드해도 서로 덮어쓰지 않음)
+        progress_key = (current_user_id, place_id)
+        if progress_key not in self._loading_progress or self._loading_progress[progress_key]['status'] != 'loading':
             print(f"🔄 Initializing progress for {place_id}")
-            self._loading_progress[place_id] = {
+            self._loading_progress[progress_key] = {
                 'status': 'loading',
                 'count': 0,
                 'message': '🚀 시작 중...',
-                'timestamp': datetime.now()
+                'timestamp': datetime.now(),
+                'user_id': current_user_id
             }
+            self._report_progress(progress_key, progress_callback)
         
         # 🚀 STEP 1: Check Cache (Include load_count in key)
         cache_key = f"{place_id}:all:{load_count}"  # Cache by place_id and load_count
-        if cache_key in self._reviews_cache:
-            cache_entry = self._reviews_cache[cache_key]
-            cache_age = datetime.now() - cache_entry['time']
+        cache_entry = self._reviews_cache.get(current_user_id, cache_key)
+        if cache_entry is not None:
+            cache_age = datetime.now() - cache_entry.time
             
             if cache_age < self._reviews_cache_ttl:
-                all_cached_reviews = cache_entry['data']
-                total_count = cache_entry['total']
+                all_cached_reviews = cache_entry.records
+                total_count = cache_entry.total
                 
                 start_idx = (page - 1) * page_size
                 end_idx = start_idx + page_size
@@ -875,16 +1009,17 @@ class NaverPlaceAutomationSelenium:
                     print(f"⚡ Using cached reviews (Items {len(all_cached_reviews)}, Age {int(cache_age.total_seconds())}s)")
                     
                     # 🚀 Update progress to show cache hit
-                    self._loading_progress[place_id].update({
+                    self._loading_progress[progress_key].update({
                         'status': 'completed',
                         'count': len(all_cached_reviews),
                         'message': f'⚡ 캐시에서 로드 완료 ({len(all_cached_reviews)}개)',
                         'timestamp': datetime.now()
                     })
+                    self._report_progress(progress_key, progress_callback)
                     
                     # Return ALL reviews (frontend will paginate)
                     return {
-                        'reviews': all_cached_reviews,  # Return ALL (not paginated)
+                        'reviews': cache_entry.to_dicts(),  # Return ALL (not paginated)
                         'total': total_count
                     }
                 else:
@@ -892,11 +1027,17 @@ class NaverPlaceAutomationSelenium:
             else:
                 print(f"⏰ Cache expired (Age {int(cache_age.total_seconds())}s). Refreshing...")
         
+        # 🔒 브라우저 사용 구간만 계정별 락 (같은 계정의 답글 게시 / 다른 매장 로드와 브라우저를 동시에 조작하지 않음)
+        with self._browser_locks.hold(current_user_id):
+            return self._scrape_reviews(place_id, page, page_size, load_count, current_user_id, cache_key, cache_entry, progress_key, debug, progress_callback, cancel_check)
+    
+    def _scrape_reviews(self, place_id: str, page: int, page_size: int, load_count: int, current_user_id: str, cache_key: str, cache_entry, progress_key: Tuple[str, str], debug: bool, progress_callback: Optional[Callable[[Dict], None]], cancel_check: Optional[Callable[[], bool]]) -> List[Dict]:
+        """Scrape reviews with the account's browser and update the cache (caller holds the account browser lock)"""
         # 🚀 STEP 2: Fetch NEW data (User-specified count)
         # Check if we're expanding existing cache
         existing_reviews = []
-        if cache_key in self._reviews_cache:
-            existing_reviews = self._reviews_cache[cache_key]['data']
+        if cache_entry is not None:
+            existing_reviews = cache_entry.to_dicts()
             print(f"📦 Expanding cache: Currently have {len(existing_reviews)} reviews")
         
         # 🚀 USER CHOICE: Load exactly what user requested
@@ -904,18 +1045,19 @@ class NaverPlaceAutomationSelenium:
         
         driver = None
         driver_is_persistent = False
-        current_user_id = self.active_user_id  # race condition 방지
         
         try:
             # 🚀 CRITICAL: Initialize progress tracking BEFORE anything
             print(f"🔄 Initializing progress tracking for {place_id}, user: {current_user_id}")
-            self._loading_progress[place_id] = {
+            self._loading_progress[progress_key] = {
                 'status': 'loading',
                 'count': 0,
                 'message': '🚀 브라우저 시작 중...',
-                'timestamp': datetime.now()
+                'timestamp': datetime.now(),
+                'user_id': current_user_id
             }
-            logger.info(f"Progress initialized: {self._loading_progress[place_id]}")
+            self._report_progress(progress_key, progress_callback)
+            logger.info(f"Progress initialized: {self._loading_progress[progress_key]}")
             
             # 🚀 PERSISTENT BROWSER: 먼저 기존 브라우저 확인
             from services.persistent_browser_manager import browser_manager
@@ -952,11 +1094,13 @@ class NaverPlaceAutomationSelenium:
                     print(f"✅ New browser created after session error")
             
             # Update progress
-            self._loading_progress[place_id]['message'] = '🔐 세션 로딩 중...'
-            print(f"Progress: {self._loading_progress[place_id]['message']}")
+            self._loading_progress[progress_key]['message'] = '🔐 세션 로딩 중...'
+            self._report_progress(progress_key, progress_callback)
+            print(f"Progress: {self._loading_progress[progress_key]['message']}")
             reviews_url = f'https://new.smartplace.naver.com/bizes/place/{place_id}/reviews?menu=visitor'
             print(f"🔗 Accessing: {reviews_url}")
-            self._loading_progress[place_id]['message'] = '📄 리뷰 페이지 접속 중...'
+            self._loading_progress[progress_key]['message'] = '📄 리뷰 페이지 접속 중...'
+            self._report_progress(progress_key, progress_callback)
             
             # 🔧 FIX: 세션 오류 발생 시 재시도
             max_retries = 2
@@ -984,7 +1128,8 @@ class NaverPlaceAutomationSelenium:
                         raise  # 재시도 불가능하면 예외 발생
             
             print("⏳ Waiting for reviews page to load...")
-            self._loading_progress[place_id]['message'] = '⏳ 페이지 로딩 중...'
+            self._loading_progress[progress_key]['message'] = '⏳ 페이지 로딩 중...'
+            self._report_progress(progress_key, progress_callback)
             time.sleep(2)
             
             # Handle popup
@@ -1000,18 +1145,20 @@ class NaverPlaceAutomationSelenium:
             # This is more stable and efficient than trying to click filters
             print("📜 Loading ALL reviews (작성일순)...")
             target_display = "전체" if TARGET_LOAD_COUNT >= 9999 else f"{TARGET_LOAD_COUNT}개"
-            self._loading_progress[place_id].update({
+            self._loading_progress[progress_key].update({
                 'status': 'loading',
                 'count': 0,
                 'message': f'📜 스크롤 준비 중... (목표: {target_display})',
                 'timestamp': datetime.now()
             })
-            print(f"Progress before scroll: {self._loading_progress[place_id]}")
+            self._report_progress(progress_key, progress_callback)
+            print(f"Progress before scroll: {self._loading_progress[progress_key]}")
             
             # 🚀 STEP 3: Scroll Logic (Smart Adaptive Loading)
             print(f"📜 Smart batch loading (Target: {TARGET_LOAD_COUNT})...")
-            self._loading_progress[place_id]['message'] = f'📜 스크롤 시작! (목표: {target_display})'
-            print(f"Progress at scroll start: {self._loading_progress[place_id]}")
+            self._loading_progress[progress_key]['message'] = f'📜 스크롤 시작! (목표: {target_display})'
+            self._report_progress(progress_key, progress_callback)
+            print(f"Progress at scroll start: {self._loading_progress[progress_key]}")
             
             last_count = 0
             no_change = 0
@@ -1031,7 +1178,14 @@ class NaverPlaceAutomationSelenium:
                          400 if TARGET_LOAD_COUNT <= 1000 else \
                          800  # For "all" (9999)
             
+            cancelled = False
             for i in range(max_scrolls):
+                # 🛑 취소 요청 → 스크롤 중단, 지금까지 렌더링된 리뷰만 파싱
+                if cancel_check is not None and cancel_check():
+                    print(f"🛑 Review load cancelled during scroll ({last_count} <li> loaded)")
+                    cancelled = True
+                    break
+                
                 try:
                     # 🔧 FIX: 스크롤 중 세션 체크 (invalid session 방지)
                     try:
@@ -1079,12 +1233,13 @@ class NaverPlaceAutomationSelenium:
                         message = f'📈 {current_count}개 리뷰 로드됨...'
                         if estimated_valid_count > 0:
                             message += f' (추정 유효: {estimated_valid_count}개)'
-                        self._loading_progress[place_id].update({
+                        self._loading_progress[progress_key].update({
                             'status': 'loading',
                             'count': current_count,
                             'message': message,
                             'timestamp': datetime.now()
                         })
+                        self._report_progress(progress_key, progress_callback)
                         
                         last_count = current_count
                         no_change = 0
@@ -1203,9 +1358,13 @@ class NaverPlaceAutomationSelenium:
                         print(f"  ⚠️ Scroll error: {e}")
                         break
             
+            # 📸 Debug artifacts (기본 비활성화)
+            debug_artifacts.capture(driver, f"reviews_{place_id}", debug=debug)
+            
             # 🚀 STEP 4: Parse Data
             print(f"🔍 Parsing {last_count} <li> elements...")
-            self._loading_progress[place_id]['message'] = f'📝 {last_count}개 리뷰 파싱 중...'
+            self._loading_progress[progress_key]['message'] = f'📝 {last_count}개 리뷰 파싱 중...'
+            self._report_progress(progress_key, progress_callback)
             all_reviews = []
             
             # 🔧 DEBUG: 스킵 카운터
@@ -1234,6 +1393,12 @@ class NaverPlaceAutomationSelenium:
             update_interval = max(1, total_li_count // 20)  # 20번 정도 업데이트
             
             for idx, li in enumerate(lis):
+                # 🛑 파싱 중 취소 요청 → 지금까지 파싱한 리뷰만 반환
+                if not cancelled and cancel_check is not None and cancel_check():
+                    print(f"🛑 Review load cancelled during parse ({len(all_reviews)} parsed)")
+                    cancelled = True
+                    break
+                
                 try:
                     # Author
                     try:
@@ -1317,12 +1482,13 @@ class NaverPlaceAutomationSelenium:
                     # 🚀 파싱 중 진행률 업데이트 (실제 유효한 리뷰 개수)
                     parsed_count += 1
                     if parsed_count % update_interval == 0 or parsed_count == 1:
-                        self._loading_progress[place_id].update({
+                        self._loading_progress[progress_key].update({
                             'status': 'loading',
                             'count': parsed_count,  # 실제 파싱된 리뷰 개수
                             'message': f'📝 {parsed_count}개 리뷰 파싱 중... ({idx+1}/{total_li_count})',
                             'timestamp': datetime.now()
                         })
+                        self._report_progress(progress_key, progress_callback)
                     
                 except Exception as parse_err:
                     skip_reasons['parse_error'] += 1
@@ -1381,39 +1547,65 @@ class NaverPlaceAutomationSelenium:
                 print(f"   Missing: {shortage} reviews (likely filtered out as 익명/가이드)")
                 logger.warning(f"Review shortage: Requested {TARGET_LOAD_COUNT}, got {len(unique_reviews)}")
             
+            if cancelled:
+                # 부분 결과는 캐시하지 않음 (다음 요청이 덜 로드된 목록을 받지 않도록)
+                self._loading_progress[progress_key] = {
+                    'status': 'cancelled',
+                    'count': len(unique_reviews),
+                    'message': f'🛑 취소됨 - {len(unique_reviews)}개 리뷰까지 로드',
+                    'timestamp': datetime.now(),
+                    'user_id': current_user_id
+                }
+                self._report_progress(progress_key, progress_callback)
+                return {
+                    'reviews': unique_reviews,
+                    'total': total_count if total_count > 0 else len(unique_reviews),
+                    'cancelled': True
+                }
+            
             # 🚀 STEP 5: Update Cache (Specific to filter)
-            self._reviews_cache[cache_key] = {
-                'data': unique_reviews,
-                'time': datetime.now(),
-                'total': total_count if total_count > 0 else len(unique_reviews)
-            }
-            print(f"💾 Cached {len(unique_reviews)} reviews for {cache_key}")
+            cached = self._reviews_cache.put(
+                current_user_id,
+                cache_key,
+                unique_reviews,
+                total=total_count if total_count > 0 else len(unique_reviews)
+            )
+            print(f"💾 Cached {len(unique_reviews)} reviews for {cache_key} (user: {current_user_id})")
+            
+            # 마지막 로드 결과를 DB에도 저장 (다른 프로세스 / 재시작 후 자동 답글 대상 조회용)
+            from utils.db import save_naver_reviews
+            save_naver_reviews(current_user_id, place_id, unique_reviews, cached.total, datetime.utcnow())
             
             # 🚀 Return ALL reviews (frontend will handle filtering + pagination)
             # This allows filter to work across all loaded reviews
             
             # 🚀 Mark as completed
-            self._loading_progress[place_id] = {
+            self._loading_progress[progress_key] = {
                 'status': 'completed',
                 'count': len(unique_reviews),
                 'message': f'✅ {len(unique_reviews)}개 리뷰 로드 완료!',
-                'timestamp': datetime.now()
+                'timestamp': datetime.now(),
+                'user_id': current_user_id
             }
+            self._report_progress(progress_key, progress_callback)
             
             return {
                 'reviews': unique_reviews,  # Return ALL reviews (not paginated)
-                'total': self._reviews_cache[cache_key]['total']
+                'total': cached.total
             }
         
         except Exception as e:
             print(f"❌ Error: {e}")
+            debug_artifacts.capture(driver, f"reviews_{place_id}", debug=debug, error=str(e))
             # 🚀 Mark as error
-            self._loading_progress[place_id] = {
+            self._loading_progress[progress_key] = {
                 'status': 'error',
                 'count': 0,
                 'message': f'❌ 오류: {str(e)[:50]}',
-                'timestamp': datetime.now()
+                'timestamp': datetime.now(),
+                'user_id': current_user_id
             }
+            self._report_progress(progress_key, progress_callback)
             raise HTTPException(status_code=500, detail=str(e))
         
         finally:
@@ -1424,18 +1616,21 @@ class NaverPlaceAutomationSelenium:
             elif driver and driver_is_persistent:
                 print("♻️ Keeping persistent browser alive")
     
-    def post_reply_by_composite(self, place_id: str, author: str, date: str, content: str, reply_text: str, user_id: str = None, expected_count: int = 50) -> Dict:
+    def post_reply_by_composite(self, place_id: str, author: str, date: str, content: str, reply_text: str, user_id: str = None, expected_count: int = 50, debug: bool = False, cancel_check: Optional[Callable[[], bool]] = None) -> Dict:
         """
         작성자 + 날짜 + 내용 3중 매칭으로 답글 게시 (가장 확실한 방법)
         expected_count만큼 리뷰를 렌더링하여 찾기
-        """
-        import re
-        
-        # 🔒 현재 user_id 미리 저장 (race condition 방지)
-        if user_id:
-            self.set_active_user(user_id)
-        current_user_id = self.active_user_id
+        debug=True면 게시 후 화면을 debug_artifacts로 저장
+        cancel_check가 True를 반환하면 리뷰 검색 중 / 답글 입력 전에 중단 ('cancelled': True)
         
+        🔒 같은 계정의 답글은 하나씩 (같은 브라우저), 다른 계정은 병렬로 게시
+        """
+        # 🔒 active_user_id를 바꾸지 않고 이 호출의 계정만 사용 (다른 계정 작업과 race 방지)
+        current_user_id = user_id or self.active_user_id
+        with self._browser_locks.hold(current_user_id):
+            return self._post_reply_by_composite(place_id, author, date, content, reply_text, current_user_id, expected_count, debug, cancel_check)
+    
+    def _post_reply_by_composite(self, place_id: str, author: str, date: str, content: str, reply_text: str, current_user_id: str, expected_count: int, debug: bool, cancel_check: Optional[Callable[[], bool]]) -> Dict:
         driver = None
         driver_is_persistent = False
         
@@ -1443,175 +1638,349 @@ class NaverPlaceAutomationSelenium:
             print(f"💬 Posting reply to: {author} ({date}) for user: {current_user_id}")
             print(f"🎯 Target: {expected_count} reviews to render")
             
-            # 🚀 PERSISTENT BROWSER: 먼저 기존 브라우저 확인
-            from services.persistent_browser_manager import browser_manager
-            
-            driver = browser_manager.get_browser(current_user_id)
-            
-            if driver:
-                print(f"♻️ Reusing persistent browser for {current_user_id}")
-                driver_is_persistent = True
-            else:
-                print(f"🆕 Creating new browser for {current_user_id} (no persistent browser)")
-                driver = self._create_driver(headless=True, user_id=current_user_id)
-                driver_is_persistent = False
-            
-            # Go to reviews page with "미등록" filter (hasReply=false)
-            # 🚀 URL 파라미터로 미답글 리뷰만 필터링 (UI 조작보다 훨씬 안정적!)
-            reviews_url = f'https://new.smartplace.naver.com/bizes/place/{place_id}/reviews?menu=visitor&hasReply=false'
-            print(f"🔗 Opening: {reviews_url}")
-            print(f"   ✅ Filter: hasReply=false (unreplied reviews only)")
-            driver.get(reviews_url)
-            time.sleep(3)
-            
-            # Handle popup
-            try:
-                popup_btn = driver.find_element(By.CSS_SELECTOR, "button.Modal_btn_confirm__uQZFR")
-                if popup_btn.is_displayed():
-                    driver.execute_script("arguments[0].click();", popup_btn)
-                    time.sleep(1)
-            except:
-                pass
-            
-            # 🚀 URL 파라미터로 필터가 이미 적용됨 (hasReply=false)
-            # UI 조작 불필요! 훨씬 빠르고 안정적
-            print("✅ Filter applied via URL parameter (hasReply=false)")
-            
-            # 🚀 점진적 로딩 전략: 10개씩 렌더링하면서 찾기 (속도 향상!)
-            print(f"🚀 Progressive loading: Searching in chunks of 10 reviews...")
+            driver, driver_is_persistent = self._get_reply_driver(current_user_id)
+            self._open_unreplied_reviews(driver, place_id)
+            
+            position_hint = self._reviews_cache.unreplied_position(current_user_id, place_id, author, date)
+            target_review = self._find_review_for_reply(driver, author, date, content, expected_count, cancel_check, position_hint)
+            if target_review is None:
+                return {'success': False, 'cancelled': True, 'message': '답글 게시가 취소되었습니다 (리뷰 검색 중)'}
+            
+            # ⏳ 이 계정의 게시 간격 확보 (대기 중 취소되면 아래에서 종료)
+            self._post_rate_limiter.acquire(current_user_id, cancel_check)
+            
+            # 🛑 답글 입력 전 마지막 취소 확인 (입력을 시작하면 끝까지 진행)
+            if cancel_check is not None and cancel_check():
+                print("🛑 Reply cancelled before typing")
+                return {'success': False, 'cancelled': True, 'message': '답글 게시가 취소되었습니다 (입력 전)'}
+            
+            verification = self._submit_reply(driver, target_review, author, date, reply_text)
+            debug_artifacts.capture(driver, f"reply_{place_id}", debug=debug)
+            
+            print(f"✅ Reply posted and verified successfully!")
+            # 🚀 캐시에서 이 리뷰만 답글 완료로 갱신 (전체 무효화 X)
+            self._reviews_cache.mark_replied(
+                current_user_id,
+                place_id,
+                reply_text,
+                datetime.now().strftime('%Y. %m. %d'),
+                author=author,
+                date=date
+            )
+            return {
+                'success': True,
+                'message': 'Reply posted and verified successfully',
+                **verification
+            }
             
-            # 🔧 날짜에서 요일 제거 (비교 전) - 한 번만 실행
-            date_clean = re.sub(r'\([^)]*\)', '', date).strip()
-            author_prefix = author[:min(3, len(author))]
-            print(f"🎯 Target: author='{author_prefix}...', date='{date_clean}'")
+        except Exception as e:
+            error_msg = str(e)
+            print(f"❌ Error posting reply: {error_msg}")
+            logger.error(f"Error posting reply: {error_msg}")
+            debug_artifacts.capture(driver, f"reply_{place_id}", debug=debug, error=error_msg)
+            raise HTTPException(status_code=500, detail=f"Error posting reply: {error_msg}")
+        
+        finally:
+            # 🚀 PERSISTENT BROWSER: persistent browser는 닫지 않음!
+            if driver and not driver_is_persistent:
+                try:
+                    print("🔄 Closing temporary browser...")
+                    driver.quit()
+                    print("✅ Temporary browser closed")
+                except Exception as e:
+                    print(f"⚠️ Error closing driver: {e}")
+            elif driver and driver_is_persistent:
+                print("♻️ Keeping persistent browser alive")
+    
+    def post_replies_batch(self, place_id: str, items: List[Dict], user_id: str = None, expected_count: int = 50, debug: bool = False, progress_callback: Optional[Callable[[Dict], None]] = None, cancel_check: Optional[Callable[[], bool]] = None, resolve_reply: Optional[Callable[[int, Dict], str]] = None) -> Dict:
+        """
+        여러 답글을 한 번의 페이지 세션에서 순서대로 게시 (items: author, date, content, reply_text)
+        미답글 목록(hasReply=false)은 한 번만 열고, 리뷰마다 검색 → 입력 → 검증만 반복
+        
+        reply_text가 없는 항목은 게시 직전에 resolve_reply(index, item)로 답글을 받음
+        (자동 답글: LLM 생성이 끝나길 기다리는 동안 앞 항목 게시가 진행됨)
+        
+        - 항목별 결과는 results에 기록 (posted / failed / cancelled) - 한 항목 실패가 나머지를 막지 않음
+        - 항목이 실패하면 페이지를 다시 열어 열린 답글 폼 등을 정리한 뒤 다음 항목 진행
+        - cancel_check가 True를 반환하면 남은 항목은 cancelled로 표시하고 종료
+        
+        🔒 post_reply_by_composite와 같은 계정 브라우저 락 사용 (같은 브라우저에서 하나씩)
+        """
+        current_user_id = user_id or self.active_user_id
+        with self._browser_locks.hold(current_user_id):
+            return self._post_replies_batch(place_id, items, current_user_id, expected_count, debug, progress_callback, cancel_check, resolve_reply)
+    
+    def _post_replies_batch(self, place_id: str, items: List[Dict], current_user_id: str, expected_count: int, debug: bool, progress_callback: Optional[Callable[[Dict], None]], cancel_check: Optional[Callable[[], bool]], resolve_reply: Optional[Callable[[int, Dict], str]] = None) -> Dict:
+        driver = None
+        driver_is_persistent = False
+        results: List[Dict] = []
+        cancelled = False
+        
+        def report(message: str):
+            if progress_callback:
+                progress_callback({'count': len(results), 'message': message})
+        
+        try:
+            print(f"💬 Posting {len(items)} replies in one session for user: {current_user_id}")
+            driver, driver_is_persistent = self._get_reply_driver(current_user_id)
+            self._open_unreplied_reviews(driver, place_id)
             
-            scroll_count = 0
-            max_scrolls = 20
-            target_review = None
-            batch_size = 10  # 10개씩 처리
-            last_check_count = 0  # 마지막으로 확인한 리뷰 개수
-            consecutive_no_load = 0  # 🔧 연속으로 새 리뷰가 로드되지 않은 횟수
+            # 📍 위치 힌트는 페이지를 연 시점 기준 (게시한 리뷰도 새로고침 전까지는 목록에 남아 있음)
+            def position_hints(start: int) -> Dict[int, Optional[int]]:
+                return {
+                    i: self._reviews_cache.unreplied_position(current_user_id, place_id, items[i]['author'], items[i]['date'])
+                    for i in range(start, len(items))
+                }
+            hints = position_hints(0)
             
-            while scroll_count < max_scrolls and not target_review:
-                # 현재 페이지의 모든 요소 가져오기
-                all_lis = driver.find_elements(By.TAG_NAME, "li")
-                
-                # 유효한 리뷰만 필터링 (작성자 요소가 있는 것)
-                valid_reviews = []
-                for li in all_lis:
-                    try:
-                        li.find_element(By.CLASS_NAME, "pui__JiVbY3")
-                        valid_reviews.append(li)
-                    except:
-                        continue
+            for index, item in enumerate(items):
+                author, date = item['author'], item['date']
+                result = {'index': index, 'author': author, 'date': date}
                 
-                current_count = len(valid_reviews)
-                newly_loaded = current_count - last_check_count
-                
-                print(f"  📦 Batch {scroll_count + 1}: {current_count} total reviews ({newly_loaded} newly loaded)")
-                
-                # 🔧 연속 0개 카운트 업데이트
-                if newly_loaded == 0:
-                    consecutive_no_load += 1
-                else:
-                    consecutive_no_load = 0  # 리셋
+                if cancel_check is not None and cancel_check():
+                    cancelled = True
+                    break
                 
-                # 🔍 새로 로드된 리뷰에서만 검색 (효율적!)
-                search_start_idx = max(0, last_check_count)
-                search_reviews = valid_reviews[search_start_idx:]
+                try:
+                    reply_text = item.get('reply_text') or resolve_reply(index, item)
+                except Exception as e:
+                    # 답글을 받지 못함 (생성 실패) → 페이지는 그대로 두고 다음 항목
+                    result.update(status='failed', error=str(e))
+                    results.append(result)
+                    continue
+                if cancel_check is not None and cancel_check():
+                    cancelled = True
+                    break
                 
-                if search_reviews:
-                    print(f"  🔍 Searching in reviews [{search_start_idx}:{current_count}]...")
-                    
-                    # 🎯 타겟 리뷰 찾기 (작성자 + 날짜 + 내용 매칭)
-                    for idx, li in enumerate(search_reviews):
-                        try:
-                            # 작성자 가져오기
-                            try:
-                                li_author = li.find_element(By.CLASS_NAME, "pui__JiVbY3").text.strip()
-                            except:
-                                continue
-                            
-                            # 날짜 가져오기
-                            li_date = ""
-                            try:
-                                d_elems = li.find_elements(By.CLASS_NAME, "pui__m7nkds")
-                                for d in d_elems:
-                                    if re.search(r'20\d{2}\.', d.text):
-                                        li_date = d.text.strip()
-                                        break
-                            except:
-                                continue
-                            
-                            # 🚀 작성자 + 날짜 매칭 (요일 제거, 작성자 부분 일치)
-                            li_date_clean = re.sub(r'\([^)]*\)', '', li_date).strip()
-                            
-                            # 작성자 매칭 (앞 3글자) - author_prefix는 위에서 이미 정의됨
-                            author_match = li_author.startswith(author_prefix)
-                            date_match = li_date_clean == date_clean
-                            
-                            # 내용 매칭 (있으면)
-                            content_match = True
-                            if content and len(content) > 10:
-                                try:
-                                    li_content = li.find_element(By.CLASS_NAME, "pui__vn15t2").text.strip()
-                                    content_match = content[:50] in li_content[:100]
-                                except:
-                                    content_match = True
-                            
-                            # 🎯 매칭 성공!
-                            if author_match and date_match and content_match:
-                                print(f"  ✅ Found at position {search_start_idx + idx}: '{li_author}' ({li_date_clean})")
-                                target_review = li
-                                break
-                                
-                        except Exception as e:
-                            # 개별 리뷰 파싱 실패 시 계속 진행 (에러 방지)
-                            continue
-                    
-                    if target_review:
-                        print(f"🎉 Target review found after {scroll_count + 1} batches!")
+                report(f'답글 게시 중... ({index + 1}/{len(items)}) {author}')
+                try:
+                    target_review = self._find_review_for_reply(driver, author, date, item.get('content', ''), expected_count, cancel_check, hints.get(index))
+                    if target_review is None:
+                        cancelled = True
                         break
-                
-                # 🚀 목표 개수에 도달했거나 더 이상 로드할 것이 없으면 중단
-                if current_count >= expected_count:
-                    print(f"  ℹ️ Reached expected count: {current_count} >= {expected_count}")
-                    if not target_review:
-                        print(f"  ⚠️ Target not found yet, searching all loaded reviews...")
-                        # 전체 다시 검색 (혹시 놓친 것이 있을 수 있음)
+                    
+                    # ⏳ 이 계정의 게시 간격 확보
+                    if self._post_rate_limiter.acquire(current_user_id, cancel_check) is None:
+                        cancelled = True
                         break
-                    else:
+                    
+                    verification = self._submit_reply(driver, target_review, author, date, reply_text)
+                    self._reviews_cache.mark_replied(
+                        current_user_id,
+                        place_id,
+                        reply_text,
+                        datetime.now().strftime('%Y. %m. %d'),
+                        author=author,
+                        date=date
+                    )
+                    result.update(status='posted', **verification)
+                    print(f"✅ [{index + 1}/{len(items)}] Reply posted: {author} ({date})")
+                except Exception as e:
+                    result.update(status='failed', error=str(e))
+                    print(f"❌ [{index + 1}/{len(items)}] Reply failed: {author} ({date}) - {e}")
+                    debug_artifacts.capture(driver, f"reply_batch_{place_id}_{index}", debug=debug, error=str(e))
+                    # 열린 답글 폼 / 어긋난 스크롤 정리 후 다음 항목
+                    try:
+                        self._open_unreplied_reviews(driver, place_id)
+                        hints = position_hints(index + 1)
+                    except Exception as reload_error:
+                        print(f"⚠️ Could not reload reviews page: {reload_error}")
+                results.append(result)
+            
+            if cancelled:
+                print(f"🛑 Reply batch cancelled after {len(results)}/{len(items)} items")
+                for index in range(len(results), len(items)):
+                    results.append({'index': index, 'author': items[index]['author'], 'date': items[index]['date'], 'status': 'cancelled'})
+            
+            debug_artifacts.capture(driver, f"reply_batch_{place_id}", debug=debug)
+        
+        except Exception as e:
+            # 브라우저 생성 / 페이지 열기 실패 → 개별 결과 대신 작업 전체 실패
+            error_msg = str(e)
+            print(f"❌ Error posting reply batch: {error_msg}")
+            logger.error(f"Error posting reply batch: {error_msg}")
+            debug_artifacts.capture(driver, f"reply_batch_{place_id}", debug=debug, error=error_msg)
+            raise HTTPException(status_code=500, detail=f"Error posting reply batch: {error_msg}")
+        
+        finally:
+            if driver and not driver_is_persistent:
+                try:
+                    driver.quit()
+                    print("🔒 Closed temporary browser")
+                except Exception as e:
+                    print(f"⚠️ Error closing driver: {e}")
+        
+        posted = sum(1 for r in results if r['status'] == 'posted')
+        failed = sum(1 for r in results if r['status'] == 'failed')
+        return {
+            'success': failed == 0 and not cancelled,
+            'cancelled': cancelled,
+            'total': len(items),
+            'posted': posted,
+            'failed': failed,
+            'results': results
+        }
+    
+    def _get_reply_driver(self, current_user_id: str):
+        """Persistent browser of the account if there is one, otherwise a temporary driver -> (driver, is_persistent)"""
+        # 🚀 PERSISTENT BROWSER: 먼저 기존 브라우저 확인
+        from services.persistent_browser_manager import browser_manager
+        
+        driver = browser_manager.get_browser(current_user_id)
+        
+        if driver:
+            print(f"♻️ Reusing persistent browser for {current_user_id}")
+            driver_is_persistent = True
+        else:
+            print(f"🆕 Creating new browser for {current_user_id} (no persistent browser)")
+            driver = self._create_driver(headless=True, user_id=current_user_id)
+            driver_is_persistent = False
+        return driver, driver_is_persistent
+    
+    def _open_unreplied_reviews(self, driver, place_id: str, has_reply: bool = False):
+        """Open the unreplied (hasReply=false) review list and dismiss the popup (has_reply=True → 답글 등록된 목록)"""
+        # Go to reviews page with "미등록" filter (hasReply=false)
+        # 🚀 URL 파라미터로 미답글 리뷰만 필터링 (UI 조작보다 훨씬 안정적!)
+        has_reply_param = 'true' if has_reply else 'false'
+        reviews_url = f'https://new.smartplace.naver.com/bizes/place/{place_id}/reviews?menu=visitor&hasReply={has_reply_param}'
+        print(f"🔗 Opening: {reviews_url}")
+        print(f"   ✅ Filter: hasReply={has_reply_param} ({'replied' if has_reply else 'unreplied'} reviews only)")
+        driver.get(reviews_url)
+        time.sleep(3)
+        
+        # Handle popup
+        try:
+            popup_btn = driver.find_element(By.CSS_SELECTOR, "button.Modal_btn_confirm__uQZFR")
+            if popup_btn.is_displayed():
+                driver.execute_script("arguments[0].click();", popup_btn)
+                time.sleep(1)
+        except:
+            pass
+        
+        # 🚀 URL 파라미터로 필터가 이미 적용됨 (hasReply=false)
+        # UI 조작 불필요! 훨씬 빠르고 안정적
+        print(f"✅ Filter applied via URL parameter (hasReply={has_reply_param})")
+    
+    def find_replied_reviews(self, place_id: str, items: List[Dict], user_id: str = None, expected_count: int = 50,
+                             cancel_check: Optional[Callable[[], bool]] = None) -> List[int]:
+        """
+        Indices of items that already have a reply (items: author, date, content)
+        
+        답글 게시 재시도에서 미답글 목록(hasReply=false)에 리뷰가 없을 때 사용
+        → 이전 시도(검증 실패 / 중단된 워커)가 실제로는 게시했는지 답글 등록된 목록(hasReply=true)에서 확인
+        
+        - 리뷰 캐시에 답글이 있는 것으로 나오면 브라우저 확인 없이 포함
+        - 나머지는 답글 등록된 목록을 한 번 열고 리뷰마다 검색 (못 찾으면 포함하지 않음)
+        
+        🔒 post_replies_batch와 같은 계정 브라우저 락 사용 (같은 브라우저에서 하나씩)
+        """
+        current_user_id = user_id or self.active_user_id
+        replied = [
+            index for index, item in enumerate(items)
+            if self._reviews_cache.is_replied(current_user_id, place_id, item['author'], item['date'])
+        ]
+        remaining = [index for index in range(len(items)) if index not in replied]
+        if not remaining:
+            return replied
+        
+        with self._browser_locks.hold(current_user_id):
+            driver, driver_is_persistent = self._get_reply_driver(current_user_id)
+            try:
+                self._open_unreplied_reviews(driver, place_id, has_reply=True)
+                for index in remaining:
+                    item = items[index]
+                    try:
+                        target_review = self._find_review_for_reply(driver, item['author'], item['date'], item.get('content', ''), expected_count, cancel_check)
+                    except Exception as e:
+                        print(f"🔍 No posted reply found: {item['author']} ({item['date']}) - {e}")
+                        continue
+                    if target_review is None:
                         break
-                
-                # 🔧 FIX: expected_count를 고려하여 중단 결정
-                # 연속 3번 새 리뷰가 없고, 스크롤을 충분히 시도했으면 중단
-                if consecutive_no_load >= 3 and scroll_count >= 5:
-                    if current_count < expected_count:
-                        print(f"  ⚠️ Loaded only {current_count}/{expected_count}, but no more reviews available")
-                    else:
-                        print(f"  ℹ️ No new reviews loaded for {consecutive_no_load} attempts, stopping scroll")
-                    break
-                
-                # 다음 배치를 위해 스크롤
-                last_check_count = current_count
-                driver.execute_script("window.scrollBy(0, 1500);")
-                time.sleep(1.5)  # 🔧 1초 → 1.5초로 증가 (네이버 동적 로딩 대기)
-                scroll_count += 1
+                    print(f"✅ Reply already posted: {item['author']} ({item['date']})")
+                    replied.append(index)
+            finally:
+                if not driver_is_persistent:
+                    try:
+                        driver.quit()
+                    except Exception as e:
+                        print(f"⚠️ Error closing driver: {e}")
+        return sorted(replied)
+    
+    def _find_review_for_reply(self, driver, author: str, date: str, content: str, expected_count: int, cancel_check: Optional[Callable[[], bool]] = None, position_hint: Optional[int] = None):
+        """
+        작성자 + 날짜 + 내용 3중 매칭으로 현재 페이지에서 리뷰 <li> 찾기
+        position_hint(마지막 로드 기준 미답글 목록 위치)가 있으면 그 위치로 바로 이동해 확인하고,
+        없거나 빗나가면 이미 렌더링된 리뷰부터 expected_count까지 스크롤하며 검색
+        
+        Returns: 리뷰 요소, 취소되면 None (못 찾으면 Exception)
+        """
+        if position_hint is not None and settings.reply_locate_window > 0:
+            started = time.monotonic()
+            target_review = self._locate_review_by_position(driver, author, date, content, position_hint, cancel_check)
+            metrics.observe('reply.locate_seconds', time.monotonic() - started)
+            if target_review is not None:
+                metrics.incr('reply.locate.direct')
+                return target_review
+            if cancel_check is not None and cancel_check():
+                return None
+            metrics.incr('reply.locate.fallback')
+            print(f"⚠️ Review not at expected position {position_hint}, falling back to linear search")
+        
+        # 🚀 점진적 로딩 전략: 10개씩 렌더링하면서 찾기 (속도 향상!)
+        print(f"🚀 Progressive loading: Searching in chunks of 10 reviews...")
+        
+        # 🔧 날짜에서 요일 제거 (비교 전) - 한 번만 실행
+        date_clean = re.sub(r'\([^)]*\)', '', date).strip()
+        author_prefix = author[:min(3, len(author))]
+        print(f"🎯 Target: author='{author_prefix}...', date='{date_clean}'")
+        
+        scroll_count = 0
+        max_scrolls = 20
+        target_review = None
+        batch_size = 10  # 10개씩 처리
+        last_check_count = 0  # 마지막으로 확인한 리뷰 개수
+        consecutive_no_load = 0  # 🔧 연속으로 새 리뷰가 로드되지 않은 횟수
+        
+        while scroll_count < max_scrolls and not target_review:
+            # 🛑 취소 요청 → 검색 중단
+            if cancel_check is not None and cancel_check():
+                print(f"🛑 Reply cancelled while searching ({scroll_count} scrolls)")
+                return None
             
-            # 🔍 타겟을 못 찾았으면 전체 다시 검색 (안전장치)
-            if not target_review:
-                print(f"⚠️ Not found in progressive search, searching all {len(valid_reviews)} reviews...")
-                
-                # 맨 위로 스크롤
-                driver.execute_script("window.scrollTo(0, 0);")
-                time.sleep(1)
-                
-                all_lis = driver.find_elements(By.TAG_NAME, "li")
-                print(f"📋 Found {len(all_lis)} total elements on page")
+            # 현재 페이지의 모든 요소 가져오기
+            all_lis = driver.find_elements(By.TAG_NAME, "li")
+            
+            # 유효한 리뷰만 필터링 (작성자 요소가 있는 것)
+            valid_reviews = []
+            for li in all_lis:
+                try:
+                    li.find_element(By.CLASS_NAME, "pui__JiVbY3")
+                    valid_reviews.append(li)
+                except:
+                    continue
+            
+            current_count = len(valid_reviews)
+            newly_loaded = current_count - last_check_count
+            
+            print(f"  📦 Batch {scroll_count + 1}: {current_count} total reviews ({newly_loaded} newly loaded)")
+            
+            # 🔧 연속 0개 카운트 업데이트
+            if newly_loaded == 0:
+                consecutive_no_load += 1
+            else:
+                consecutive_no_load = 0  # 리셋
+            
+            # 🔍 새로 로드된 리뷰에서만 검색 (효율적!)
+            search_start_idx = max(0, last_check_count)
+            search_reviews = valid_reviews[search_start_idx:]
+            
+            if search_reviews:
+                print(f"  🔍 Searching in reviews [{search_start_idx}:{current_count}]...")
                 
-                for li in all_lis:
+                # 🎯 타겟 리뷰 찾기 (작성자 + 날짜 + 내용 매칭)
+                for idx, li in enumerate(search_reviews):
                     try:
-                        # 작성자 가져오기 (한국어, *, 영어 모두 처리)
+                        # 작성자 가져오기
                         try:
                             li_author = li.find_element(By.CLASS_NAME, "pui__JiVbY3").text.strip()
                         except:
@@ -1628,10 +1997,10 @@ class NaverPlaceAutomationSelenium:
                         except:
                             continue
                         
-                        # 🚀 작성자 + 날짜 매칭 (요일 제거) - 변수는 이미 위에서 정의됨
+                        # 🚀 작성자 + 날짜 매칭 (요일 제거, 작성자 부분 일치)
                         li_date_clean = re.sub(r'\([^)]*\)', '', li_date).strip()
                         
-                        # 🚀 3중 매칭: 작성자(부분) + 날짜 + 내용(부분)
+                        # 작성자 매칭 (앞 3글자) - author_prefix는 위에서 이미 정의됨
                         author_match = li_author.startswith(author_prefix)
                         date_match = li_date_clean == date_clean
                         
@@ -1642,198 +2011,278 @@ class NaverPlaceAutomationSelenium:
                                 li_content = li.find_element(By.CLASS_NAME, "pui__vn15t2").text.strip()
                                 content_match = content[:50] in li_content[:100]
                             except:
-                                content_match = True  # 내용 없으면 패스
+                                content_match = True
                         
+                        # 🎯 매칭 성공!
                         if author_match and date_match and content_match:
-                            print(f"✅ Found review (fallback): author='{li_author}' (starts with '{author_prefix}'), date='{li_date_clean}'")
+                            print(f"  ✅ Found at position {search_start_idx + idx}: '{li_author}' ({li_date_clean})")
                             target_review = li
                             break
                             
-                    except:
+                    except Exception as e:
+                        # 개별 리뷰 파싱 실패 시 계속 진행 (에러 방지)
                         continue
-            
-            if not target_review:
-                # 에러 메시지 (date_clean, author_prefix는 이미 정의됨)
-                print(f"❌ Could not find review!")
-                print(f"   Looking for: author starts with '{author_prefix}', date='{date_clean}'")
-                print(f"   Original: author='{author}', date='{date}'")
-                print(f"⚠️ Debugging - first 5 reviews on page:")
                 
-                # 디버깅: 페이지의 모든 리뷰 출력
-                for idx, li in enumerate(all_lis[:5]):
-                    try:
-                        debug_author = li.find_element(By.CLASS_NAME, "pui__JiVbY3").text.strip()
-                        debug_date = ""
-                        d_elems = li.find_elements(By.CLASS_NAME, "pui__m7nkds")
-                        for d in d_elems:
-                            if re.search(r'20\d{2}\.', d.text):
-                                debug_date = d.text.strip()
-                                break
-                        debug_date_clean = re.sub(r'\([월화수목금토일]\)', '', debug_date).strip()
-                        print(f"  [{idx}] Author: '{debug_author}', Date: '{debug_date}' (clean: '{debug_date_clean}')")
-                    except:
-                        pass
-                
-                raise Exception(f"Could not find review: author='{author_prefix}...', date='{date_clean}'")
+                if target_review:
+                    print(f"🎉 Target review found after {scroll_count + 1} batches!")
+                    break
             
-            # Scroll to review
-            print("📜 Scrolling to review...")
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", target_review)
-            time.sleep(1)
+            # 🚀 목표 개수에 도달했거나 더 이상 로드할 것이 없으면 중단
+            if current_count >= expected_count:
+                print(f"  ℹ️ Reached expected count: {current_count} >= {expected_count}")
+                if not target_review:
+                    print(f"  ⚠️ Target not found yet, searching all loaded reviews...")
+                    # 전체 다시 검색 (혹시 놓친 것이 있을 수 있음)
+                    break
+                else:
+                    break
             
-            # 🛡️ 답글이 이미 있는지 확인
-            print("🔍 Checking if reply already exists...")
-            try:
-                existing_reply = target_review.find_element(By.CLASS_NAME, "pui__GbW8H7")
-                if existing_reply:
-                    print("⚠️ Reply already exists!")
-                    raise Exception("이미 답글이 존재하는 리뷰입니다. 답글을 수정하려면 네이버에서 직접 수정해주세요.")
-            except Exception as e:
-                if "이미 답글이 존재" in str(e):
-                    raise
-                # 답글이 없으면 정상 (NoSuchElementException)
-                print("✅ No existing reply, safe to proceed")
+            # 🔧 FIX: expected_count를 고려하여 중단 결정
+            # 연속 3번 새 리뷰가 없고, 스크롤을 충분히 시도했으면 중단
+            if consecutive_no_load >= 3 and scroll_count >= 5:
+                if current_count < expected_count:
+                    print(f"  ⚠️ Loaded only {current_count}/{expected_count}, but no more reviews available")
+                else:
+                    print(f"  ℹ️ No new reviews loaded for {consecutive_no_load} attempts, stopping scroll")
+                break
             
-            # 🚀 CRITICAL: "답글 쓰기" 버튼 찾기 및 클릭
-            print("🖱️  Finding '답글' button...")
-            reply_btn = None
+            # 다음 배치를 위해 스크롤
+            last_check_count = current_count
+            driver.execute_script("window.scrollBy(0, 1500);")
+            time.sleep(1.5)  # 🔧 1초 → 1.5초로 증가 (네이버 동적 로딩 대기)
+            scroll_count += 1
+        
+        # 🔍 타겟을 못 찾았으면 전체 다시 검색 (안전장치)
+        if not target_review:
+            print(f"⚠️ Not found in progressive search, searching all {len(valid_reviews)} reviews...")
             
-            # 여러 가지 방법으로 시도 (안정성 향상)
-            try:
-                # 방법 1: "답글" 텍스트 포함
-                reply_btn = target_review.find_element(By.XPATH, ".//button[contains(., '답글')]")
-                print("✅ Found by '답글' text")
-            except:
+            # 맨 위로 스크롤
+            driver.execute_script("window.scrollTo(0, 0);")
+            time.sleep(1)
+            
+            all_lis = driver.find_elements(By.TAG_NAME, "li")
+            print(f"📋 Found {len(all_lis)} total elements on page")
+            
+            for li in all_lis:
                 try:
-                    # 방법 2: "답글 쓰기" 전체 텍스트
-                    reply_btn = target_review.find_element(By.XPATH, ".//button[contains(., '답글 쓰기')]")
-                    print("✅ Found by '답글 쓰기' text")
-                except:
+                    # 작성자 가져오기 (한국어, *, 영어 모두 처리)
                     try:
-                        # 방법 3: "답글달기" (띄어쓰기 없는 경우)
-                        reply_btn = target_review.find_element(By.XPATH, ".//button[contains(., '답글달기')]")
-                        print("✅ Found by '답글달기' text")
+                        li_author = li.find_element(By.CLASS_NAME, "pui__JiVbY3").text.strip()
                     except:
-                        print("❌ Could not find reply button")
-                        raise Exception("답글 버튼을 찾을 수 없습니다. 이미 답글이 있거나 페이지 로딩이 완료되지 않았습니다.")
-            
-            # 버튼 클릭
-            print("🖱️  Clicking reply button...")
-            driver.execute_script("arguments[0].click();", reply_btn)
-            time.sleep(2)
-            print("✅ Reply form opened")
-            
-            # Fill textarea (실제 키 입력으로 React 이벤트 트리거)
-            print("⌨️  Waiting for textarea...")
-            textarea = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "textarea"))
-            )
-            
-            # 🛡️ BMP 문자 필터링 (이모지 및 특수 문자 제거)
-            def remove_non_bmp(text):
-                """
-                ChromeDriver가 지원하지 않는 BMP 밖의 문자 제거
-                (이모지, 특수 유니코드 등)
-                """
-                # BMP 범위: U+0000 ~ U+FFFF
-                return ''.join(c for c in text if ord(c) <= 0xFFFF)
-            
-            # 원본 텍스트 보관 (로깅용)
-            original_reply_text = reply_text
-            
-            # 🔥 BMP 필터링 (에러 방지)
-            reply_text_safe = remove_non_bmp(reply_text)
-            
-            # 필터링 결과 로깅
-            if len(reply_text_safe) < len(original_reply_text):
-                removed_chars = len(original_reply_text) - len(reply_text_safe)
-                print(f"⚠️  Removed {removed_chars} non-BMP characters (emojis/special chars)")
-            
-            print(f"⌨️  Filling reply with send_keys: {reply_text_safe[:30]}...")
-            
-            # 🚀 STRATEGY: textarea에 focus를 주고 클릭한 다음 입력
-            driver.execute_script("arguments[0].focus();", textarea)
-            driver.execute_script("arguments[0].click();", textarea)
-            time.sleep(0.3)
-            
-            textarea.clear()
-            time.sleep(0.5)
-            
-            # 🚀 CRITICAL: send_keys()로 실제 키 입력 (React 이벤트 트리거)
-            # 필터링된 텍스트 사용 (BMP만)
-            textarea.send_keys(reply_text_safe)
-            time.sleep(1)
-            
-            # 🔍 검증: 텍스트가 실제로 입력되었는지 확인
-            actual_value = driver.execute_script("return arguments[0].value;", textarea)
-            if len(actual_value) < 10:
-                print(f"⚠️  send_keys failed (value: {len(actual_value)} chars)")
-                print("   🔧 Retrying with enhanced JavaScript...")
-                
-                # 🚀 더 강력한 JavaScript 입력 (React 이벤트 확실하게 트리거)
-                driver.execute_script("""
-                    const textarea = arguments[0];
-                    const text = arguments[1];
+                        continue
                     
-                    // 값 설정
-                    textarea.value = text;
+                    # 날짜 가져오기
+                    li_date = ""
+                    try:
+                        d_elems = li.find_elements(By.CLASS_NAME, "pui__m7nkds")
+                        for d in d_elems:
+                            if re.search(r'20\d{2}\.', d.text):
+                                li_date = d.text.strip()
+                                break
+                    except:
+                        continue
                     
-                    // React가 감지할 수 있도록 다양한 이벤트 트리거
-                    textarea.dispatchEvent(new Event('focus', { bubbles: true }));
-                    textarea.dispatchEvent(new Event('input', { bubbles: true }));
-                    textarea.dispatchEvent(new Event('change', { bubbles: true }));
-                    textarea.dispatchEvent(new Event('blur', { bubbles: true }));
+                    # 🚀 작성자 + 날짜 매칭 (요일 제거) - 변수는 이미 위에서 정의됨
+                    li_date_clean = re.sub(r'\([^)]*\)', '', li_date).strip()
                     
-                    // React 16+ 대응: nativeEvent descriptor 설정
-                    const inputEvent = new InputEvent('input', {
-                        data: text,
-                        inputType: 'insertText',
-                        bubbles: true,
-                        cancelable: true
-                    });
-                    textarea.dispatchEvent(inputEvent);
-                """, textarea, reply_text_safe)
-                
-                time.sleep(1)  # React 상태 업데이트 대기
-                actual_value = driver.execute_script("return arguments[0].value;", textarea)
-                print(f"   ✅ After enhanced JS: {len(actual_value)} chars")
-                
-                if len(actual_value) < 10:
-                    raise Exception(f"Failed to fill textarea (value: {len(actual_value)} chars)")
-            else:
-                print(f"✅ Text input verified: {len(actual_value)} chars")
+                    # 🚀 3중 매칭: 작성자(부분) + 날짜 + 내용(부분)
+                    author_match = li_author.startswith(author_prefix)
+                    date_match = li_date_clean == date_clean
+                    
+                    # 내용 매칭 (있으면)
+                    content_match = True
+                    if content and len(content) > 10:
+                        try:
+                            li_content = li.find_element(By.CLASS_NAME, "pui__vn15t2").text.strip()
+                            content_match = content[:50] in li_content[:100]
+                        except:
+                            content_match = True  # 내용 없으면 패스
+                    
+                    if author_match and date_match and content_match:
+                        print(f"✅ Found review (fallback): author='{li_author}' (starts with '{author_prefix}'), date='{li_date_clean}'")
+                        target_review = li
+                        break
+                        
+                except:
+                    continue
+        
+        if not target_review:
+            # 에러 메시지 (date_clean, author_prefix는 이미 정의됨)
+            print(f"❌ Could not find review!")
+            print(f"   Looking for: author starts with '{author_prefix}', date='{date_clean}'")
+            print(f"   Original: author='{author}', date='{date}'")
+            print(f"⚠️ Debugging - first 5 reviews on page:")
+            
+            # 디버깅: 페이지의 모든 리뷰 출력
+            for idx, li in enumerate(all_lis[:5]):
+                try:
+                    debug_author = li.find_element(By.CLASS_NAME, "pui__JiVbY3").text.strip()
+                    debug_date = ""
+                    d_elems = li.find_elements(By.CLASS_NAME, "pui__m7nkds")
+                    for d in d_elems:
+                        if re.search(r'20\d{2}\.', d.text):
+                            debug_date = d.text.strip()
+                            break
+                    debug_date_clean = re.sub(r'\([월화수목금토일]\)', '', debug_date).strip()
+                    print(f"  [{idx}] Author: '{debug_author}', Date: '{debug_date}' (clean: '{debug_date_clean}')")
+                except:
+                    pass
             
-            # 🚀 target_review 내에서만 "등록" 찾기
-            print("📤 Finding '등록' button in target review...")
+            raise Exception(f"Could not find review: author='{author_prefix}...', date='{date_clean}'")
+        
+        return target_review
+    
+    def _locate_review_by_position(self, driver, author: str, date: str, content: str, position: int, cancel_check: Optional[Callable[[], bool]] = None):
+        """
+        위치 힌트로 리뷰 찾기: 힌트 위치까지 목록 끝으로 바로 스크롤(10개씩 스캔 X)한 뒤,
+        힌트 앞뒤 reply_locate_window개만 3중 매칭으로 검증 (여러 개 맞으면 힌트에 가장 가까운 것)
+        
+        Returns: 리뷰 요소, 힌트 근처에 없으면 None
+        """
+        window = settings.reply_locate_window
+        date_clean = re.sub(r'\([^)]*\)', '', date).strip()
+        author_prefix = author[:min(3, len(author))]
+        needed = position + window + 1
+        print(f"🎯 Jumping to expected position {position} (±{window})")
+        
+        # 🚀 목표 위치가 렌더링될 때까지 목록 끝으로 점프 (새 리뷰가 더 안 붙으면 중단)
+        count, rows = driver.execute_script(_REVIEW_WINDOW_JS, 0, 0)
+        stalled = 0
+        while count < needed and stalled < 3:
+            if cancel_check is not None and cancel_check():
+                return None
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            deadline = time.monotonic() + 1.5
+            previous = count
+            while time.monotonic() < deadline:
+                time.sleep(0.25)
+                count, rows = driver.execute_script(_REVIEW_WINDOW_JS, 0, 0)
+                if count > previous:
+                    break
+            stalled = stalled + 1 if count == previous else 0
+        
+        count, rows = driver.execute_script(_REVIEW_WINDOW_JS, position - window, position + window + 1)
+        print(f"  📦 {count} reviews rendered, checking [{max(0, position - window)}:{min(count, position + window + 1)}]")
+        
+        matches = []
+        for index, li_author, li_date, li_content in rows:
+            li_date_clean = re.sub(r'\([^)]*\)', '', li_date).strip()
+            if not li_author.startswith(author_prefix) or li_date_clean != date_clean:
+                continue
+            if content and len(content) > 10 and li_content and content[:50] not in li_content:
+                continue
+            matches.append(index)
+        
+        if not matches:
+            return None
+        
+        index = min(matches, key=lambda i: abs(i - position))
+        print(f"  ✅ Found at position {index} (expected {position})")
+        return driver.execute_script(
+            "return Array.from(document.querySelectorAll('li')).filter(li => li.querySelector('.pui__JiVbY3'))[arguments[0]];",
+            index
+        )
+    
+    def _submit_reply(self, driver, target_review, author: str, date: str, reply_text: str):
+        """Open the reply form of `target_review`, fill and submit it, then verify the reply rendered (raises on failure)"""
+        date_clean = re.sub(r'\([^)]*\)', '', date).strip()
+        author_prefix = author[:min(3, len(author))]
+        
+        # Scroll to review
+        print("📜 Scrolling to review...")
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", target_review)
+        time.sleep(1)
+        
+        # 🛡️ 답글이 이미 있는지 확인
+        print("🔍 Checking if reply already exists...")
+        try:
+            existing_reply = target_review.find_element(By.CLASS_NAME, "pui__GbW8H7")
+            if existing_reply:
+                print("⚠️ Reply already exists!")
+                raise Exception("이미 답글이 존재하는 리뷰입니다. 답글을 수정하려면 네이버에서 직접 수정해주세요.")
+        except Exception as e:
+            if "이미 답글이 존재" in str(e):
+                raise
+            # 답글이 없으면 정상 (NoSuchElementException)
+            print("✅ No existing reply, safe to proceed")
+        
+        # 🚀 CRITICAL: "답글 쓰기" 버튼 찾기 및 클릭
+        print("🖱️  Finding '답글' button...")
+        reply_btn = None
+        
+        # 여러 가지 방법으로 시도 (안정성 향상)
+        try:
+            # 방법 1: "답글" 텍스트 포함
+            reply_btn = target_review.find_element(By.XPATH, ".//button[contains(., '답글')]")
+            print("✅ Found by '답글' text")
+        except:
             try:
-                submit_btn = target_review.find_element(By.XPATH, ".//button[contains(text(), '등록')]")
-                print("✅ Found '등록' in target review")
+                # 방법 2: "답글 쓰기" 전체 텍스트
+                reply_btn = target_review.find_element(By.XPATH, ".//button[contains(., '답글 쓰기')]")
+                print("✅ Found by '답글 쓰기' text")
             except:
-                print("⚠️ Not in target, searching all visible buttons...")
-                all_btns = driver.find_elements(By.XPATH, "//button[contains(., '등록')]")
-                visible = [b for b in all_btns if b.is_displayed()]
-                submit_btn = visible[-1] if visible else None
-                if not submit_btn:
-                    raise Exception("No '등록' button found")
-                print(f"✅ Found visible '등록' (index {len(visible)-1})")
-            
-            # 🔍 등록 전 최종 검증: textarea 값 재확인
-            final_value = driver.execute_script("return arguments[0].value;", textarea)
-            print(f"🔍 Final textarea check before submit: {len(final_value)} chars")
-            if len(final_value) < 10:
-                raise Exception(f"Textarea empty before submit! (value: {len(final_value)} chars)")
-            
-            # 🔍 등록 버튼 상태 확인
-            is_disabled = submit_btn.get_attribute("disabled")
-            is_aria_disabled = submit_btn.get_attribute("aria-disabled")
-            if is_disabled or is_aria_disabled == "true":
-                print(f"❌ Submit button is disabled! (disabled={is_disabled}, aria-disabled={is_aria_disabled})")
-                raise Exception("등록 버튼이 비활성화 상태입니다")
-            
-            print("🖱️  Clicking '등록'...")
-            driver.execute_script("arguments[0].click();", submit_btn)
-            time.sleep(2)
-            
+                try:
+                    # 방법 3: "답글달기" (띄어쓰기 없는 경우)
+                    reply_btn = target_review.find_element(By.XPATH, ".//button[contains(., '답글달기')]")
+                    print("✅ Found by '답글달기' text")
+                except:
+                    print("❌ Could not find reply button")
+                    raise Exception("답글 버튼을 찾을 수 없습니다. 이미 답글이 있거나 페이지 로딩이 완료되지 않았습니다.")
+        
+        # 버튼 클릭
+        print("🖱️  Clicking reply button...")
+        driver.execute_script("arguments[0].click();", reply_btn)
+        time.sleep(2)
+        print("✅ Reply form opened")
+        
+        # Fill textarea (React가 인식하도록 native setter + input 이벤트, 실패 시 실제 키 입력)
+        print("⌨️  Waiting for textarea...")
+        textarea = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.TAG_NAME, "textarea"))
+        )
+        
+        input_mode = self._fill_reply_textarea(driver, textarea, reply_text)
+        
+        # 🚀 target_review 내에서만 "등록" 찾기
+        print("📤 Finding '등록' button in target review...")
+        try:
+            submit_btn = target_review.find_element(By.XPATH, ".//button[contains(text(), '등록')]")
+            print("✅ Found '등록' in target review")
+        except:
+            print("⚠️ Not in target, searching all visible buttons...")
+            all_btns = driver.find_elements(By.XPATH, "//button[contains(., '등록')]")
+            visible = [b for b in all_btns if b.is_displayed()]
+            submit_btn = visible[-1] if visible else None
+            if not submit_btn:
+                raise Exception("No '등록' button found")
+            print(f"✅ Found visible '등록' (index {len(visible)-1})")
+        
+        # 🔍 등록 전 최종 검증: textarea 값 재확인
+        final_value = driver.execute_script("return arguments[0].value;", textarea)
+        print(f"🔍 Final textarea check before submit: {len(final_value)} chars")
+        if len(final_value) < 10:
+            raise Exception(f"Textarea empty before submit! (value: {len(final_value)} chars)")
+        
+        # 🔍 등록 버튼 상태 확인
+        is_disabled = submit_btn.get_attribute("disabled")
+        is_aria_disabled = submit_btn.get_attribute("aria-disabled")
+        if is_disabled or is_aria_disabled == "true":
+            print(f"❌ Submit button is disabled! (disabled={is_disabled}, aria-disabled={is_aria_disabled})")
+            raise Exception("등록 버튼이 비활성화 상태입니다")
+        
+        print("🖱️  Clicking '등록'...")
+        driver.execute_script("arguments[0].click();", submit_btn)
+        
+        # 🚀 검증: 고정 대기 없이 대상 리뷰 노드에 답글 요소가 붙는 즉시 확인
+        print("🔍 Verifying reply...")
+        verify_started = time.monotonic()
+        verified_by = 'node'
+        reply_verified = self._wait_for_reply_element(driver, target_review, settings.reply_verify_timeout_seconds)
+        
+        if not reply_verified:
+            # 🔄 노드가 다시 그려졌거나 시간 초과 → 페이지 전체에서 작성자+날짜로 다시 확인 (fallback)
+            verified_by = 'rescan'
+            print("⚠️ Reply not seen on the review node, rescanning the page...")
             # 🔍 등록 후 에러 메시지 확인
             try:
                 # 🔧 네이버 에러 메시지만 정확히 감지 (false positive 방지)
@@ -1859,14 +2308,6 @@ class NaverPlaceAutomationSelenium:
             except:
                 pass
             
-            time.sleep(3)  # 총 5초 대기 (2초 + 3초)
-            
-            # 🚀 CRITICAL: 검증 - 실패 시 에러 발생
-            print("🔍 Verifying reply...")
-            time.sleep(4)  # 4초 대기 (네이버 렌더링 + DOM 업데이트)
-            
-            reply_verified = False
-            
             # 🔧 FIX: 여러 번 재시도 (네이버 렌더링이 느릴 수 있음)
             max_retry = 3
             for retry in range(max_retry):
@@ -1876,7 +2317,6 @@ class NaverPlaceAutomationSelenium:
                         time.sleep(2)  # 재시도 시 추가 대기
                     
                     # 작성자+날짜로 다시 찾기 (이미 위에서 정의된 변수 사용)
-                    
                     all_lis = driver.find_elements(By.TAG_NAME, "li")
                     for li in all_lis:
                         try:
@@ -1905,65 +2345,176 @@ class NaverPlaceAutomationSelenium:
                     
                     if reply_verified:
                         break  # 성공하면 재시도 중단
-                        
+                
                 except Exception as e:
                     if retry == max_retry - 1:
                         print(f"❌ Verification error: {e}")
+        
+        verify_seconds = time.monotonic() - verify_started
+        metrics.observe('reply.verify_seconds', verify_seconds)
+        metrics.incr(f"reply.verify.{verified_by if reply_verified else 'failed'}")
+        print(f"⏱️ Verification took {verify_seconds:.1f}s ({verified_by})")
+        
+        # 🚨 CRITICAL: Verification 실패 = 답글 등록 실패
+        if not reply_verified:
+            # 디버깅: 페이지 상태 확인
+            print("🔍 Debug: Checking page state...")
+            try:
+                current_url = driver.current_url
+                print(f"   Current URL: {current_url}")
+                # 에러 메시지가 있는지 다시 확인
+                error_elems = driver.find_elements(By.CSS_SELECTOR, "[class*='error'], [class*='alert'], [role='alert']")
+                if error_elems:
+                    for elem in error_elems:
+                        if elem.is_displayed():
+                            print(f"   ⚠️ Error on page: {elem.text[:100]}")
+            except:
+                pass
+            raise Exception("Reply verification failed - 답글이 실제로 게시되지 않았습니다")
+        
+        return {'verify_seconds': round(verify_seconds, 2), 'verified_by': verified_by, 'input_mode': input_mode}
+    
+    def _fill_reply_textarea(self, driver, textarea, reply_text: str) -> str:
+        """
+        Fill the reply textarea so React picks up the value -> 사용한 방식 ('native' / 'typed')
+        
+        - native: textarea의 native value setter + input/change 이벤트를 스크립트 한 번으로 실행
+          (긴 답글도 즉시 입력, ChromeDriver가 입력 못 하는 이모지도 그대로 유지)
+        - typed: native 입력이 React 상태에 반영되지 않았을 때 send_keys로 한 글자씩 입력 (이모지 제거)
+        REPLY_INPUT_MODE=typed면 처음부터 send_keys 사용
+        """
+        started = time.monotonic()
+        if settings.reply_input_mode == "native":
+            actual_value = driver.execute_script(_NATIVE_FILL_JS, textarea, reply_text)
+            if actual_value == reply_text:
+                # React가 다시 렌더링하면서 값을 되돌리지 않았는지 한 번 더 확인
+                time.sleep(0.2)
+                actual_value = driver.execute_script("return arguments[0].value;", textarea)
+            if actual_value == reply_text:
+                print(f"✅ Text filled via native setter: {len(actual_value)} chars")
+                metrics.observe('reply.fill_seconds', time.monotonic() - started)
+                metrics.incr('reply.fill.native')
+                return 'native'
+            print(f"⚠️  Native fill not kept by the page (value: {len(actual_value or '')} chars), typing instead...")
+        
+        self._type_reply_textarea(driver, textarea, reply_text)
+        metrics.observe('reply.fill_seconds', time.monotonic() - started)
+        metrics.incr('reply.fill.typed')
+        return 'typed'
+    
+    def _type_reply_textarea(self, driver, textarea, reply_text: str):
+        """Type the reply with send_keys (JS fallback if the keys did not land)"""
+        # 🛡️ BMP 문자 필터링 (이모지 및 특수 문자 제거)
+        def remove_non_bmp(text):
+            """
+            ChromeDriver가 지원하지 않는 BMP 밖의 문자 제거
+            (이모지, 특수 유니코드 등)
+            """
+            # BMP 범위: U+0000 ~ U+FFFF
+            return ''.join(c for c in text if ord(c) <= 0xFFFF)
+        
+        # 원본 텍스트 보관 (로깅용)
+        original_reply_text = reply_text
+        
+        # 🔥 BMP 필터링 (에러 방지)
+        reply_text_safe = remove_non_bmp(reply_text)
+        
+        # 필터링 결과 로깅
+        if len(reply_text_safe) < len(original_reply_text):
+            removed_chars = len(original_reply_text) - len(reply_text_safe)
+            print(f"⚠️  Removed {removed_chars} non-BMP characters (emojis/special chars)")
+        
+        print(f"⌨️  Filling reply with send_keys: {reply_text_safe[:30]}...")
+        
+        # 🚀 STRATEGY: textarea에 focus를 주고 클릭한 다음 입력
+        driver.execute_script("arguments[0].focus();", textarea)
+        driver.execute_script("arguments[0].click();", textarea)
+        time.sleep(0.3)
+        
+        textarea.clear()
+        time.sleep(0.5)
+        
+        # 🚀 CRITICAL: send_keys()로 실제 키 입력 (React 이벤트 트리거)
+        # 필터링된 텍스트 사용 (BMP만)
+        textarea.send_keys(reply_text_safe)
+        time.sleep(1)
+        
+        # 🔍 검증: 텍스트가 실제로 입력되었는지 확인
+        actual_value = driver.execute_script("return arguments[0].value;", textarea)
+        if len(actual_value) < 10:
+            print(f"⚠️  send_keys failed (value: {len(actual_value)} chars)")
+            print("   🔧 Retrying with enhanced JavaScript...")
+            
+            # 🚀 더 강력한 JavaScript 입력 (React 이벤트 확실하게 트리거)
+            driver.execute_script("""
+                const textarea = arguments[0];
+                const text = arguments[1];
+                
+                // 값 설정
+                textarea.value = text;
+                
+                // React가 감지할 수 있도록 다양한 이벤트 트리거
+                textarea.dispatchEvent(new Event('focus', { bubbles: true }));
+                textarea.dispatchEvent(new Event('input', { bubbles: true }));
+                textarea.dispatchEvent(new Event('change', { bubbles: true }));
+                textarea.dispatchEvent(new Event('blur', { bubbles: true }));
+                
+                // React 16+ 대응: nativeEvent descriptor 설정
+                const inputEvent = new InputEvent('input', {
+                    data: text,
+                    inputType: 'insertText',
+                    bubbles: true,
+                    cancelable: true
+                });
+                textarea.dispatchEvent(inputEvent);
+            """, textarea, reply_text_safe)
+            
+            time.sleep(1)  # React 상태 업데이트 대기
+            actual_value = driver.execute_script("return arguments[0].value;", textarea)
+            print(f"   ✅ After enhanced JS: {len(actual_value)} chars")
             
-            # 🚨 CRITICAL: Verification 실패 = 답글 등록 실패
-            if not reply_verified:
-                # 디버깅: 페이지 상태 확인
-                print("🔍 Debug: Checking page state...")
-                try:
-                    current_url = driver.current_url
-                    print(f"   Current URL: {current_url}")
-                    # 에러 메시지가 있는지 다시 확인
-                    error_elems = driver.find_elements(By.CSS_SELECTOR, "[class*='error'], [class*='alert'], [role='alert']")
-                    if error_elems:
-                        for elem in error_elems:
-                            if elem.is_displayed():
-                                print(f"   ⚠️ Error on page: {elem.text[:100]}")
-                except:
-                    pass
-                raise Exception("Reply verification failed - 답글이 실제로 게시되지 않았습니다")
-            
-            if reply_verified:
-                print(f"✅ Reply posted and verified successfully!")
-                return {
-                    'success': True,
-                    'message': 'Reply posted and verified successfully'
-                }
-            else:
-                print(f"⚠️ Reply posted (verification skipped due to DOM changes)")
-                return {
-                    'success': True,
-                    'message': 'Reply posted successfully (verification skipped)',
-                    'verified': False
-                }
-            
-        except Exception as e:
-            error_msg = str(e)
-            print(f"❌ Error posting reply: {error_msg}")
-            logger.error(f"Error posting reply: {error_msg}")
-            raise HTTPException(status_code=500, detail=f"Error posting reply: {error_msg}")
+            if len(actual_value) < 10:
+                raise Exception(f"Failed to fill textarea (value: {len(actual_value)} chars)")
+        else:
+            print(f"✅ Text input verified: {len(actual_value)} chars")
+    
+    def _wait_for_reply_element(self, driver, target_review, timeout: float) -> bool:
+        """
+        Wait until the reply element shows up inside `target_review`
+        False면 시간 초과이거나 리뷰 노드가 다시 그려진 경우 (stale) → 호출한 쪽에서 전체 스캔
+        """
+        def reply_state(_):
+            try:
+                replies = target_review.find_elements(By.CLASS_NAME, "pui__GbW8H7")
+            except StaleElementReferenceException:
+                return 'stale'
+            return replies[0] if replies else False
         
-        finally:
-            # 🚀 PERSISTENT BROWSER: persistent browser는 닫지 않음!
-            if driver and not driver_is_persistent:
-                try:
-                    print("🔄 Closing temporary browser...")
-                    driver.quit()
-                    print("✅ Temporary browser closed")
-                except Exception as e:
-                    print(f"⚠️ Error closing driver: {e}")
-            elif driver and driver_is_persistent:
-                print("♻️ Keeping persistent browser alive")
+        try:
+            state = WebDriverWait(driver, timeout, poll_frequency=0.2).until(reply_state)
+        except TimeoutException:
+            print(f"   ⏱️ No reply element after {timeout}s")
+            return False
+        
+        if state == 'stale':
+            print("   🔄 Review node was re-rendered")
+            return False
+        
+        try:
+            print(f"✅ Reply verified: {state.text[:50]}...")
+        except StaleElementReferenceException:
+            print("✅ Reply verified")
+        return True
     
     def post_reply(self, place_id: str, review_id: str, reply_text: str) -> Dict:
-        """Post a reply to a review in Smartplace Center"""
+        """Post a reply to a review in Smartplace Center (계정 브라우저 락)"""
+        current_user_id = self.active_user_id
+        with self._browser_locks.hold(current_user_id):
+            return self._post_reply(place_id, review_id, reply_text, current_user_id)
+    
+    def _post_reply(self, place_id: str, review_id: str, reply_text: str, current_user_id: str) -> Dict:
         driver = None
         driver_is_persistent = False
-        current_user_id = self.active_user_id
         
         try:
             print(f"💬 Posting reply to review: {review_id} for user: {current_user_id}")
@@ -2064,6 +2615,9 @@ class NaverPlaceAutomationSelenium:
             time.sleep(1)
             
             # Find textarea (should appear after clicking)
+            # ⏳ 이 계정의 게시 간격 확보
+            self._post_rate_limiter.acquire(current_user_id)
+            
             print("⌨️  Filling reply text...")
             textarea = target_review.find_element(By.TAG_NAME, "textarea")
             textarea.clear()
@@ -2085,26 +2639,18 @@ class NaverPlaceAutomationSelenium:
             
             # 🚀 UPDATE cache instead of clearing it (better UX)
             # Find the review in cache and update has_reply
-            # Note: We need to update ALL cache entries for this place_id
-            cache_keys_to_update = [k for k in self._reviews_cache.keys() if k.startswith(f"{place_id}:")]
-            
-            updated = False
-            for cache_key in cache_keys_to_update:
-                if cache_key in self._reviews_cache:
-                    for review in self._reviews_cache[cache_key]['data']:
-                        if review['review_id'] == review_id:
-                            review['has_reply'] = True
-                            review['reply'] = reply_text
-                            review['reply_date'] = datetime.now().strftime('%Y. %m. %d')
-                            print(f"✅ Updated review {review_id} in cache ({cache_key})")
-                            updated = True
+            # Note: We need to update ALL cache entries for this place_id (이 계정의 캐시만)
+            updated = self._reviews_cache.mark_replied(
+                current_user_id,
+                place_id,
+                reply_text,
+                datetime.now().strftime('%Y. %m. %d'),
+                review_id=review_id
+            )
             
             if not updated:
                 print(f"⚠️ No cache found for place {place_id}, will refresh on next load")
             
-            # Rate limiting
-            time.sleep(settings.naver_rate_limit_delay)
-            
             logger.info("✅ Reply posted")
             return {
                 'success': True,
@@ -2116,6 +2662,7 @@ class NaverPlaceAutomationSelenium:
             error_msg = str(e)
             print(f"❌ Error posting reply: {error_msg}")
             logger.error(f"Error posting reply: {error_msg}")
+            debug_artifacts.capture(driver, f"reply_{place_id}", error=error_msg)
             raise HTTPException(status_code=500, detail=f"Error posting reply: {error_msg}")
         
         finally:
@@ -2126,15 +2673,37 @@ class NaverPlaceAutomationSelenium:
             elif driver and driver_is_persistent:
                 print("♻️ Keeping persistent browser alive")
     
-    def get_loading_progress(self, place_id: str) -> Dict:
-        """Get current loading progress for a place"""
-        if place_id in self._loading_progress:
-            progress = self._loading_progress[place_id]
+    def get_post_rate_limits(self) -> Dict:
+        """Token bucket settings and the remaining tokens per account"""
+        return self._post_rate_limiter.stats()
+    
+    def get_cached_unreplied_reviews(self, user_id: str, place_id: str) -> Optional[List[Dict]]:
+        """Unreplied reviews from the last load of a place in this process (None if not loaded here)"""
+        return self._reviews_cache.latest_unreplied(user_id, place_id)
+    
+    def invalidate_reviews_cache(self, user_id: str, place_id: Optional[str] = None) -> int:
+        """Invalidate cached reviews for one account (optionally one place only)"""
+        if place_id:
+            return self._reviews_cache.invalidate_place(user_id, place_id)
+        return self._reviews_cache.invalidate_account(user_id)
+    
+    def invalidate_places_cache(self, user_id: str):
+        """Drop the places list of one account from memory and storage (naver_places)"""
+        self._places_cache.pop(user_id, None)
+        self._places_cache_time.pop(user_id, None)
+        from utils.db import delete_naver_places
+        delete_naver_places(user_id)
+    
+    def get_loading_progress(self, place_id: str, user_id: str = None) -> Dict:
+        """Get current loading progress for a place of one account"""
+        progress_key = (user_id or self.active_user_id, place_id)
+        if progress_key in self._loading_progress:
+            progress = self._loading_progress[progress_key]
             # Clean up completed/error status after 30 seconds (longer to ensure frontend sees it)
             if progress['status'] in ['completed', 'error']:
                 age = datetime.now() - progress['timestamp']
                 if age > timedelta(seconds=30):
-                    del self._loading_progress[place_id]
+                    self._loading_progress.pop(progress_key, None)
                     return {'status': 'idle', 'count': 0, 'message': ''}
             return progress
         else:
@@ -2153,14 +2722,14 @@ class NaverPlaceAutomationSelenium:
             browser_manager.remove_browser(current_user_id)
             print(f"🗑️ Persistent browser removed for {current_user_id}")
             
-            # 🚀 Clear cache on logout (user별로 클리어!)
-            if current_user_id in self._places_cache:
-                del self._places_cache[current_user_id]
-            if current_user_id in self._places_cache_time:
-                del self._places_cache_time[current_user_id]
-            # Reviews cache는 place_id별로 관리되므로 전체 클리어 (추후 개선 가능)
-            self._reviews_cache = {}  # Clear reviews cache too
-            self._loading_progress = {}  # Clear progress too
+            # 🚀 Clear cache on logout (user별로 클리어! 저장된 매장 목록 포함 → 다음 로그인 시 새로 조회)
+            self.invalidate_places_cache(current_user_id)
+            # Reviews cache / progress도 이 계정 것만 클리어 (다른 계정은 유지, 저장된 리뷰 목록 포함)
+            self._reviews_cache.invalidate_account(current_user_id)
+            from utils.db import delete_naver_reviews
+            delete_naver_reviews(current_user_id)
+            for progress_key in [key for key in self._loading_progress if key[0] == current_user_id]:
+                self._loading_progress.pop(progress_key, None)
             print(f"🗑️ Cache cleared for user {current_user_id}")
             
             return {
@@ -46,16 +46,19 @@ class NaverAutomationSeleniumWrapper:
             self.selenium_automation.check_login_status
         )
     
-    async def get_places(self) -> List[Dict]:
+    async def get_places(self, user_id: str = None, force_refresh: bool = False, debug: bool = False) -> List[Dict]:
         """Async wrapper for get_places"""
         # 🚀 Lock 제거 (데드락 방지) - WEB_CONCURRENCY=1이므로 안전
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(
             executor,
-            self.selenium_automation.get_places
+            self.selenium_automation.get_places,
+            user_id,
+            force_refresh,
+            debug
         )
     
-    async def get_reviews(self, place_id: str, page: int = 1, page_size: int = 20, filter_type: str = 'all', load_count: int = 300) -> List[Dict]:
+    async def get_reviews(self, place_id: str, page: int = 1, page_size: int = 20, filter_type: str = 'all', load_count: int = 300, user_id: str = None, debug: bool = False) -> List[Dict]:
         """Async wrapper for get_reviews (user-specified load count)"""
         # 🚀 Lock 제거 (데드락 방지) - WEB_CONCURRENCY=1이므로 안전
         loop = asyncio.get_event_loop()
@@ -66,7 +69,9 @@ class NaverAutomationSeleniumWrapper:
             page,
             page_size,
             filter_type,
-            load_count
+            load_count,
+            user_id,
+            debug
         )
     
     async def post_reply(self, place_id: str, review_id: str, reply_text: str) -> Dict:
@@ -81,13 +86,18 @@ class NaverAutomationSeleniumWrapper:
             reply_text
         )
     
-    async def get_loading_progress(self, place_id: str) -> Dict:
+    def invalidate_reviews_cache(self, user_id: str, place_id: str = None) -> int:
+        """Invalidate cached reviews (memory only - no executor needed)"""
+        return self.selenium_automation.invalidate_reviews_cache(user_id, place_id)
+    
+    async def get_loading_progress(self, place_id: str, user_id: str = None) -> Dict:
         """Async wrapper for get_loading_progress (no lock needed - memory read)"""
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(
             executor,
             self.selenium_automation.get_loading_progress,
-            place_id
+            place_id,
+            user_id
         )
     
     async def logout(self) -> Dict:
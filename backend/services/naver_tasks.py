@@ -0,0 +1,459 @@
+"""
+Naver Background Task Handlers
+job_queue 워커에서 실행되는 작업 함수 (리뷰 로드 / 답글 게시 / 답글 일괄 게시 / 자동 답글 / 답글 재시도 / 배치 초안)
+
+각 핸들러는 handler(task_id, user_id, params) -> result 형태
+상태 전환(processing/completed/failed)과 결과 저장은 job_queue가 처리하고,
+핸들러는 진행률 업데이트와 실제 작업만 담당
+재시도할 만한 이유로 실패한 답글은 reply_outbox에 넣어 두고 나중에 reply_outbox 작업으로 다시 게시
+"""
+
+from typing import Dict, List, Optional
+from config import settings
+from utils.task_manager import task_manager
+from utils.job_queue import job_queue
+from utils.reply_outbox import reply_outbox, classify_error
+
+
+def _queue_retry(task_id: str, user_id: str, place_id: str, item: Dict, error: str) -> Optional[str]:
+    """Keep a failed reply in the outbox if the failure is retryable (취소된 작업 제외) -> outbox id"""
+    if not item.get('reply_text') or not classify_error(error) or task_manager.is_cancel_requested(task_id):
+        return None
+    try:
+        return reply_outbox.add(user_id, place_id, item, error, source_task_id=task_id)
+    except Exception as e:
+        print(f"⚠️ Could not queue reply for retry: {e}")
+        return None
+
+
+def _queue_failed_items(task_id: str, user_id: str, place_id: str, items: List[Dict], results: List[Dict]):
+    """Queue the retryable failures of a batch (results[i]['outbox_id']에 기록)"""
+    for result in results:
+        if result.get('status') != 'failed':
+            continue
+        outbox_id = _queue_retry(task_id, user_id, place_id, items[result['index']], result.get('error') or '')
+        if outbox_id:
+            result['outbox_id'] = outbox_id
+
+
+def requeue_abandoned_replies(task: Dict) -> int:
+    """
+    Hand the replies of a reply task whose worker died to the outbox (worker.py sweep)
+
+    작업을 다시 실행하지 않고 outbox로 → 이미 게시된 답글은 재시도 때 미답글 목록에 없으므로
+    답글 등록된 목록에서 확인하고 sent (already_replied)로 끝남 (run_reply_outbox)
+    auto_reply는 생성된 답글이 params에 없으므로 실패로만 남김
+
+    Returns: outbox에 넣은(되돌린) 답글 수
+    """
+    params = task.get('params') or {}
+    error = '작업 처리 중 워커가 중단되었습니다'
+    if task['type'] == 'reply_outbox':
+        entries = reply_outbox.claimed(task['_id'])
+        if entries:
+            reply_outbox.release(entries, error)
+        return len(entries)
+
+    if task['type'] == 'reply_post':
+        items = [params]
+    elif task['type'] == 'reply_batch':
+        items = params.get('items') or []
+    else:
+        return 0
+    queued = 0
+    for item in items:
+        if not item.get('reply_text'):
+            continue
+        try:
+            if reply_outbox.add(task['user_id'], params['place_id'], item, error, source_task_id=task['_id']):
+                queued += 1
+        except Exception as e:
+            print(f"⚠️ Could not queue reply for retry: {e}")
+    return queued
+
+
+def run_review_load(task_id: str, user_id: str, params: Dict) -> Dict:
+    """Load reviews for a place (params: place_id, load_count, page, page_size, debug)"""
+    from services.naver_automation_selenium import naver_automation_selenium
+
+    place_id = params['place_id']
+    load_count = params.get('load_count', 50)
+
+    task_manager.update_progress(task_id, 0, '리뷰 로딩 시작...', total=load_count)
+
+    # 🚀 스크래퍼 진행률을 바로 task로 전달 (SSE push, MongoDB는 상태 전환 시에만 기록)
+    def on_progress(progress: Dict):
+        # 🔧 FIX: count가 0이어도 메시지만 있어도 업데이트 (파싱 중일 수 있음)
+        task_manager.update_progress(task_id, progress.get('count', 0), progress.get('message', '로딩 중...'))
+
+    result = naver_automation_selenium.get_reviews(
+        place_id,
+        page=params.get('page', 1),
+        page_size=params.get('page_size', 20),
+        filter_type='all',
+        load_count=load_count,
+        user_id=user_id,
+        debug=params.get('debug', False),
+        progress_callback=on_progress,
+        cancel_check=task_manager.cancel_event(task_id).is_set
+    )
+
+    # 🔧 FIX: result는 딕셔너리 {'reviews': [...], 'total': ...} 형태
+    actual_count = 0
+    if isinstance(result, dict) and 'reviews' in result:
+        actual_count = len(result['reviews'])
+    elif isinstance(result, list):
+        actual_count = len(result)
+
+    if isinstance(result, dict) and result.get('cancelled'):
+        task_manager.update_progress(task_id, actual_count, f'🛑 취소됨 - {actual_count}개 리뷰까지 로드')
+    else:
+        task_manager.update_progress(task_id, actual_count, f'✅ {actual_count}개 리뷰 로드 완료!')
+    return result
+
+
+def run_reply_post(task_id: str, user_id: str, params: Dict) -> Dict:
+    """Post a reply matched by author + date + content (params: place_id, author, date, content, reply_text, expected_count, debug)"""
+    from services.naver_automation_selenium import naver_automation_selenium
+
+    task_manager.update_progress(task_id, 0, '답글 게시 중...')
+
+    # 🚀 작성자 + 날짜 + 내용 3중 매칭
+    try:
+        result = naver_automation_selenium.post_reply_by_composite(
+            place_id=params['place_id'],
+            author=params['author'],
+            date=params['date'],
+            content=params.get('content', ''),
+            reply_text=params['reply_text'],
+            user_id=user_id,
+            expected_count=params.get('expected_count', 50),
+            debug=params.get('debug', False),
+            cancel_check=task_manager.cancel_event(task_id).is_set
+        )
+    except Exception as e:
+        # 리뷰 못 찾음 / 세션 만료 / Chrome 크래시 → outbox에서 자동 재시도 (작업은 실패로 기록)
+        error = str(getattr(e, 'detail', None) or e)
+        if _queue_retry(task_id, user_id, params['place_id'], params, error):
+            raise Exception(f"{error} → 자동 재시도 예약됨")
+        raise
+
+    if result.get('cancelled'):
+        task_manager.update_progress(task_id, 0, '🛑 답글 게시 취소됨')
+        return result
+    task_manager.update_progress(task_id, 1, '✅ 답글 게시 완료!')
+    return result
+
+
+def run_reply_batch(task_id: str, user_id: str, params: Dict) -> Dict:
+    """Post many replies in one page session (params: place_id, items, expected_count, debug)"""
+    from services.naver_automation_selenium import naver_automation_selenium
+
+    items = params['items']
+    task_manager.update_progress(task_id, 0, f'답글 {len(items)}개 일괄 게시 시작...', total=len(items))
+
+    def on_progress(progress: Dict):
+        task_manager.update_progress(task_id, progress.get('count', 0), progress.get('message', '답글 게시 중...'))
+
+    try:
+        result = naver_automation_selenium.post_replies_batch(
+            place_id=params['place_id'],
+            items=items,
+            user_id=user_id,
+            expected_count=params.get('expected_count', 50),
+            debug=params.get('debug', False),
+            progress_callback=on_progress,
+            cancel_check=task_manager.cancel_event(task_id).is_set
+        )
+    except Exception as e:
+        # 브라우저 / 페이지 열기 실패 → 전체 항목 재시도 예약
+        error = str(getattr(e, 'detail', None) or e)
+        queued = sum(1 for item in items if _queue_retry(task_id, user_id, params['place_id'], item, error))
+        if queued:
+            raise Exception(f"{error} → {queued}개 자동 재시도 예약됨")
+        raise
+    _queue_failed_items(task_id, user_id, params['place_id'], items, result['results'])
+
+    summary = f"{result['posted']}개 게시, {result['failed']}개 실패"
+    if result.get('cancelled'):
+        task_manager.update_progress(task_id, result['posted'], f'🛑 취소됨 - {summary}')
+    else:
+        task_manager.update_progress(task_id, result['posted'], f'✅ 일괄 게시 완료 - {summary}')
+    return result
+
+
+def _unreplied_reviews(user_id: str, place_id: str) -> List[Dict]:
+    """Unreplied reviews of the last load: this process's review cache, else the saved review list (naver_reviews)"""
+    from services.naver_automation_selenium import naver_automation_selenium
+    from utils.db import get_naver_reviews
+
+    reviews = naver_automation_selenium.get_cached_unreplied_reviews(user_id, place_id)
+    if reviews is not None:
+        print(f"📋 {len(reviews)} unreplied reviews from cache ({place_id})")
+        return reviews
+
+    # worker 프로세스가 다르거나 재시작된 경우 → 저장된 마지막 로드 결과 사용
+    stored = get_naver_reviews(user_id, place_id)
+    if stored is not None:
+        reviews = [review for review in stored['reviews'] if not review.get('has_reply')]
+        print(f"📋 {len(reviews)} unreplied reviews from saved list ({place_id}, loaded {stored['loaded_at']:%m-%d %H:%M} UTC)")
+        return reviews
+
+    # 저장된 목록이 없으면 (이전 버전에서 로드) 마지막 review_load 작업 결과
+    task = task_manager.find_latest('review_load', user_id, {'place_id': place_id})
+    if task is None:
+        return []
+    items, _ = task_manager.get_result_page(task, 0, (task.get('result_ref') or {}).get('count', 10000))
+    reviews = [review for review in items if not review.get('has_reply')]
+    print(f"📋 {len(reviews)} unreplied reviews from task {task['_id']} ({place_id})")
+    return reviews
+
+
+def run_auto_reply(task_id: str, user_id: str, params: Dict) -> Dict:
+    """
+    Generate and post replies for the unreplied reviews of a place
+    (params: place_id, store_name, place_settings, max_reviews, require_approval, debug)
+
+    - 생성: LLM 요청을 AUTO_REPLY_GENERATE_CONCURRENCY개씩 먼저 시작 (place_ai_settings 적용)
+    - 게시: post_replies_batch가 한 페이지 세션에서 순서대로 게시, 답글이 준비될 때만 대기
+      → 앞 리뷰를 게시하는 동안 뒤 리뷰 답글이 생성됨
+    - require_approval이면 생성만 하고 종료 (drafts를 /reviews/reply-batch로 게시)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from services.naver_automation_selenium import naver_automation_selenium
+    from services.llm_service import llm_service
+    from models.schemas import GenerateReplyRequest, PlaceAISettings
+
+    place_id = params['place_id']
+    require_approval = params.get('require_approval', False)
+    is_cancelled = task_manager.cancel_event(task_id).is_set
+
+    unreplied = _unreplied_reviews(user_id, place_id)
+    reviews = unreplied[:params.get('max_reviews', 20)]
+    if not reviews:
+        task_manager.update_progress(task_id, 0, '답글을 달 리뷰가 없습니다 (먼저 리뷰를 불러오세요)', total=0)
+        return {'place_id': place_id, 'total': 0, 'generated': 0, 'posted': 0, 'failed': 0,
+                'approval_required': require_approval, 'results': []}
+
+    place_settings = PlaceAISettings(**params['place_settings']) if params.get('place_settings') else None
+    task_manager.update_progress(task_id, 0, f'리뷰 {len(reviews)}개 답글 생성 시작...', total=len(reviews))
+
+    def generate(review: Dict) -> str:
+        if is_cancelled():
+            raise RuntimeError('취소됨')
+        request = GenerateReplyRequest(
+            review_text=review.get('content') or None,
+            rating=review.get('rating') or 3,  # 네이버 리뷰는 별점 없음 → 중립
+            store_name=params.get('store_name')
+        )
+        return llm_service.generate_reply(request, place_settings=place_settings).generated_reply
+
+    results = [
+        {'index': index, 'author': review['author'], 'date': review['date'], 'content': review.get('content') or ""}
+        for index, review in enumerate(reviews)
+    ]
+    executor = ThreadPoolExecutor(max_workers=max(1, settings.auto_reply_generate_concurrency),
+                                  thread_name_prefix='auto-reply-llm')
+    try:
+        futures = [executor.submit(generate, review) for review in reviews]
+
+        def resolve_reply(index: int, item: Dict) -> str:
+            try:
+                reply_text = futures[index].result()
+            except Exception as e:
+                raise Exception(f"답글 생성 실패: {getattr(e, 'detail', None) or e}")
+            results[index]['reply_text'] = reply_text
+            return reply_text
+
+        if require_approval:
+            for index in range(len(reviews)):
+                if is_cancelled():
+                    break
+                try:
+                    resolve_reply(index, results[index])
+                    results[index]['status'] = 'draft'
+                except Exception as e:
+                    results[index].update(status='failed', error=str(e))
+                task_manager.update_progress(task_id, index + 1, f'답글 생성 중... ({index + 1}/{len(reviews)})')
+            for result in results:
+                result.setdefault('status', 'cancelled')
+            generated = sum(1 for result in results if result['status'] == 'draft')
+            task_manager.update_progress(task_id, generated, f'✅ 답글 {generated}개 생성 완료 - 확인 후 게시하세요')
+            return {'place_id': place_id, 'total': len(reviews), 'generated': generated, 'posted': 0,
+                    'failed': sum(1 for result in results if result['status'] == 'failed'),
+                    'cancelled': is_cancelled(), 'approval_required': True, 'results': results}
+
+        def on_progress(progress: Dict):
+            task_manager.update_progress(task_id, progress.get('count', 0), progress.get('message', '답글 게시 중...'))
+
+        batch = naver_automation_selenium.post_replies_batch(
+            place_id=place_id,
+            items=[{'author': r['author'], 'date': r['date'], 'content': r['content'][:100]} for r in results],
+            user_id=user_id,
+            expected_count=max(50, len(unreplied)),
+            debug=params.get('debug', False),
+            progress_callback=on_progress,
+            cancel_check=is_cancelled,
+            resolve_reply=resolve_reply
+        )
+    finally:
+        # 취소/실패로 남은 생성 요청은 버림
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for item in batch['results']:
+        results[item['index']].update({key: value for key, value in item.items() if key not in ('author', 'date')})
+    _queue_failed_items(task_id, user_id, place_id, results, results)
+
+    summary = f"{batch['posted']}개 게시, {batch['failed']}개 실패"
+    if batch.get('cancelled'):
+        task_manager.update_progress(task_id, batch['posted'], f'🛑 취소됨 - {summary}')
+    else:
+        task_manager.update_progress(task_id, batch['posted'], f'✅ 자동 답글 완료 - {summary}')
+    return {'place_id': place_id, 'total': len(reviews),
+            'generated': sum(1 for result in results if result.get('reply_text')),
+            'posted': batch['posted'], 'failed': batch['failed'], 'cancelled': batch['cancelled'],
+            'approval_required': False, 'results': results}
+
+
+def _find_already_replied(user_id: str, place_id: str, entries: List[Dict], cancel_check) -> List[int]:
+    """Indices of outbox entries whose review already has a reply (저장된 리뷰 목록 → 리뷰 캐시 / 답글 등록된 목록)"""
+    from services.naver_automation_selenium import naver_automation_selenium
+    from utils.db import get_naver_reviews
+
+    stored = get_naver_reviews(user_id, place_id)
+    replied_keys = {(review['author'], review['date']) for review in stored['reviews'] if review.get('has_reply')} if stored else set()
+    replied = [index for index, entry in enumerate(entries) if (entry['author'], entry['date']) in replied_keys]
+    remaining = [index for index in range(len(entries)) if index not in replied]
+    if remaining:
+        try:
+            found = naver_automation_selenium.find_replied_reviews(
+                place_id, [entries[index] for index in remaining], user_id=user_id, cancel_check=cancel_check
+            )
+        except Exception as e:
+            print(f"⚠️ Could not check replied reviews ({place_id}): {e}")
+            found = []
+        replied += [remaining[index] for index in found]
+    return replied
+
+
+def run_reply_outbox(task_id: str, user_id: str, params: Dict) -> Dict:
+    """
+    Retry the outbox entries claimed for this task (params: place_id, entry_ids)
+
+    같은 계정+매장의 답글을 post_replies_batch 한 번으로 게시 (브라우저 준비/페이지 로드 한 번)
+    결과는 항목별로 outbox에 기록 (sent / 백오프 후 pending / dead)
+    게시는 미답글 목록(hasReply=false)에서 리뷰를 찾으므로, 이전 시도가 이미 게시한 답글은 'Could not find review'로 실패
+    → 답글 등록된 목록에서 확인되면 sent (already_replied)로 기록하고 다시 게시하지 않음
+    """
+    from services.naver_automation_selenium import naver_automation_selenium
+
+    place_id = params['place_id']
+    entries = reply_outbox.claimed(task_id)
+    if not entries:
+        task_manager.update_progress(task_id, 0, '재시도할 답글이 없습니다', total=0)
+        return {'place_id': place_id, 'total': 0, 'posted': 0, 'failed': 0, 'results': []}
+
+    task_manager.update_progress(task_id, 0, f'답글 {len(entries)}개 재시도 중...', total=len(entries))
+
+    def on_progress(progress: Dict):
+        task_manager.update_progress(task_id, progress.get('count', 0), progress.get('message', '답글 재시도 중...'))
+
+    is_cancelled = task_manager.cancel_event(task_id).is_set
+    try:
+        result = naver_automation_selenium.post_replies_batch(
+            place_id=place_id,
+            items=[{'author': e['author'], 'date': e['date'], 'content': e.get('content') or "", 'reply_text': e['reply_text']}
+                   for e in entries],
+            user_id=user_id,
+            debug=params.get('debug', False),
+            progress_callback=on_progress,
+            cancel_check=is_cancelled
+        )
+    except Exception as e:
+        # 브라우저 생성 / 페이지 열기 실패 → 모든 항목을 한 번 실패로 기록
+        error = str(getattr(e, 'detail', None) or e)
+        for entry in entries:
+            reply_outbox.record(entry, 'cancelled' if is_cancelled() else 'failed', error)
+        raise
+
+    not_found = [item for item in result['results']
+                 if item['status'] == 'failed' and 'Could not find review' in (item.get('error') or '')]
+    if not_found and not is_cancelled():
+        task_manager.update_progress(task_id, result['posted'], f'게시된 답글 확인 중... ({len(not_found)}개)')
+        for index in _find_already_replied(user_id, place_id, [entries[item['index']] for item in not_found], is_cancelled):
+            not_found[index].update(status='posted', already_replied=True)
+        already_replied = sum(1 for item in not_found if item.get('already_replied'))
+        result.update(posted=result['posted'] + already_replied, failed=result['failed'] - already_replied,
+                      already_replied=already_replied)
+        result['success'] = result['failed'] == 0 and not result.get('cancelled')
+
+    for item in result['results']:
+        status = 'already_replied' if item.get('already_replied') else item['status']
+        reply_outbox.record(entries[item['index']], status, item.get('error'))
+        item['outbox_id'] = entries[item['index']]['_id']
+
+    summary = f"{result['posted']}개 게시, {result['failed']}개 실패"
+    if result.get('already_replied'):
+        summary += f" (이미 게시됨 {result['already_replied']}개 포함)"
+    if result.get('cancelled'):
+        task_manager.update_progress(task_id, result['posted'], f'🛑 취소됨 - {summary}')
+    else:
+        task_manager.update_progress(task_id, result['posted'], f'✅ 재시도 완료 - {summary}')
+    return {'place_id': place_id, **result}
+
+
+def run_reply_drafts(task_id: str, user_id: str, params: Dict) -> Dict:
+    """
+    Submit reply drafts for a large backlog to the OpenAI Batch API
+    (params: place_id, store_name, place_settings, max_reviews)
+
+    - 미답글 리뷰로 JSONL을 만들어 제출하고 reply_drafts에 pending으로 등록 → 작업은 바로 완료
+    - 결과 확인은 draft_batches poller가 담당 (완료되면 reply_drafts에 draft / failed 기록)
+      → 진행 상황은 GET /reviews/draft-batches/{batch_id}
+    """
+    from services.llm_service import llm_service
+    from models.schemas import GenerateReplyRequest, PlaceAISettings
+    from utils.db import save_reply_drafts
+    from utils.draft_batches import draft_batches
+
+    place_id = params['place_id']
+    reviews = _unreplied_reviews(user_id, place_id)[:params.get('max_reviews', settings.openai_batch_max_items)]
+    if not reviews:
+        task_manager.update_progress(task_id, 0, '초안을 만들 리뷰가 없습니다 (먼저 리뷰를 불러오세요)', total=0)
+        return {'place_id': place_id, 'batch_id': None, 'total': 0}
+
+    drafts = [
+        {'custom_id': str(index), 'review_id': review.get('review_id'), 'author': review['author'],
+         'date': review['date'], 'content': review.get('content') or "", 'rating': review.get('rating')}
+        for index, review in enumerate(reviews)
+    ]
+    place_settings = PlaceAISettings(**params['place_settings']) if params.get('place_settings') else None
+    requests = [
+        (draft['custom_id'], GenerateReplyRequest(
+            review_text=draft['content'] or None,
+            rating=draft['rating'] or 3,  # 네이버 리뷰는 별점 없음 → 중립
+            store_name=params.get('store_name')
+        ))
+        for draft in drafts
+    ]
+    task_manager.update_progress(task_id, 0, f'리뷰 {len(drafts)}개 배치 제출 중...', total=len(drafts))
+    batch = llm_service.submit_batch(requests, place_settings, metadata={'place_id': place_id, 'task_id': task_id})
+    save_reply_drafts(user_id, place_id, batch['id'], drafts)
+    draft_batches.register(batch, user_id, place_id, len(drafts), task_id=task_id)
+
+    task_manager.update_progress(task_id, len(drafts), f"📦 배치 {batch['id']} 제출 완료 - 결과는 완료되면 초안 목록에 기록됩니다")
+    return {'place_id': place_id, 'batch_id': batch['id'], 'batch_status': batch.get('status'), 'total': len(drafts),
+            'batch_url': f"/api/naver/reviews/draft-batches/{batch['id']}"}
+
+
+TASK_HANDLERS = {
+    'review_load': run_review_load,
+    'reply_post': run_reply_post,
+    'reply_batch': run_reply_batch,
+    'auto_reply': run_auto_reply,
+    'reply_outbox': run_reply_outbox,
+    'reply_drafts': run_reply_drafts
+}
+
+for _task_type, _handler in TASK_HANDLERS.items():
+    job_queue.register(_task_type, _handler)
@@ -0,0 +1,216 @@
+"""
+Compact in-memory review cache for Naver reviews
+
+스크래핑한 리뷰를 dict 대신 __slots__ 레코드로 보관하여 메모리 사용량을 줄임
+- 작성자/날짜/place_id 문자열은 sys.intern으로 공유
+- has_reply는 reply 값에서 계산 (별도 저장 X)
+- API 응답 시에만 dict로 변환
+- 네이버 계정별로 분리 (한 계정의 로그아웃이 다른 계정 캐시에 영향 X)
+"""
+
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from utils.metrics import metrics
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern short, highly repeated strings (author, date, place_id)"""
+    if value is None:
+        return None
+    return sys.intern(value)
+
+
+class ReviewRecord:
+    """Single cached review (compact representation)"""
+
+    __slots__ = ('review_id', 'place_id', 'author', 'date', 'content', 'reply', 'reply_date')
+
+    def __init__(self, review_id: str, place_id: str, author: str, date: str,
+                 content: str = "", reply: Optional[str] = None, reply_date: Optional[str] = None):
+        self.review_id = review_id
+        self.place_id = _intern(place_id)
+        self.author = _intern(author)
+        self.date = _intern(date)
+        self.content = content
+        self.reply = reply
+        self.reply_date = _intern(reply_date)
+
+    @property
+    def has_reply(self) -> bool:
+        return bool(self.reply)
+
+    @classmethod
+    def from_dict(cls, review: Dict) -> 'ReviewRecord':
+        """Build a record from the dict shape produced by the scraper"""
+        return cls(
+            review_id=review['review_id'],
+            place_id=review['place_id'],
+            author=review['author'],
+            date=review['date'],
+            content=review.get('content') or "",
+            reply=review.get('reply'),
+            reply_date=review.get('reply_date')
+        )
+
+    def to_dict(self) -> Dict:
+        """Convert to the API dict shape (API boundary only)"""
+        return {
+            'review_id': self.review_id,
+            'place_id': self.place_id,
+            'author': self.author,
+            'date': self.date,
+            'content': self.content,
+            'has_reply': self.has_reply,
+            'reply': self.reply,
+            'reply_date': self.reply_date
+        }
+
+
+class ReviewCacheEntry:
+    """Cached review list for one cache key"""
+
+    __slots__ = ('records', 'time', 'total')
+
+    def __init__(self, records: List[ReviewRecord], total: int, time: Optional[datetime] = None):
+        self.records = records
+        self.total = total
+        self.time = time or datetime.now()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def to_dicts(self) -> List[Dict]:
+        return [record.to_dict() for record in self.records]
+
+
+class ReviewCache:
+    """Review cache holding compact records, namespaced by Naver account
+
+    Structure: { account_id: { cache_key: ReviewCacheEntry } }
+    cache_key 형식: f"{place_id}:{filter_type}:{load_count}"
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, ReviewCacheEntry]] = {}
+
+    def get(self, account_id: str, cache_key: str) -> Optional[ReviewCacheEntry]:
+        with self._lock:
+            entry = self._entries.get(account_id, {}).get(cache_key)
+        metrics.incr('review_cache.hit' if entry is not None else 'review_cache.miss')
+        return entry
+
+    def put(self, account_id: str, cache_key: str, reviews: List[Dict], total: int) -> ReviewCacheEntry:
+        """Store scraped review dicts as compact records"""
+        entry = ReviewCacheEntry([ReviewRecord.from_dict(r) for r in reviews], total)
+        with self._lock:
+            self._entries.setdefault(account_id, {})[cache_key] = entry
+        self._update_size_gauges()
+        return entry
+
+    def keys(self, account_id: str) -> List[str]:
+        with self._lock:
+            return list(self._entries.get(account_id, {}).keys())
+
+    def _place_entries(self, account_id: str, place_id: str) -> List[ReviewCacheEntry]:
+        prefix = f"{place_id}:"
+        with self._lock:
+            return [entry for key, entry in self._entries.get(account_id, {}).items() if key.startswith(prefix)]
+
+    def mark_replied(self, account_id: str, place_id: str, reply_text: str, reply_date: str,
+                     review_id: Optional[str] = None, author: Optional[str] = None,
+                     date: Optional[str] = None) -> bool:
+        """Update a single review after a reply was posted (per-review invalidation)
+
+        review_id가 있으면 ID로, 없으면 작성자 + 날짜로 매칭
+        """
+        updated = False
+        for entry in self._place_entries(account_id, place_id):
+            for record in entry.records:
+                if review_id:
+                    matched = record.review_id == review_id
+                else:
+                    matched = record.author == author and record.date == date
+                if matched:
+                    record.reply = reply_text
+                    record.reply_date = _intern(reply_date)
+                    updated = True
+        if updated:
+            print(f"✅ Marked review as replied in cache (account: {account_id}, place: {place_id})")
+            metrics.incr('review_cache.invalidate.review')
+        return updated
+
+    def is_replied(self, account_id: str, place_id: str, author: str, date: str) -> bool:
+        """True if a cached list shows a reply on the review (작성자 + 날짜 매칭, 게시 후 mark_replied 포함)"""
+        for entry in self._place_entries(account_id, place_id):
+            for record in entry.records:
+                if record.author == author and record.date == date and record.has_reply:
+                    return True
+        return False
+
+    def latest_unreplied(self, account_id: str, place_id: str) -> Optional[List[Dict]]:
+        """Unreplied reviews of the newest cached list of a place (None if the place was never loaded)"""
+        entries = self._place_entries(account_id, place_id)
+        if not entries:
+            return None
+        newest = max(entries, key=lambda entry: entry.time)
+        return [record.to_dict() for record in newest.records if not record.has_reply]
+
+    def unreplied_position(self, account_id: str, place_id: str, author: str, date: str) -> Optional[int]:
+        """Position of a review in the unreplied (hasReply=false) list, from the newest cached list
+
+        답글 게시 시 리뷰를 처음부터 스캔하지 않고 바로 찾아가기 위한 힌트 (실제 위치는 화면에서 검증)
+        """
+        entries = sorted(self._place_entries(account_id, place_id), key=lambda entry: entry.time, reverse=True)
+        for entry in entries:
+            position = 0
+            for record in entry.records:
+                if record.author == author and record.date == date:
+                    metrics.incr('review_cache.position_hint.hit')
+                    return position
+                if not record.has_reply:
+                    position += 1
+        metrics.incr('review_cache.position_hint.miss')
+        return None
+
+    def invalidate_place(self, account_id: str, place_id: str) -> int:
+        """Drop all cached lists of one place for one account"""
+        prefix = f"{place_id}:"
+        with self._lock:
+            account_entries = self._entries.get(account_id, {})
+            keys = [key for key in account_entries if key.startswith(prefix)]
+            for key in keys:
+                del account_entries[key]
+        metrics.incr('review_cache.invalidate.place')
+        metrics.incr('review_cache.evicted_entries', len(keys))
+        self._update_size_gauges()
+        print(f"🗑️ Review cache invalidated for place {place_id} (account: {account_id}, {len(keys)} entries)")
+        return len(keys)
+
+    def invalidate_account(self, account_id: str) -> int:
+        """Drop every cached list of one account (e.g. on logout)"""
+        with self._lock:
+            removed = len(self._entries.pop(account_id, {}))
+        metrics.incr('review_cache.invalidate.account')
+        metrics.incr('review_cache.evicted_entries', removed)
+        self._update_size_gauges()
+        print(f"🗑️ Review cache invalidated for account {account_id} ({removed} entries)")
+        return removed
+
+    def clear(self):
+        """Wipe the whole cache (all accounts)"""
+        with self._lock:
+            removed = sum(len(entries) for entries in self._entries.values())
+            self._entries = {}
+        metrics.incr('review_cache.wipe')
+        metrics.incr('review_cache.evicted_entries', removed)
+        self._update_size_gauges()
+
+    def _update_size_gauges(self):
+        with self._lock:
+            entries = sum(len(account) for account in self._entries.values())
+            reviews = sum(len(entry) for account in self._entries.values() for entry in account.values())
+        metrics.set_gauge('review_cache.entries', entries)
+        metrics.set_gauge('review_cache.reviews', reviews)
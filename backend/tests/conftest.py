@@ -0,0 +1,42 @@
+"""
+Test setup: backend 모듈 import 경로 + SQLite 저장소 / OpenAI 배치 스텁
+
+실행 (backend 디렉터리에서):
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Fresh SQLite store as the app database (utils.db.get_db)"""
+    import utils.db as db
+
+    previous = (db._db, db._sqlite)
+    db._db = None
+    assert db.init_sqlite(str(tmp_path / "review_system.db"))
+    yield db.get_db()
+    db._db, db._sqlite = previous
+
+
+@pytest.fixture
+def batch_stub(monkeypatch):
+    """OpenAI Batch API stub wired into the llm_service singleton"""
+    from config import settings
+    from services.llm_service import llm_service
+    from openai_batch_stub import OpenAIBatchStub
+
+    stub = OpenAIBatchStub()
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(settings, "openai_base_url", "https://openai.stub/v1")
+    monkeypatch.setattr(settings, "openai_batch_poll_seconds", 0.0)
+    monkeypatch.setattr(llm_service, "_batch_transport", stub.transport())
+    monkeypatch.setattr(llm_service, "_batch_client", None)
+    return stub
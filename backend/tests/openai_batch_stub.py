@@ -0,0 +1,114 @@
+"""
+OpenAI Batch API stub (httpx.MockTransport)
+
+LLMService._batch_transport에 넣어서 사용: files → batches → 상태 확인 → output / error 파일
+- 배치는 validating → in_progress → completed 순서로 진행 (상태 확인 polls_to_complete번째에 완료)
+- outcomes로 custom_id별 결과 지정: ok / http_error (error 파일, status_code 400) / line_error (error 필드) / missing
+- fail_batch=True면 출력 파일 없이 failed (errors.data)
+"""
+
+import json
+import uuid
+from typing import Dict, List, Optional
+import httpx
+
+
+class OpenAIBatchStub:
+    def __init__(self, outcomes: Optional[Dict[str, str]] = None, polls_to_complete: int = 2, fail_batch: bool = False):
+        self.outcomes = outcomes or {}
+        self.polls_to_complete = polls_to_complete
+        self.fail_batch = fail_batch
+        self.files: Dict[str, str] = {}
+        self.batches: Dict[str, Dict] = {}
+        self.requests: List[httpx.Request] = []
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def lines(self, batch_id: str) -> List[Dict]:
+        """Parsed JSONL input lines of a submitted batch"""
+        return [json.loads(line) for line in self.files[self.batches[batch_id]['input_file_id']].splitlines() if line]
+
+    # ==================== Routes ====================
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.headers.get('Authorization') != 'Bearer sk-test':
+            return httpx.Response(401, json={'error': {'message': 'invalid api key'}})
+
+        parts = request.url.path.strip('/').split('/')[1:]  # /v1/... 제외
+        if request.method == 'POST' and parts == ['files']:
+            return self._upload(request)
+        if request.method == 'POST' and parts == ['batches']:
+            return self._create_batch(json.loads(request.content))
+        if request.method == 'GET' and len(parts) == 2 and parts[0] == 'batches' and parts[1] in self.batches:
+            return httpx.Response(200, json=self._poll(parts[1]))
+        if request.method == 'POST' and len(parts) == 3 and parts[2] == 'cancel' and parts[1] in self.batches:
+            self.batches[parts[1]]['status'] = 'cancelling'
+            return httpx.Response(200, json=self._public(self.batches[parts[1]]))
+        if request.method == 'GET' and len(parts) == 3 and parts[0] == 'files' and parts[2] == 'content' and parts[1] in self.files:
+            return httpx.Response(200, text=self.files[parts[1]])
+        return httpx.Response(404, json={'error': {'message': f'not found: {request.method} {request.url.path}'}})
+
+    def _upload(self, request: httpx.Request) -> httpx.Response:
+        body = request.content.decode('utf-8')
+        if 'name="purpose"' not in body or 'batch' not in body:
+            return httpx.Response(400, json={'error': {'message': 'purpose must be batch'}})
+        # multipart 본문에서 JSONL 줄만 추출
+        jsonl = '\n'.join(line for line in body.splitlines() if line.startswith('{"custom_id"'))
+        file_id = f"file-{uuid.uuid4().hex[:8]}"
+        self.files[file_id] = jsonl
+        return httpx.Response(200, json={'id': file_id, 'object': 'file', 'purpose': 'batch'})
+
+    def _create_batch(self, payload: Dict) -> httpx.Response:
+        if payload.get('input_file_id') not in self.files:
+            return httpx.Response(400, json={'error': {'message': 'unknown input_file_id'}})
+        batch_id = f"batch_{uuid.uuid4().hex[:8]}"
+        self.batches[batch_id] = {'id': batch_id, 'status': 'validating', 'polls': 0, **payload}
+        return httpx.Response(200, json=self._public(self.batches[batch_id]))
+
+    def _poll(self, batch_id: str) -> Dict:
+        batch = self.batches[batch_id]
+        batch['polls'] += 1
+        if batch['status'] in ('validating', 'in_progress'):
+            if batch['polls'] < self.polls_to_complete:
+                batch['status'] = 'in_progress'
+            elif self.fail_batch:
+                batch['status'] = 'failed'
+                batch['errors'] = {'data': [{'code': 'invalid_request', 'message': 'input file is invalid'}]}
+            else:
+                batch['status'] = 'completed'
+                self._write_results(batch)
+        return self._public(batch)
+
+    def _write_results(self, batch: Dict):
+        output, errors = [], []
+        for line in self.lines(batch['id']):
+            custom_id = line['custom_id']
+            outcome = self.outcomes.get(custom_id, 'ok')
+            if outcome == 'ok':
+                output.append({'id': f"req-{custom_id}", 'custom_id': custom_id, 'error': None, 'response': {
+                    'status_code': 200,
+                    'body': {'choices': [{'message': {'content': f"  답글 {custom_id}  "}}],
+                             'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}}
+                }})
+            elif outcome == 'http_error':
+                errors.append({'id': f"req-{custom_id}", 'custom_id': custom_id, 'error': None, 'response': {
+                    'status_code': 400,
+                    'body': {'error': {'message': 'Invalid request: max_tokens too large'}}
+                }})
+            elif outcome == 'line_error':
+                errors.append({'id': f"req-{custom_id}", 'custom_id': custom_id, 'response': None,
+                               'error': {'code': 'batch_expired', 'message': 'request expired before completion'}})
+        batch['output_file_id'] = self._store('\n'.join(json.dumps(item) for item in output))
+        batch['error_file_id'] = self._store('\n'.join(json.dumps(item) for item in errors)) if errors else None
+        batch['request_counts'] = {'total': len(output) + len(errors), 'completed': len(output), 'failed': len(errors)}
+
+    def _store(self, content: str) -> str:
+        file_id = f"file-{uuid.uuid4().hex[:8]}"
+        self.files[file_id] = content + '\n'
+        return file_id
+
+    @staticmethod
+    def _public(batch: Dict) -> Dict:
+        return {key: value for key, value in batch.items() if key != 'polls'}
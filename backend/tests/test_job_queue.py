@@ -0,0 +1,193 @@
+"""
+In-process job queue: 대기열 크기 / 타입별 동시 실행 / 계정별 순차 실행 / 취소 / 종료
+(스텁 핸들러 + 메모리 모드 TaskManager - 브라우저 없이 실행)
+"""
+
+import threading
+import time
+import pytest
+from utils.job_queue import JobQueue, QueueFull
+
+WAIT = 5.0
+
+
+@pytest.fixture
+def task_manager(monkeypatch):
+    from utils.task_manager import task_manager
+
+    # DB 없이 메모리에만 기록
+    monkeypatch.setattr(task_manager, "db", None)
+    monkeypatch.setattr(task_manager, "collection", None)
+    return task_manager
+
+
+class Recorder:
+    """Stub handler: records start/finish order and blocks until released"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = []
+        self.running = {}
+        self.peak = {}
+        self.gates = {}
+        self.started = {}
+
+    def gate(self, name: str) -> threading.Event:
+        with self.lock:
+            self.started.setdefault(name, threading.Event())
+            return self.gates.setdefault(name, threading.Event())
+
+    def handler(self, task_type: str):
+        def run(task_id, user_id, params):
+            name = params['name']
+            gate = self.gate(name)
+            with self.lock:
+                self.events.append(('start', name))
+                self.running[task_type] = self.running.get(task_type, 0) + 1
+                self.peak[task_type] = max(self.peak.get(task_type, 0), self.running[task_type])
+            self.started[name].set()
+            if not params.get('quick'):
+                assert gate.wait(WAIT), f"{name} was never released"
+            with self.lock:
+                self.running[task_type] -= 1
+                self.events.append(('end', name))
+            return {'name': name}
+        return run
+
+    def release(self, name: str):
+        self.gate(name).set()
+
+    def wait_started(self, name: str) -> bool:
+        self.gate(name)
+        return self.started[name].wait(WAIT)
+
+    def starts(self):
+        with self.lock:
+            return [name for kind, name in self.events if kind == 'start']
+
+
+def _queue(recorder, types, **kwargs) -> JobQueue:
+    queue = JobQueue(workers=kwargs.pop('workers', 3), max_size=kwargs.pop('max_size', 10),
+                     type_limits=kwargs.pop('type_limits', {}), serial_types=kwargs.pop('serial_types', []))
+    for task_type in types:
+        queue.register(task_type, recorder.handler(task_type))
+    return queue
+
+
+def _submit(queue, task_manager, task_type, user_id, name, **params):
+    task_id = task_manager.create_task(task_type, user_id, {'name': name, **params})
+    queue.submit(task_id, task_type, user_id, {'name': name, **params})
+    return task_id
+
+
+def _wait_status(task_manager, task_id, status):
+    deadline = time.monotonic() + WAIT
+    while time.monotonic() < deadline:
+        if task_manager.get_task(task_id)['status'] == status:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_full_queue_rejects_new_jobs(task_manager):
+    recorder = Recorder()
+    queue = _queue(recorder, ['load'], workers=1, max_size=2)
+    first = _submit(queue, task_manager, 'load', 'u1', 'first')
+    assert recorder.wait_started('first')
+    _submit(queue, task_manager, 'load', 'u1', 'second')
+    _submit(queue, task_manager, 'load', 'u1', 'third')
+
+    with pytest.raises(QueueFull):
+        _submit(queue, task_manager, 'load', 'u1', 'fourth')
+    assert queue.stats()['queued'] == 2
+
+    for name in ('first', 'second', 'third'):
+        recorder.release(name)
+    assert _wait_status(task_manager, first, 'completed')
+    queue.shutdown(timeout=WAIT)
+    assert recorder.starts() == ['first', 'second', 'third']
+
+
+def test_type_limit_caps_concurrency_without_blocking_other_types(task_manager):
+    recorder = Recorder()
+    queue = _queue(recorder, ['load', 'post'], workers=3, type_limits={'load': 1})
+    _submit(queue, task_manager, 'load', 'u1', 'load-1')
+    load_2 = _submit(queue, task_manager, 'load', 'u2', 'load-2')
+    _submit(queue, task_manager, 'post', 'u3', 'post-1')
+
+    assert recorder.wait_started('load-1') and recorder.wait_started('post-1')
+    assert queue.position(load_2) == 1  # 워커가 남아 있어도 load 한도 때문에 대기
+
+    for name in ('post-1', 'load-1', 'load-2'):
+        recorder.release(name)
+    queue.shutdown(timeout=WAIT)
+    assert recorder.peak == {'load': 1, 'post': 1}
+    assert recorder.starts().index('load-2') > recorder.starts().index('load-1')
+
+
+def test_serial_types_run_one_at_a_time_per_account_in_order(task_manager):
+    recorder = Recorder()
+    queue = _queue(recorder, ['post', 'batch', 'load'], workers=4, serial_types=['post', 'batch'])
+    _submit(queue, task_manager, 'post', 'u1', 'u1-post')
+    assert recorder.wait_started('u1-post')
+    _submit(queue, task_manager, 'load', 'u1', 'u1-load', quick=True)  # serial 타입이 아니면 같은 계정도 병렬
+    _submit(queue, task_manager, 'batch', 'u1', 'u1-batch')  # 타입이 달라도 같은 계정 → 대기
+    _submit(queue, task_manager, 'post', 'u1', 'u1-post-2')
+    _submit(queue, task_manager, 'post', 'u2', 'u2-post')  # 다른 계정 → 바로 실행
+
+    assert recorder.wait_started('u1-load') and recorder.wait_started('u2-post')
+    time.sleep(0.1)  # u1-load가 끝나도 u1의 serial 작업은 풀리지 않아야 함
+    assert 'u1-batch' not in recorder.starts()
+
+    recorder.release('u1-post')
+    assert recorder.wait_started('u1-batch')
+    assert 'u1-post-2' not in recorder.starts()
+    recorder.release('u1-batch')
+    recorder.release('u1-post-2')
+    recorder.release('u2-post')
+    queue.shutdown(timeout=WAIT)
+
+    u1_serial = [name for name in recorder.starts() if name in ('u1-post', 'u1-batch', 'u1-post-2')]
+    assert u1_serial == ['u1-post', 'u1-batch', 'u1-post-2']
+    assert queue._running_accounts == set()
+
+
+def test_cancel_removes_pending_job_only(task_manager):
+    recorder = Recorder()
+    queue = _queue(recorder, ['load'], workers=1)
+    running = _submit(queue, task_manager, 'load', 'u1', 'running')
+    assert recorder.wait_started('running')
+
+    done = []
+    waiting = task_manager.create_task('load', 'u1', {'name': 'waiting'})
+    queue.submit(waiting, 'load', 'u1', {'name': 'waiting'}, on_done=lambda: done.append(waiting))
+
+    assert queue.cancel(waiting)
+    assert done == [waiting]  # 대기열에서 제거될 때도 on_done 호출
+    assert queue.position(waiting) is None
+    assert not queue.cancel(running)  # 이미 실행 중 → 협조적 취소 대상 (request_cancel)
+    assert not queue.cancel('unknown')
+
+    recorder.release('running')
+    queue.shutdown(timeout=WAIT)
+    assert recorder.starts() == ['running']
+
+
+def test_shutdown_fails_jobs_that_did_not_start(task_manager):
+    recorder = Recorder()
+    queue = _queue(recorder, ['load'], workers=1)
+    running = _submit(queue, task_manager, 'load', 'u1', 'running')
+    assert recorder.wait_started('running')
+    leftover = _submit(queue, task_manager, 'load', 'u1', 'leftover')
+
+    releaser = threading.Timer(0.3, recorder.release, args=('running',))
+    releaser.start()
+    queue.shutdown(timeout=0.1)  # 실행 중인 작업이 끝나기 전에 마감
+    releaser.join()
+
+    assert task_manager.get_task(leftover)['status'] == 'failed'
+    assert '서버 재시작' in task_manager.get_task(leftover)['error']
+    assert _wait_status(task_manager, running, 'completed')
+    assert recorder.starts() == ['running']
+    with pytest.raises(QueueFull):
+        _submit(queue, task_manager, 'load', 'u1', 'late')
@@ -0,0 +1,148 @@
+"""
+OpenAI Batch API 답글 초안: 제출 → 상태 확인 → output / error 파일 → reply_drafts 기록
+(tests/openai_batch_stub.py의 httpx.MockTransport 스텁 사용)
+"""
+
+import json
+import pytest
+from fastapi import HTTPException
+from models.schemas import GenerateReplyRequest
+
+
+def _requests(count: int):
+    return [
+        (str(index), GenerateReplyRequest(review_text=f"리뷰 {index} 맛있어요", rating=5, store_name="테스트 매장"))
+        for index in range(count)
+    ]
+
+
+def _drafts(count: int):
+    return [
+        {'custom_id': str(index), 'review_id': f"r{index}", 'author': f"작성자{index}", 'date': "2026.10.1.",
+         'content': f"리뷰 {index} 맛있어요", 'rating': 5}
+        for index in range(count)
+    ]
+
+
+def test_build_batch_jsonl_uses_chat_completion_params():
+    from services.llm_service import llm_service
+
+    lines = [json.loads(line) for line in llm_service.build_batch_jsonl(_requests(2)).decode('utf-8').splitlines()]
+
+    assert [line['custom_id'] for line in lines] == ['0', '1']
+    assert all(line['method'] == 'POST' and line['url'] == '/v1/chat/completions' for line in lines)
+    params, _ = llm_service._build_completion_params(_requests(1)[0][1])
+    assert set(lines[0]['body']) == set(params)
+    assert lines[0]['body']['model'] == params['model']
+
+
+def test_submit_poll_results_update_reply_draft(sqlite_db, batch_stub):
+    from services.llm_service import llm_service
+    from utils.db import save_reply_drafts, get_reply_drafts
+    from utils.draft_batches import draft_batches
+
+    batch_stub.outcomes = {'1': 'http_error', '2': 'line_error', '3': 'missing'}
+
+    batch = llm_service.submit_batch(_requests(4), metadata={'place_id': 'p1'})
+    assert batch['status'] == 'validating'
+    assert batch_stub.batches[batch['id']]['completion_window'] == '24h'
+    assert [line['custom_id'] for line in batch_stub.lines(batch['id'])] == ['0', '1', '2', '3']
+    assert save_reply_drafts('u1', 'p1', batch['id'], _drafts(4)) == 4
+    draft_batches.register(batch, 'u1', 'p1', 4)
+
+    statuses = []
+    while draft_batches.get(batch['id'], 'u1')['status'] == 'polling':
+        assert draft_batches.poll_once() == 1
+        statuses.append(draft_batches.get(batch['id'], 'u1')['batch_status'])
+    assert statuses == ['in_progress', 'completed']
+
+    results = llm_service.get_batch_results(llm_service.get_batch(batch['id']))
+    assert results['0'] == {'status': 'draft', 'generated_reply': '답글 0',
+                            'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}}
+    assert results['1'] == {'status': 'failed', 'error': 'Invalid request: max_tokens too large'}  # status_code != 200
+    assert results['2'] == {'status': 'failed', 'error': 'request expired before completion'}  # error 파일의 error 필드
+    assert '3' not in results
+
+    drafts = {draft['custom_id']: draft for draft in get_reply_drafts('u1', 'p1', batch_id=batch['id'])}
+    assert drafts['0']['status'] == 'draft' and drafts['0']['generated_reply'] == '답글 0'
+    assert [drafts[key]['status'] for key in ('1', '2', '3')] == ['failed', 'failed', 'failed']
+    assert drafts['2']['error'] == 'request expired before completion'
+    assert drafts['3']['error'] == '결과 없음 (batch completed)'
+
+
+def test_poller_records_finished_batch(sqlite_db, batch_stub):
+    from services.llm_service import llm_service
+    from utils.db import save_reply_drafts, get_reply_drafts
+    from utils.draft_batches import draft_batches
+
+    batch_stub.outcomes = {'1': 'http_error', '2': 'missing'}
+    batch_stub.polls_to_complete = 3
+    batch = llm_service.submit_batch(_requests(3))
+    save_reply_drafts('u1', 'p1', batch['id'], _drafts(3))
+    draft_batches.register(batch, 'u1', 'p1', 3)
+
+    assert draft_batches.poll_once() == 1
+    assert draft_batches.get(batch['id'], 'u1')['status'] == 'polling'
+    assert draft_batches.poll_once() == 1
+    assert draft_batches.poll_once() == 1
+
+    doc = draft_batches.get(batch['id'], 'u1')
+    assert (doc['status'], doc['batch_status'], doc['generated'], doc['failed']) == ('completed', 'completed', 1, 2)
+    assert doc['usage']['total_tokens'] == 120
+    assert draft_batches.poll_once() == 0  # 끝난 배치는 다시 확인하지 않음
+
+    drafts = {draft['custom_id']: draft for draft in get_reply_drafts('u1', 'p1')}
+    assert drafts['0']['generated_reply'] == '답글 0'
+    assert drafts['1']['error'] == 'Invalid request: max_tokens too large'
+    assert drafts['2']['error'] == '결과 없음 (batch completed)'
+
+
+def test_poller_fails_drafts_of_failed_batch(sqlite_db, batch_stub):
+    from services.llm_service import llm_service
+    from utils.db import save_reply_drafts, get_reply_drafts
+    from utils.draft_batches import draft_batches
+
+    batch_stub.fail_batch = True
+    batch_stub.polls_to_complete = 1
+    batch = llm_service.submit_batch(_requests(2))
+    save_reply_drafts('u1', 'p1', batch['id'], _drafts(2))
+    draft_batches.register(batch, 'u1', 'p1', 2)
+
+    draft_batches.poll_once()
+
+    assert draft_batches.get(batch['id'], 'u1')['status'] == 'failed'
+    drafts = get_reply_drafts('u1', 'p1')
+    assert [draft['status'] for draft in drafts] == ['failed', 'failed']
+    assert all(draft['error'] == 'OpenAI 배치 실패: input file is invalid' for draft in drafts)
+
+
+def test_poller_gives_up_after_repeated_check_errors(sqlite_db, batch_stub, monkeypatch):
+    from config import settings
+    from utils.db import save_reply_drafts, get_reply_drafts
+    from utils.draft_batches import draft_batches
+
+    monkeypatch.setattr(settings, "openai_batch_max_poll_errors", 2)
+    save_reply_drafts('u1', 'p1', 'batch_unknown', _drafts(1))
+    draft_batches.register({'id': 'batch_unknown', 'status': 'validating'}, 'u1', 'p1', 1)
+
+    draft_batches.poll_once()
+    assert draft_batches.get('batch_unknown', 'u1')['poll_errors'] == 1
+    draft_batches.poll_once()
+
+    doc = draft_batches.get('batch_unknown', 'u1')
+    assert doc['status'] == 'failed' and '404' in doc['last_error']
+    assert get_reply_drafts('u1', 'p1')[0]['status'] == 'failed'
+
+
+def test_batch_request_errors_become_502(batch_stub, monkeypatch):
+    from config import settings
+    from services.llm_service import llm_service
+
+    with pytest.raises(HTTPException) as error:
+        llm_service.get_batch('batch_missing')
+    assert error.value.status_code == 502 and '404' in error.value.detail
+
+    monkeypatch.setattr(settings, "openai_api_key", "sk-wrong")
+    with pytest.raises(HTTPException) as error:
+        llm_service.submit_batch(_requests(1))
+    assert '401' in error.value.detail
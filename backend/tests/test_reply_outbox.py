@@ -0,0 +1,65 @@
+"""
+Reply outbox 재시도: 결과 기록 (sent / 백오프 후 pending) + 이미 게시된 답글 확인
+(post_replies_batch / find_replied_reviews는 스텁으로 교체 - 브라우저 없이 실행)
+"""
+
+from datetime import datetime
+
+NOT_FOUND = "Could not find review: author='작성자...', date='2026.10.1.'"
+
+
+def _claim(sqlite_db, reply_outbox, authors, task_id):
+    ids = [
+        reply_outbox.add('u1', 'p1', {'author': author, 'date': "2026.10.1.", 'content': "맛있어요", 'reply_text': "감사합니다"},
+                         'Reply verification failed')
+        for author in authors
+    ]
+    sqlite_db.reply_outbox.update_many({'_id': {'$in': ids}}, {'$set': {'status': 'sending', 'task_id': task_id}})
+    return ids
+
+
+def test_already_posted_replies_are_recorded_as_sent(sqlite_db, monkeypatch):
+    from services.naver_automation_selenium import naver_automation_selenium
+    from services.naver_tasks import run_reply_outbox
+    from utils.db import save_naver_reviews
+    from utils.reply_outbox import reply_outbox
+    from utils.task_manager import task_manager
+
+    monkeypatch.setattr(task_manager, "update_progress", lambda *args, **kwargs: None)
+    ids = _claim(sqlite_db, reply_outbox, ['작성자0', '작성자1', '작성자2', '작성자3'], 'task-1')
+    # 작성자2: 마지막 로드 결과에 이미 답글이 있음 → 브라우저 확인 없이 sent
+    save_naver_reviews('u1', 'p1', [{'author': '작성자2', 'date': "2026.10.1.", 'has_reply': True}], 1, datetime.utcnow())
+
+    def post_replies_batch(place_id, items, **kwargs):
+        results = [{'index': 0, 'author': items[0]['author'], 'date': items[0]['date'], 'status': 'posted'}]
+        results += [{'index': index, 'author': items[index]['author'], 'date': items[index]['date'], 'status': 'failed', 'error': NOT_FOUND}
+                    for index in range(1, len(items))]
+        return {'success': False, 'cancelled': False, 'total': len(items), 'posted': 1, 'failed': len(items) - 1, 'results': results}
+
+    checked = []
+
+    def find_replied_reviews(place_id, items, **kwargs):
+        checked.extend(item['author'] for item in items)
+        return [index for index, item in enumerate(items) if item['author'] == '작성자1']  # 답글 등록된 목록에서 찾음
+
+    monkeypatch.setattr(naver_automation_selenium, "post_replies_batch", post_replies_batch)
+    monkeypatch.setattr(naver_automation_selenium, "find_replied_reviews", find_replied_reviews)
+
+    result = run_reply_outbox('task-1', 'u1', {'place_id': 'p1', 'entry_ids': ids})
+
+    assert checked == ['작성자1', '작성자3']
+    assert (result['posted'], result['failed'], result['already_replied'], result['success']) == (3, 1, 2, False)
+    entries = {entry['author']: entry for entry in sqlite_db.reply_outbox.find({})}
+    assert entries['작성자0']['status'] == 'sent' and not entries['작성자0'].get('already_replied')
+    assert [entries[author]['status'] for author in ('작성자1', '작성자2')] == ['sent', 'sent']
+    assert entries['작성자1']['already_replied'] and entries['작성자2']['already_replied']
+    assert (entries['작성자3']['status'], entries['작성자3']['attempts']) == ('pending', 2)  # 어디에도 없음 → 재시도
+
+
+def test_classify_error():
+    from utils.reply_outbox import classify_error
+
+    assert classify_error(NOT_FOUND)
+    assert classify_error('Reply verification failed: reply not rendered')
+    assert not classify_error('이미 답글이 존재하는 리뷰입니다.')
+    assert not classify_error('알 수 없는 오류')
@@ -0,0 +1,113 @@
+"""
+SQLite 저장소: SQL WHERE로 먼저 거른 결과(_sql_filter)와 문서 매칭(_matches)이 같은지 + 원자적 업데이트
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from utils.sqlite_store import _matches, _sql_filter
+
+T0 = datetime(2026, 10, 19, 9, 0, 0)
+
+DOCS = [
+    {'_id': 'a', 'status': 'pending', 'type': 'reply_post', 'user_id': 'u1', 'created_at': T0, 'attempts': 0},
+    {'_id': 'b', 'status': 'processing', 'type': 'review_load', 'user_id': 'u1', 'created_at': T0 + timedelta(minutes=1),
+     'lease_expires_at': T0 + timedelta(minutes=5), 'attempts': 1},
+    {'_id': 'c', 'status': 'processing', 'type': 'reply_post', 'user_id': 'u2', 'created_at': T0 + timedelta(minutes=2),
+     'lease_expires_at': T0 - timedelta(minutes=1), 'attempts': 2},
+    {'_id': 'd', 'status': None, 'type': 'reply_batch', 'user_id': 'u2', 'created_at': T0 + timedelta(seconds=30, microseconds=5)},
+    {'_id': 'e', 'type': 'auto_reply', 'user_id': ['u1', 'u3'], 'created_at': T0 + timedelta(hours=1), 'lease_expires_at': None},
+    {'_id': 'f', 'status': 'completed', 'type': 'reply_post', 'user_id': 'u3', 'task_id': 7, 'created_at': '2026-10-19'},
+    {'_id': 'g', 'status': {'nested': True}, 'user_id': 'u1', 'place_id': 'p1', 'progress': {'current': 3}},
+]
+
+QUERIES = [
+    {},
+    {'_id': 'c'},
+    {'_id': {'$in': ['a', 'f', 'zz']}},
+    {'status': 'processing'},
+    {'status': None},
+    {'status': {'$ne': None}},
+    {'status': {'$exists': False}},
+    {'status': {'$in': ['pending', None]}},
+    {'status': {'$in': []}},
+    {'status': {'$nin': ['pending', 'processing']}},
+    {'status': {'$nin': [None]}},
+    {'user_id': 'u1'},
+    {'user_id': {'$in': ['u3']}},
+    {'task_id': 7},
+    {'task_id': '7'},
+    {'type': 'reply_post', 'user_id': {'$ne': 'u2'}},
+    {'$or': [{'status': 'pending'}, {'lease_expires_at': {'$lt': T0}}]},
+    {'$or': [{'status': 'pending'}, {'progress.current': {'$gte': 3}}]},  # 인덱스 없는 분기 → 전체가 후보
+    {'$or': [{'type': 'auto_reply'}, {'status': None}], 'user_id': 'u2'},
+    {'$nor': [{'type': {'$in': ['reply_post']}, 'user_id': {'$in': ['u2']}}]},
+    {'$nor': [{'status': 'processing'}, {'status': None}]},
+    {'$and': [{'user_id': 'u1'}, {'attempts': {'$gte': 1}}]},
+    {'created_at': {'$gte': T0, '$lt': T0 + timedelta(minutes=2)}},
+    {'created_at': {'$gt': T0 + timedelta(seconds=30)}},
+    {'created_at': {'$lte': T0 + timedelta(seconds=30, microseconds=5)}},
+    {'lease_expires_at': {'$lt': T0 + timedelta(minutes=10)}, 'status': 'processing'},
+    {'lease_expires_at': None},
+    {'place_id': 'p1', 'progress.current': 3},
+]
+
+
+@pytest.fixture
+def tasks(sqlite_db):
+    collection = sqlite_db.tasks
+    collection.insert_many([dict(doc) for doc in DOCS])
+    return collection
+
+
+@pytest.mark.parametrize('query', QUERIES, ids=[repr(query) for query in QUERIES])
+def test_sql_prefilter_agrees_with_matcher(tasks, query):
+    expected = sorted(doc['_id'] for doc in DOCS if _matches(doc, query))
+    assert sorted(doc['_id'] for doc in tasks.find(query)) == expected
+    assert tasks.count_documents(query) == len(expected)
+
+
+def test_matcher_null_semantics():
+    # Mongo처럼 None 비교는 없는 필드도 포함
+    assert sorted(doc['_id'] for doc in DOCS if _matches(doc, {'status': None})) == ['d', 'e']
+    assert sorted(doc['_id'] for doc in DOCS if _matches(doc, {'status': {'$nin': ['pending', None]}})) == ['b', 'c', 'f', 'g']
+
+
+def test_indexed_conditions_are_pushed_into_sql():
+    assert _sql_filter({'status': 'pending', 'lease_expires_at': {'$lt': T0}})[0]
+    assert _sql_filter({'$or': [{'status': 'pending'}, {'user_id': {'$in': ['u1']}}]})[0]
+    assert not _sql_filter({'$or': [{'status': 'pending'}, {'progress.current': 3}]})[0]
+    assert not _sql_filter({'$nor': [{'status': 'pending'}]})[0]
+
+
+def test_find_one_and_update_uses_sort(tasks):
+    before = tasks.find_one_and_update(
+        {'status': {'$in': ['pending', 'processing']}},
+        {'$set': {'status': 'claimed'}, '$inc': {'attempts': 1}},
+        sort=[('created_at', -1)]
+    )
+    assert (before['_id'], before['status'], before['attempts']) == ('c', 'processing', 2)
+    assert tasks.find_one({'_id': 'c'})['attempts'] == 3
+
+    after = tasks.find_one_and_update({'status': {'$in': ['pending', 'processing']}}, {'$set': {'status': 'claimed'}},
+                                      sort=[('created_at', 1)], return_document=True)
+    assert (after['_id'], after['status']) == ('a', 'claimed')
+    assert tasks.find_one({'status': 'claimed', 'created_at': {'$lt': T0 + timedelta(minutes=1)}})['_id'] == 'a'
+    assert tasks.find_one_and_update({'status': 'missing'}, {'$set': {'status': 'x'}}) is None
+
+
+def test_upsert_with_set_on_insert_and_inc(sqlite_db):
+    leases = sqlite_db.account_leases
+    update = {'$setOnInsert': {'created_at': T0}, '$set': {'task_id': 't1'}, '$inc': {'claims': 1}}
+
+    inserted = leases.find_one_and_update({'_id': 'u1'}, update, upsert=True, return_document=True)
+    assert inserted == {'_id': 'u1', 'created_at': T0, 'task_id': 't1', 'claims': 1}
+
+    update = {'$setOnInsert': {'created_at': T0 + timedelta(days=1)}, '$set': {'task_id': 't2'}, '$inc': {'claims': 2}}
+    result = leases.update_one({'_id': 'u1'}, update, upsert=True)
+    assert (result.matched_count, result.upserted_id) == (1, None)
+    assert leases.find_one({'_id': 'u1'}) == {'_id': 'u1', 'created_at': T0, 'task_id': 't2', 'claims': 3}
+
+    # 필터의 값 조건은 새 문서에 들어가고 연산자 조건은 들어가지 않음
+    result = leases.update_one({'user_id': 'u2', 'expires_at': {'$lt': T0}}, {'$inc': {'claims': 1}}, upsert=True)
+    doc = leases.find_one({'_id': result.upserted_id})
+    assert (doc['user_id'], doc['claims'], 'expires_at' in doc) == ('u2', 1, False)
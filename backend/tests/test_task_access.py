@@ -0,0 +1,43 @@
+"""
+작업 API 접근 권한: 작업을 만든 네이버 계정(task.user_id)에 연결된 구글 계정만 조회 가능
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+OWNER = {'X-Google-Email': 'owner@example.com'}
+OTHER = {'X-Google-Email': 'other@example.com'}
+
+
+@pytest.fixture
+def client(sqlite_db, monkeypatch):
+    from config import settings
+    from api.routes import naver
+    from utils.task_manager import task_manager
+
+    # 권한 검증 켜기 (세션은 SQLite 저장소에서 조회)
+    monkeypatch.setattr(settings, "use_mongodb", True)
+    monkeypatch.setattr(settings, "mongodb_url", "mongodb://auth-check")
+    sqlite_db.naver_sessions.insert_one({'_id': 'naver1', 'google_emails': ['owner@example.com']})
+    tasks = {'t1': {'_id': 't1', 'type': 'review_load', 'user_id': 'naver1', 'status': 'processing', 'progress': {}}}
+    monkeypatch.setattr(task_manager, "get_task", tasks.get)
+
+    app = FastAPI()
+    app.include_router(naver.router, prefix="/api/naver")
+    return TestClient(app)
+
+
+def test_task_result_requires_access(client):
+    assert client.get("/api/naver/tasks/t1/result").status_code == 401
+    assert client.get("/api/naver/tasks/t1/result", headers=OTHER).status_code == 403
+    assert client.get("/api/naver/tasks/t1/result", headers=OWNER).status_code == 409  # 권한 확인 후 → 아직 실행 중
+    assert client.get("/api/naver/tasks/missing/result", headers=OWNER).status_code == 404
+
+
+def test_task_event_stream_requires_access(client):
+    from utils.task_events import task_events
+
+    assert client.get("/api/naver/tasks/t1/events").status_code == 401
+    assert client.get("/api/naver/tasks/t1/events", params={'google_email': 'other@example.com'}).status_code == 403
+    assert not task_events._subscribers.get('t1')  # 거부된 연결은 구독 해제
@@ -1,14 +1,19 @@
 """
 MongoDB Database Connection and Utilities
 파일 기반 저장소를 MongoDB로 대체하여 클라우드 배포 시 데이터 영속성 확보
+
+MongoDB를 사용하지 않으면 내장 SQLite 저장소(utils/sqlite_store.py)를 같은 인터페이스로 사용
+→ get_db()는 항상 db.<collection>.find_one(...) 형태로 사용 가능
 """
 
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, DESCENDING
 from pymongo.errors import ConnectionFailure
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import json
 import os
-from datetime import datetime
+import time
+import uuid
+from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +21,7 @@ logger = logging.getLogger(__name__)
 # Global MongoDB client
 _client: Optional[MongoClient] = None
 _db = None
+_sqlite = None
 
 
 def init_mongodb(mongodb_url: str):
@@ -45,11 +51,44 @@ def init_mongodb(mongodb_url: str):
         return False
 
 
+def init_sqlite(sqlite_path: str) -> bool:
+    """Initialize the embedded SQLite store (used when MongoDB is not available)"""
+    global _sqlite
+    
+    try:
+        from utils.sqlite_store import SQLiteStore
+        _sqlite = SQLiteStore(sqlite_path)
+        logger.info(f"✅ SQLite store ready: {sqlite_path}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ SQLite initialization error: {e}")
+        _sqlite = None
+        return False
+
+
+def init_database() -> str:
+    """
+    Initialize storage from settings: MongoDB if configured and reachable, otherwise SQLite
+    
+    Returns:
+        'mongodb', 'sqlite' or 'file'
+    """
+    from config import settings
+    
+    if settings.use_mongodb and settings.mongodb_url and init_mongodb(settings.mongodb_url):
+        return "mongodb"
+    if settings.use_sqlite and init_sqlite(settings.sqlite_path):
+        return "sqlite"
+    return "file"
+
+
 def get_db():
-    """Get MongoDB database instance"""
-    if _db is None:
-        raise Exception("MongoDB not initialized. Call init_mongodb() first.")
-    return _db
+    """Get database instance (MongoDB, or the SQLite store when MongoDB is not used)"""
+    if _db is not None:
+        return _db
+    if _sqlite is not None:
+        return _sqlite
+    raise Exception("Database not initialized. Call init_database() first.")
 
 
 def is_mongodb_available() -> bool:
@@ -57,18 +96,84 @@ def is_mongodb_available() -> bool:
     return _db is not None
 
 
+def is_db_available() -> bool:
+    """Check if any database backend (MongoDB or SQLite) is available"""
+    return _db is not None or _sqlite is not None
+
+
+# ==================== Indexes ====================
+
+def ensure_indexes() -> float:
+    """
+    Create indexes used by the app's queries (startup, idempotent)
+    
+    - tasks / task_results: created_at TTL → TASK_RETENTION_DAYS 지나면 MongoDB가 자동 삭제
+    - tasks: worker claim 조회 (status, type, created_at), 중복 제출 확인 (idempotency_key)
+    - naver_sessions: google_emails(multikey) + last_used → /status, /sessions/list
+    - place_ai_settings: (place_id, google_email) unique
+    - reply_outbox: (status, next_attempt_at) → 재시도 기한이 된 답글 조회
+    - reply_drafts: 리뷰별 최신 초안 (user_id, place_id, author, date), 배치 결과 기록 (batch_id, custom_id)
+    - naver_reviews: 계정별 삭제 (user_id)
+    - reply_draft_batches: 확인할 배치 (status, next_poll_at), 계정별 목록 (user_id, created_at)
+    
+    SQLite는 컬렉션을 열 때 인덱스 컬럼을 만들고 (utils.sqlite_store), 여기서는 보관 기간이 지난 작업을 삭제
+    
+    Returns:
+        Elapsed seconds
+    """
+    from config import settings
+    
+    started = time.monotonic()
+    retention_seconds = settings.task_retention_days * 24 * 3600
+    
+    if is_mongodb_available():
+        db = get_db()
+        indexes = [
+            (db.tasks, [("created_at", ASCENDING)], {"name": "tasks_ttl", "expireAfterSeconds": retention_seconds}),
+            (db.tasks, [("status", ASCENDING), ("type", ASCENDING), ("created_at", ASCENDING)], {"name": "tasks_claim"}),
+            (db.tasks, [("idempotency_key", ASCENDING), ("created_at", DESCENDING)], {"name": "tasks_idempotency"}),
+            (db.task_results, [("created_at", ASCENDING)], {"name": "task_results_ttl", "expireAfterSeconds": retention_seconds}),
+            (db.task_results, [("task_id", ASCENDING), ("chunk", ASCENDING)], {"name": "task_results_chunk"}),
+            (db.naver_sessions, [("google_emails", ASCENDING), ("last_used", DESCENDING)], {"name": "naver_sessions_email_last_used"}),
+            (db.place_ai_settings, [("place_id", ASCENDING), ("google_email", ASCENDING)], {"name": "place_ai_settings_unique", "unique": True}),
+            (db.reply_outbox, [("status", ASCENDING), ("next_attempt_at", ASCENDING)], {"name": "reply_outbox_due"}),
+            (db.reply_drafts, [("user_id", ASCENDING), ("place_id", ASCENDING), ("author", ASCENDING), ("date", ASCENDING)], {"name": "reply_drafts_review"}),
+            (db.reply_drafts, [("batch_id", ASCENDING), ("custom_id", ASCENDING)], {"name": "reply_drafts_batch"}),
+            (db.naver_reviews, [("user_id", ASCENDING)], {"name": "naver_reviews_user"}),
+            (db.reply_draft_batches, [("status", ASCENDING), ("next_poll_at", ASCENDING)], {"name": "reply_draft_batches_due"}),
+            (db.reply_draft_batches, [("user_id", ASCENDING), ("created_at", DESCENDING)], {"name": "reply_draft_batches_user"}),
+        ]
+        for collection, keys, options in indexes:
+            try:
+                collection.create_index(keys, **options)
+            except Exception as e:
+                # 기존 인덱스 옵션 충돌 / 중복 데이터 등 - 나머지 인덱스는 계속 생성
+                logger.error(f"❌ Failed to create index {collection.name}.{options['name']}: {e}")
+    elif is_db_available():
+        db = get_db()
+        cutoff = datetime.utcnow() - timedelta(seconds=retention_seconds)
+        deleted = db.tasks.delete_many({"created_at": {"$lt": cutoff}}).deleted_count
+        db.task_results.delete_many({"created_at": {"$lt": cutoff}})
+        if deleted:
+            logger.info(f"🗑️ Expired {deleted} old tasks from SQLite")
+    
+    elapsed = time.monotonic() - started
+    logger.info(f"✅ Database indexes ready ({elapsed:.2f}s)")
+    return elapsed
+
+
 # ==================== Token Management ====================
 
 def save_token(platform: str, user_id: str, token_data: Dict[str, Any]) -> bool:
     """
-    Save OAuth token to MongoDB or file
+    Save OAuth token to database or file
     
     Args:
         platform: 'google' or 'naver'
         user_id: User identifier
         token_data: Token data dictionary
     """
-    if is_mongodb_available():
+    if is_db_available():
         try:
             db = get_db()
             db.tokens.update_one(
@@ -81,10 +186,10 @@ def save_token(platform: str, user_id: str, token_data: Dict[str, Any]) -> bool:
                 },
                 upsert=True
             )
-            logger.info(f"✅ Token saved to MongoDB: {platform}/{user_id}")
+            logger.info(f"✅ Token saved to database: {platform}/{user_id}")
             return True
         except Exception as e:
-            logger.error(f"❌ Failed to save token to MongoDB: {e}")
+            logger.error(f"❌ Failed to save token to database: {e}")
             return False
     else:
         # Fallback to file-based storage
@@ -102,7 +207,7 @@ def save_token(platform: str, user_id: str, token_data: Dict[str, Any]) -> bool:
 
 def get_token(platform: str, user_id: str) -> Optional[Dict[str, Any]]:
     """
-    Get OAuth token from MongoDB or file
+    Get OAuth token from database or file
     
     Args:
         platform: 'google' or 'naver'
@@ -111,19 +216,19 @@ def get_token(platform: str, user_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Token data dictionary or None
     """
-    if is_mongodb_available():
+    if is_db_available():
         try:
             db = get_db()
             result = db.tokens.find_one({"platform": platform, "user_id": user_id})
             if result:
-                logger.info(f"✅ Token retrieved from MongoDB: {platform}/{user_id}")
+                logger.info(f"✅ Token retrieved from database: {platform}/{user_id}")
                 return result.get("token_data")
-            return None
         except Exception as e:
-            logger.error(f"❌ Failed to get token from MongoDB: {e}")
+            logger.error(f"❌ Failed to get token from database: {e}")
             return None
-    else:
-        # Fallback to file-based storage
+    
+    # File-based storage (SQLite 도입 이전에 저장된 토큰 파일도 계속 읽음)
+    if not is_mongodb_available():
         from config import settings
         token_file = os.path.join(settings.tokens_dir, f"{platform}_{user_id}.json")
         if os.path.exists(token_file):
@@ -136,18 +241,19 @@ def get_token(platform: str, user_id: str) -> Optional[Dict[str, Any]]:
                 logger.error(f"❌ Failed to read token from file: {e}")
                 return None
         return None
+    return None
 
 
 def delete_token(platform: str, user_id: str) -> bool:
     """Delete OAuth token"""
-    if is_mongodb_available():
+    if is_db_available():
         try:
             db = get_db()
             result = db.tokens.delete_one({"platform": platform, "user_id": user_id})
-            logger.info(f"✅ Token deleted from MongoDB: {platform}/{user_id}")
+            logger.info(f"✅ Token deleted from database: {platform}/{user_id}")
             return result.deleted_count > 0
         except Exception as e:
-            logger.error(f"❌ Failed to delete token from MongoDB: {e}")
+            logger.error(f"❌ Failed to delete token from database: {e}")
             return False
     else:
         # Fallback to file-based storage
@@ -168,7 +274,7 @@ def delete_token(platform: str, user_id: str) -> bool:
 
 def save_naver_session(user_id: str, session_data: Dict[str, Any]) -> bool:
     """Save Naver browser session"""
-    if is_mongodb_available():
+    if is_db_available():
         try:
             db = get_db()
             db.naver_sessions.update_one(
@@ -181,10 +287,10 @@ def save_naver_session(user_id: str, session_data: Dict[str, Any]) -> bool:
                 },
                 upsert=True
             )
-            logger.info(f"✅ Naver session saved to MongoDB: {user_id}")
+            logger.info(f"✅ Naver session saved to database: {user_id}")
             return True
         except Exception as e:
-            logger.error(f"❌ Failed to save Naver session to MongoDB: {e}")
+            logger.error(f"❌ Failed to save Naver session to database: {e}")
             return False
     else:
         # Fallback to file-based storage
@@ -203,19 +309,19 @@ def save_naver_session(user_id: str, session_data: Dict[str, Any]) -> bool:
 
 def get_naver_session(user_id: str) -> Optional[Dict[str, Any]]:
     """Get Naver browser session"""
-    if is_mongodb_available():
+    if is_db_available():
         try:
             db = get_db()
             result = db.naver_sessions.find_one({"user_id": user_id})
             if result:
-                logger.info(f"✅ Naver session retrieved from MongoDB: {user_id}")
+                logger.info(f"✅ Naver session retrieved from database: {user_id}")
                 return result.get("session_data")
-            return None
         except Exception as e:
-            logger.error(f"❌ Failed to get Naver session from MongoDB: {e}")
+            logger.error(f"❌ Failed to get Naver session from database: {e}")
             return None
-    else:
-        # Fallback to file-based storage
+    
+    # File-based storage (SQLite 도입 이전에 저장된 세션 파일도 계속 읽음)
+    if not is_mongodb_available():
         from config import settings
         session_file = os.path.join(settings.data_dir, "naver_sessions", f"session_{user_id}.json")
         if os.path.exists(session_file):
@@ -228,13 +334,270 @@ def get_naver_session(user_id: str) -> Optional[Dict[str, Any]]:
                 logger.error(f"❌ Failed to read Naver session from file: {e}")
                 return None
         return None
+    return None
+
+
+# ==================== Naver Places (per account) ====================
+
+def save_naver_places(user_id: str, places: list, fetched_at: datetime) -> bool:
+    """
+    Save the places list of a Naver account with its fetch timestamp
+    
+    Args:
+        user_id: Naver session ID
+        places: List of place dicts from get_places()
+        fetched_at: UTC time the list was scraped
+    """
+    if is_db_available():
+        try:
+            db = get_db()
+            db.naver_places.update_one(
+                {"_id": user_id},
+                {
+                    "$set": {
+                        "places": places,
+                        "fetched_at": fetched_at,
+                        "updated_at": datetime.utcnow()
+                    }
+                },
+                upsert=True
+            )
+            logger.info(f"✅ Naver places saved to database: {user_id} ({len(places)})")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to save Naver places to database: {e}")
+            return False
+    else:
+        # Fallback to file-based storage
+        from config import settings
+        places_file = os.path.join(settings.data_dir, "naver_places", f"places_{user_id}.json")
+        os.makedirs(os.path.dirname(places_file), exist_ok=True)
+        try:
+            with open(places_file, 'w', encoding='utf-8') as f:
+                json.dump({"places": places, "fetched_at": fetched_at.isoformat()}, f, ensure_ascii=False, indent=2)
+            logger.info(f"✅ Naver places saved to file: {places_file}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to save Naver places to file: {e}")
+            return False
+
+
+def get_naver_places(user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the stored places list of a Naver account
+    
+    Returns:
+        {"places": [...], "fetched_at": datetime} or None
+    """
+    if is_db_available():
+        try:
+            db = get_db()
+            result = db.naver_places.find_one({"_id": user_id})
+            if result:
+                return {"places": result.get("places", []), "fetched_at": result.get("fetched_at")}
+            return None
+        except Exception as e:
+            logger.error(f"❌ Failed to get Naver places from database: {e}")
+            return None
+    else:
+        # Fallback to file-based storage
+        from config import settings
+        places_file = os.path.join(settings.data_dir, "naver_places", f"places_{user_id}.json")
+        if os.path.exists(places_file):
+            try:
+                with open(places_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                return {"places": data.get("places", []), "fetched_at": datetime.fromisoformat(data["fetched_at"])}
+            except Exception as e:
+                logger.error(f"❌ Failed to read Naver places from file: {e}")
+                return None
+        return None
+
+
+def delete_naver_places(user_id: str) -> bool:
+    """
+    Delete the stored places list of a Naver account (logout / session delete)
+    
+    다음 get_places에서 새로 조회하도록 영속 캐시 제거
+    
+    Returns:
+        True if a stored list was removed
+    """
+    if is_db_available():
+        try:
+            result = get_db().naver_places.delete_one({"_id": user_id})
+            if result.deleted_count:
+                logger.info(f"🗑️ Naver places deleted from database: {user_id}")
+            return result.deleted_count > 0
+        except Exception as e:
+            logger.error(f"❌ Failed to delete Naver places from database: {e}")
+            return False
+    else:
+        # Fallback to file-based storage
+        from config import settings
+        places_file = os.path.join(settings.data_dir, "naver_places", f"places_{user_id}.json")
+        if os.path.exists(places_file):
+            try:
+                os.remove(places_file)
+                logger.info(f"🗑️ Naver places file deleted: {places_file}")
+                return True
+            except Exception as e:
+                logger.error(f"❌ Failed to delete Naver places file: {e}")
+        return False
+
+
+def load_all_naver_places() -> Dict[str, Dict[str, Any]]:
+    """
+    Load stored places lists of every account (startup warm-start)
+    
+    Returns:
+        {user_id: {"places": [...], "fetched_at": datetime}}
+    """
+    all_places = {}
+    if is_db_available():
+        try:
+            db = get_db()
+            for doc in db.naver_places.find({}):
+                all_places[doc["_id"]] = {"places": doc.get("places", []), "fetched_at": doc.get("fetched_at")}
+        except Exception as e:
+            logger.error(f"❌ Failed to load Naver places from database: {e}")
+    else:
+        # Fallback to file-based storage
+        from config import settings
+        places_dir = os.path.join(settings.data_dir, "naver_places")
+        if os.path.isdir(places_dir):
+            for filename in os.listdir(places_dir):
+                if filename.startswith("places_") and filename.endswith(".json"):
+                    user_id = filename[len("places_"):-len(".json")]
+                    stored = get_naver_places(user_id)
+                    if stored:
+                        all_places[user_id] = stored
+    return all_places
+
+
+# ==================== Naver Reviews ====================
+
+def _reviews_file(user_id: str, place_id: str) -> str:
+    from config import settings
+    return os.path.join(settings.data_dir, "naver_reviews", f"reviews_{user_id}_{place_id}.json")
+
+
+def save_naver_reviews(user_id: str, place_id: str, reviews: List[Dict[str, Any]], total: int, loaded_at: datetime) -> bool:
+    """
+    Save the last loaded review list of a place (한 매장당 한 문서, 새로 로드하면 교체)
+    
+    Args:
+        user_id: Naver session ID
+        place_id: Naver place ID
+        reviews: Review dicts from the scraper (review_id, author, date, content, reply ...)
+        total: Total review count reported by the page
+        loaded_at: UTC time the list was scraped
+    """
+    if is_db_available():
+        try:
+            db = get_db()
+            db.naver_reviews.update_one(
+                {"_id": f"{user_id}:{place_id}"},
+                {
+                    "$set": {
+                        "user_id": user_id,
+                        "place_id": place_id,
+                        "reviews": reviews,
+                        "total": total,
+                        "loaded_at": loaded_at,
+                        "updated_at": datetime.utcnow()
+                    }
+                },
+                upsert=True
+            )
+            logger.info(f"✅ Naver reviews saved to database: {user_id} / {place_id} ({len(reviews)})")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to save Naver reviews to database: {e}")
+            return False
+    else:
+        # Fallback to file-based storage
+        reviews_file = _reviews_file(user_id, place_id)
+        os.makedirs(os.path.dirname(reviews_file), exist_ok=True)
+        try:
+            with open(reviews_file, 'w', encoding='utf-8') as f:
+                json.dump({"reviews": reviews, "total": total, "loaded_at": loaded_at.isoformat()}, f, ensure_ascii=False)
+            logger.info(f"✅ Naver reviews saved to file: {reviews_file}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to save Naver reviews to file: {e}")
+            return False
+
+
+def get_naver_reviews(user_id: str, place_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the last saved review list of a place
+    
+    Returns:
+        {"reviews": [...], "total": int, "loaded_at": datetime} or None
+    """
+    if is_db_available():
+        try:
+            result = get_db().naver_reviews.find_one({"_id": f"{user_id}:{place_id}"})
+            if result:
+                return {"reviews": result.get("reviews", []), "total": result.get("total", 0), "loaded_at": result.get("loaded_at")}
+            return None
+        except Exception as e:
+            logger.error(f"❌ Failed to get Naver reviews from database: {e}")
+            return None
+    else:
+        # Fallback to file-based storage
+        reviews_file = _reviews_file(user_id, place_id)
+        if os.path.exists(reviews_file):
+            try:
+                with open(reviews_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                return {"reviews": data.get("reviews", []), "total": data.get("total", 0),
+                        "loaded_at": datetime.fromisoformat(data["loaded_at"])}
+            except Exception as e:
+                logger.error(f"❌ Failed to read Naver reviews from file: {e}")
+                return None
+        return None
+
+
+def delete_naver_reviews(user_id: str) -> int:
+    """
+    Delete every saved review list of a Naver account (logout / session delete)
+    
+    Returns:
+        Number of removed place lists
+    """
+    if is_db_available():
+        try:
+            deleted = get_db().naver_reviews.delete_many({"user_id": user_id}).deleted_count
+            if deleted:
+                logger.info(f"🗑️ Naver reviews deleted from database: {user_id} ({deleted})")
+            return deleted
+        except Exception as e:
+            logger.error(f"❌ Failed to delete Naver reviews from database: {e}")
+            return 0
+    else:
+        # Fallback to file-based storage
+        from config import settings
+        reviews_dir = os.path.join(settings.data_dir, "naver_reviews")
+        deleted = 0
+        if os.path.isdir(reviews_dir):
+            prefix = f"reviews_{user_id}_"
+            for filename in os.listdir(reviews_dir):
+                if filename.startswith(prefix) and filename.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(reviews_dir, filename))
+                        deleted += 1
+                    except Exception as e:
+                        logger.error(f"❌ Failed to delete Naver reviews file: {e}")
+        return deleted
 
 
 # ==================== User Data ====================
 
 def save_user_data(user_id: str, data: Dict[str, Any]) -> bool:
     """Save user-specific data"""
-    if is_mongodb_available():
+    if is_db_available():
         try:
             db = get_db()
             db.users.update_one(
@@ -247,19 +610,19 @@ def save_user_data(user_id: str, data: Dict[str, Any]) -> bool:
                 },
                 upsert=True
             )
-            logger.info(f"✅ User data saved to MongoDB: {user_id}")
+            logger.info(f"✅ User data saved to database: {user_id}")
             return True
         except Exception as e:
-            logger.error(f"❌ Failed to save user data to MongoDB: {e}")
+            logger.error(f"❌ Failed to save user data to database: {e}")
             return False
     else:
-        logger.warning("⚠️ MongoDB not available. User data not saved.")
+        logger.warning("⚠️ Database not available. User data not saved.")
         return False
 
 
 def get_user_data(user_id: str) -> Optional[Dict[str, Any]]:
     """Get user-specific data"""
-    if is_mongodb_available():
+    if is_db_available():
         try:
             db = get_db()
             result = db.users.find_one({"user_id": user_id})
@@ -267,7 +630,7 @@ def get_user_data(user_id: str) -> Optional[Dict[str, Any]]:
                 return result.get("data")
             return None
         except Exception as e:
-            logger.error(f"❌ Failed to get user data from MongoDB: {e}")
+            logger.error(f"❌ Failed to get user data from database: {e}")
             return None
     else:
         return None
@@ -286,8 +649,8 @@ def get_place_ai_settings(place_id: str, google_email: str) -> Optional[Dict[str
     Returns:
         AI settings document or None
     """
-    if not is_mongodb_available():
-        logger.warning("⚠️ MongoDB not available. Cannot get AI settings.")
+    if not is_db_available():
+        logger.warning("⚠️ Database not available. Cannot get AI settings.")
         return None
     
     try:
@@ -300,7 +663,7 @@ def get_place_ai_settings(place_id: str, google_email: str) -> Optional[Dict[str
             logger.info(f"✅ AI settings retrieved for place {place_id}")
         return settings
     except Exception as e:
-        logger.error(f"❌ Failed to get AI settings from MongoDB: {e}")
+        logger.error(f"❌ Failed to get AI settings from database: {e}")
         return None
 
 
@@ -316,8 +679,8 @@ def save_place_ai_settings(place_id: str, google_email: str, settings: Dict[str,
     Returns:
         True if successful, False otherwise
     """
-    if not is_mongodb_available():
-        logger.warning("⚠️ MongoDB not available. Cannot save AI settings.")
+    if not is_db_available():
+        logger.warning("⚠️ Database not available. Cannot save AI settings.")
         return False
     
     try:
@@ -340,7 +703,7 @@ def save_place_ai_settings(place_id: str, google_email: str, settings: Dict[str,
         logger.info(f"✅ AI settings saved for place {place_id}")
         return True
     except Exception as e:
-        logger.error(f"❌ Failed to save AI settings to MongoDB: {e}")
+        logger.error(f"❌ Failed to save AI settings to database: {e}")
         return False
 
 
@@ -355,8 +718,8 @@ def delete_place_ai_settings(place_id: str, google_email: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    if not is_mongodb_available():
-        logger.warning("⚠️ MongoDB not available. Cannot delete AI settings.")
+    if not is_db_available():
+        logger.warning("⚠️ Database not available. Cannot delete AI settings.")
         return False
     
     try:
@@ -368,5 +731,92 @@ def delete_place_ai_settings(place_id: str, google_email: str) -> bool:
         logger.info(f"✅ AI settings deleted for place {place_id}")
         return result.deleted_count > 0
     except Exception as e:
-        logger.error(f"❌ Failed to delete AI settings from MongoDB: {e}")
+        logger.error(f"❌ Failed to delete AI settings from database: {e}")
         return False
+
+
+# ==================== Reply Drafts ====================
+
+def save_reply_drafts(user_id: str, place_id: str, batch_id: str, drafts: List[Dict[str, Any]]) -> int:
+    """
+    Register reviews submitted in an OpenAI batch as pending drafts
+    
+    리뷰(author + date)마다 초안 하나 - 같은 리뷰의 이전 초안은 새 배치로 교체
+    
+    Args:
+        drafts: [{custom_id, review_id, author, date, content, rating}]
+        
+    Returns:
+        Number of drafts saved
+    """
+    if not is_db_available():
+        logger.warning("⚠️ Database not available. Reply drafts are kept in the task result only.")
+        return 0
+    
+    try:
+        db = get_db()
+        now = datetime.utcnow()
+        for draft in drafts:
+            db.reply_drafts.update_one(
+                {"user_id": user_id, "place_id": place_id, "author": draft["author"], "date": draft["date"]},
+                {
+                    "$set": {
+                        **draft,
+                        "batch_id": batch_id,
+                        "status": "pending",
+                        "generated_reply": None,
+                        "error": None,
+                        "usage": None,
+                        "updated_at": now
+                    },
+                    "$setOnInsert": {"_id": str(uuid.uuid4()), "created_at": now}
+                },
+                upsert=True
+            )
+        logger.info(f"✅ {len(drafts)} reply drafts registered for batch {batch_id}")
+        return len(drafts)
+    except Exception as e:
+        logger.error(f"❌ Failed to save reply drafts: {e}")
+        return 0
+
+
+def update_reply_draft(batch_id: str, custom_id: str, fields: Dict[str, Any]) -> bool:
+    """Record the batch result of one draft (status, generated_reply / error, usage)"""
+    if not is_db_available():
+        return False
+    
+    try:
+        result = get_db().reply_drafts.update_one(
+            {"batch_id": batch_id, "custom_id": custom_id},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}}
+        )
+        return result.matched_count > 0
+    except Exception as e:
+        logger.error(f"❌ Failed to update reply draft {batch_id}/{custom_id}: {e}")
+        return False
+
+
+def get_reply_drafts(user_id: str, place_id: Optional[str] = None, status: Optional[str] = None,
+                     batch_id: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Get reply drafts of a Naver account (newest first)
+    
+    Args:
+        status: pending / draft / failed (없으면 전체)
+        batch_id: 지정하면 해당 배치의 초안만
+    """
+    if not is_db_available():
+        return []
+    
+    query = {"user_id": user_id}
+    if place_id:
+        query["place_id"] = place_id
+    if status:
+        query["status"] = status
+    if batch_id:
+        query["batch_id"] = batch_id
+    try:
+        return list(get_db().reply_drafts.find(query).sort("updated_at", -1).limit(limit))
+    except Exception as e:
+        logger.error(f"❌ Failed to get reply drafts: {e}")
+        return []
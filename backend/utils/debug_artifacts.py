@@ -0,0 +1,114 @@
+"""
+Debug Artifacts (screenshot + page source dumps)
+스크래핑 디버깅용 스크린샷/HTML 저장 - 기본 비활성화
+
+- DEBUG_ARTIFACTS_MODE: off | error | sample | always
+  - off: 요청에 debug=true가 있을 때만 캡처
+  - error: 오류 발생 시에만 캡처
+  - sample: 오류 시 + DEBUG_ARTIFACTS_SAMPLE_RATE 비율로 캡처
+  - always: 항상 캡처
+- WebDriver에서 데이터를 가져오는 것만 호출 스레드에서 처리하고,
+  파일 쓰기는 백그라운드 스레드에서 처리 (스크래핑 경로 블로킹 X)
+- DEBUG_ARTIFACTS_KEEP 건을 넘으면 오래된 것부터 삭제
+"""
+
+import os
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+from config import settings
+from utils.metrics import metrics
+
+
+class DebugArtifacts:
+    """Optional, asynchronous screenshot/page-source capture"""
+
+    def __init__(self):
+        # 단일 스레드 → 쓰기/정리 순서 보장
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="debug-artifacts")
+
+    def should_capture(self, debug: bool = False, error: bool = False) -> bool:
+        """Decide whether this call should produce an artifact"""
+        if debug:
+            return True
+        mode = (settings.debug_artifacts_mode or "off").lower()
+        if mode == "always":
+            return True
+        if mode in ("error", "sample") and error:
+            return True
+        if mode == "sample":
+            return random.random() < settings.debug_artifacts_sample_rate
+        return False
+
+    def capture(self, driver, label: str, debug: bool = False, error: Optional[str] = None) -> Optional[str]:
+        """
+        Capture a screenshot + page source from `driver` if enabled
+
+        Args:
+            driver: Selenium WebDriver (None이면 무시)
+            label: 파일명에 들어갈 작업 이름 (예: "places_user1")
+            debug: 요청별 강제 캡처 플래그
+            error: 오류 메시지 (있으면 오류 캡처로 취급)
+
+        Returns:
+            Artifact base name (캡처하지 않았으면 None)
+        """
+        if driver is None or not self.should_capture(debug=debug, error=error is not None):
+            return None
+
+        # WebDriver 호출은 드라이버를 사용하는 현재 스레드에서 (드라이버는 thread-safe 하지 않음)
+        try:
+            screenshot = driver.get_screenshot_as_png()
+            page_source = driver.page_source
+            current_url = driver.current_url
+        except Exception as e:
+            print(f"⚠️ Debug artifact capture failed ({label}): {e}")
+            metrics.incr('debug_artifacts.failed')
+            return None
+
+        safe_label = re.sub(r'[^A-Za-z0-9_.-]', '_', label)
+        name = f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}_{safe_label}"
+        self._executor.submit(self._write, name, screenshot, page_source, current_url, error)
+        metrics.incr('debug_artifacts.captured')
+        print(f"📸 Debug artifact queued: {name}")
+        return name
+
+    def _write(self, name: str, screenshot: bytes, page_source: str, url: str, error: Optional[str]):
+        """Write files and enforce retention (runs on the background thread)"""
+        try:
+            directory = settings.debug_artifacts_dir
+            os.makedirs(directory, exist_ok=True)
+
+            with open(os.path.join(directory, f"{name}.png"), 'wb') as f:
+                f.write(screenshot)
+
+            header = f"<!-- url: {url} -->\n"
+            if error:
+                header += f"<!-- error: {error.replace('--', '- -')} -->\n"
+            with open(os.path.join(directory, f"{name}.html"), 'w', encoding='utf-8') as f:
+                f.write(header + page_source)
+
+            print(f"💾 Debug artifact saved: {os.path.join(directory, name)}.(png|html)")
+            self._prune(directory)
+        except Exception as e:
+            print(f"⚠️ Failed to write debug artifact {name}: {e}")
+            metrics.incr('debug_artifacts.failed')
+
+    def _prune(self, directory: str):
+        """Keep only the newest DEBUG_ARTIFACTS_KEEP captures (png + html = 1건)"""
+        names = sorted({os.path.splitext(f)[0] for f in os.listdir(directory) if f.endswith(('.png', '.html'))})
+        excess = names[:max(0, len(names) - settings.debug_artifacts_keep)]
+        for name in excess:
+            for ext in ('.png', '.html'):
+                path = os.path.join(directory, name + ext)
+                if os.path.exists(path):
+                    os.remove(path)
+        if excess:
+            metrics.incr('debug_artifacts.pruned', len(excess))
+            print(f"🗑️ Pruned {len(excess)} old debug artifact(s)")
+
+
+# Singleton instance
+debug_artifacts = DebugArtifacts()
@@ -0,0 +1,213 @@
+"""
+Reply Draft Batches
+/reviews/draft-batch로 제출한 OpenAI 배치를 DB(reply_draft_batches 컬렉션)에 기록하고,
+poller 스레드가 끝날 때까지 확인한 뒤 결과를 reply_drafts에 기록
+
+- reply_drafts 작업은 제출(submit_batch + save_reply_drafts)까지만 하고 바로 끝남 → 작업 슬롯을 24시간 잡지 않음
+- poller가 기한(next_poll_at)이 된 배치를 find_one_and_update로 가져가 get_batch
+  → 웹 프로세스가 여러 개여도 한 번의 확인은 한 곳에서만
+- 끝난 배치(completed / failed / expired / cancelled)는 output / error 파일을 받아 초안별로 draft / failed 기록
+- 확인 요청이 OPENAI_BATCH_MAX_POLL_ERRORS번 연속 실패하면 failed
+
+상태: polling → completed / failed (취소 요청은 cancel_requested, OpenAI가 cancelled로 끝내면 completed)
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from config import settings
+from utils.db import get_db, is_db_available, get_reply_drafts, update_reply_draft
+from utils.metrics import metrics
+
+
+class DraftBatches:
+    """Durable list of submitted OpenAI batches and the poller that collects their results"""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def collection(self):
+        return get_db().reply_draft_batches if is_db_available() else None
+
+    # ==================== Batches ====================
+
+    def register(self, batch: Dict, user_id: str, place_id: str, total: int, task_id: Optional[str] = None) -> Dict:
+        """Record a submitted batch so the poller picks it up"""
+        now = datetime.utcnow()
+        doc = {
+            '_id': batch['id'],
+            'user_id': user_id,
+            'place_id': place_id,
+            'task_id': task_id,
+            'status': 'polling',
+            'batch_status': batch.get('status'),
+            'request_counts': batch.get('request_counts'),
+            'total': total,
+            'generated': 0,
+            'failed': 0,
+            'usage': None,
+            'cancel_requested': False,
+            'poll_errors': 0,
+            'last_error': None,
+            'next_poll_at': now + timedelta(seconds=settings.openai_batch_poll_seconds),
+            'created_at': now,
+            'updated_at': now,
+            'completed_at': None
+        }
+        self.collection.insert_one(doc)
+        return doc
+
+    def list(self, user_id: str, place_id: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        collection = self.collection
+        if collection is None:
+            return []
+        query = {'user_id': user_id}
+        if place_id:
+            query['place_id'] = place_id
+        return list(collection.find(query).sort('created_at', -1).limit(limit))
+
+    def get(self, batch_id: str, user_id: str) -> Optional[Dict]:
+        collection = self.collection
+        if collection is None:
+            return None
+        return collection.find_one({'_id': batch_id, 'user_id': user_id})
+
+    def request_cancel(self, batch_id: str, user_id: str) -> bool:
+        """Ask OpenAI to cancel a batch that is still running (완료된 결과는 poller가 그대로 기록)"""
+        from services.llm_service import llm_service
+
+        collection = self.collection
+        if collection is None:
+            return False
+        doc = collection.find_one_and_update(
+            {'_id': batch_id, 'user_id': user_id, 'status': 'polling', 'cancel_requested': False},
+            {'$set': {'cancel_requested': True, 'next_poll_at': datetime.utcnow(), 'updated_at': datetime.utcnow()}}
+        )
+        if doc is None:
+            return False
+        llm_service.cancel_batch(batch_id)
+        self._wake.set()
+        print(f"🛑 OpenAI batch {batch_id} cancel requested")
+        return True
+
+    # ==================== Polling ====================
+
+    def claim_due(self) -> List[Dict]:
+        """Take the batches due for a status check (next_poll_at을 미뤄서 다른 프로세스가 같은 배치를 확인하지 않도록)"""
+        collection = self.collection
+        if collection is None:
+            return []
+        now = datetime.utcnow()
+        claimed = []
+        for candidate in collection.find({'status': 'polling', 'next_poll_at': {'$lte': now}}, {'_id': 1}).limit(100):
+            doc = collection.find_one_and_update(
+                {'_id': candidate['_id'], 'status': 'polling', 'next_poll_at': {'$lte': now}},
+                {'$set': {'next_poll_at': now + timedelta(seconds=settings.openai_batch_poll_seconds)}}
+            )
+            if doc is not None:
+                claimed.append(doc)
+        return claimed
+
+    def poll(self, doc: Dict) -> str:
+        """Check one batch; record the drafts once it is finished -> batch doc status"""
+        from services.llm_service import llm_service, BATCH_FINAL_STATUSES
+
+        batch_id = doc['_id']
+        try:
+            batch = llm_service.get_batch(batch_id)
+        except Exception as e:
+            error = str(getattr(e, 'detail', None) or e)
+            poll_errors = doc.get('poll_errors', 0) + 1
+            update = {'poll_errors': poll_errors, 'last_error': error, 'updated_at': datetime.utcnow()}
+            if poll_errors >= settings.openai_batch_max_poll_errors:
+                update.update(status='failed', completed_at=datetime.utcnow())
+                self._fail_drafts(doc, f"배치 상태 확인 실패: {error}")
+                print(f"💀 OpenAI batch {batch_id} gave up after {poll_errors} failed checks: {error[:80]}")
+            self.collection.update_one({'_id': batch_id}, {'$set': update})
+            return update.get('status', 'polling')
+
+        update = {'batch_status': batch['status'], 'request_counts': batch.get('request_counts'),
+                  'poll_errors': 0, 'last_error': None, 'updated_at': datetime.utcnow()}
+        if batch['status'] not in BATCH_FINAL_STATUSES:
+            self.collection.update_one({'_id': batch_id}, {'$set': update})
+            return 'polling'
+
+        results = llm_service.get_batch_results(batch)
+        if batch['status'] == 'failed' and not results:
+            error = ((batch.get('errors') or {}).get('data') or [{}])[0].get('message')
+            self._fail_drafts(doc, f"OpenAI 배치 실패: {error or batch_id}")
+            update.update(status='failed', failed=doc['total'], last_error=error, completed_at=datetime.utcnow())
+            self.collection.update_one({'_id': batch_id}, {'$set': update})
+            metrics.incr('llm.batch.failed')
+            return 'failed'
+
+        usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        generated = failed = 0
+        for draft in self._drafts(doc):
+            result = results.get(draft['custom_id']) or {'status': 'failed', 'error': f"결과 없음 (batch {batch['status']})"}
+            update_reply_draft(batch_id, draft['custom_id'], {
+                'status': result['status'],
+                'generated_reply': result.get('generated_reply'),
+                'error': result.get('error'),
+                'usage': result.get('usage')
+            })
+            for key, value in (result.get('usage') or {}).items():
+                if key in usage:
+                    usage[key] += value
+            if result['status'] == 'draft':
+                generated += 1
+            else:
+                failed += 1
+
+        update.update(status='completed', generated=generated, failed=failed, usage=usage, completed_at=datetime.utcnow())
+        self.collection.update_one({'_id': batch_id}, {'$set': update})
+        metrics.incr('llm.batch.completed')
+        metrics.observe('llm.batch.wait_seconds', (datetime.utcnow() - doc['created_at']).total_seconds())
+        print(f"📦 OpenAI batch {batch_id} {batch['status']} → {generated} drafts, {failed} failed ({doc['place_id']})")
+        return 'completed'
+
+    def _drafts(self, doc: Dict) -> List[Dict]:
+        return get_reply_drafts(doc['user_id'], doc['place_id'], batch_id=doc['_id'], limit=max(doc['total'], 1))
+
+    def _fail_drafts(self, doc: Dict, error: str):
+        for draft in self._drafts(doc):
+            update_reply_draft(doc['_id'], draft['custom_id'], {'status': 'failed', 'error': error})
+
+    def poll_once(self) -> int:
+        """Check every due batch -> number of batches checked"""
+        checked = 0
+        for doc in self.claim_due():
+            try:
+                self.poll(doc)
+            except Exception as e:
+                print(f"⚠️ OpenAI batch {doc['_id']} poll error: {e}")
+            checked += 1
+        return checked
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"⚠️ Draft batch poll error: {e}")
+            self._wake.wait(settings.openai_batch_poll_seconds)
+            self._wake.clear()
+
+    def start(self):
+        """Start the poller thread (web process startup)"""
+        if self._thread is not None or not is_db_available():
+            return
+        self._thread = threading.Thread(target=self._loop, name="draft-batches", daemon=True)
+        self._thread.start()
+        print(f"📦 Draft batch poller started (every {settings.openai_batch_poll_seconds}s per batch)")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+# Singleton instance
+draft_batches = DraftBatches()
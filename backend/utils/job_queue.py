@@ -0,0 +1,284 @@
+"""
+In-process Job Queue for Background Tasks
+작업마다 스레드를 새로 띄우는 대신 고정된 워커 풀에서 순서대로 처리
+
+- 고정 워커 수 (JOB_QUEUE_WORKERS)
+- 대기열 최대 크기 (JOB_QUEUE_MAX_SIZE) → 초과 시 QueueFull (API에서 429)
+- 작업 타입별 동시 실행 제한 (JOB_QUEUE_TYPE_LIMITS)
+- 계정별 순차 실행 타입 (JOB_QUEUE_SERIAL_TYPES: 같은 네이버 계정의 serial 작업은 타입과 관계없이 하나씩, 다른 계정은 병렬)
+  (리뷰 로드 등 다른 타입은 스크래퍼의 계정 브라우저 락으로 브라우저 사용 구간만 순차)
+- 종료 시 대기 중/실행 중 작업을 JOB_QUEUE_DRAIN_SECONDS 동안 마무리
+
+작업 상태/결과는 TaskManager(tasks 컬렉션)에 기록
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+from config import settings
+from utils.metrics import metrics
+
+
+class QueueFull(Exception):
+    """Raised when the queue cannot accept more jobs"""
+
+
+def run_task(handler: Callable[[str, str, Dict], Any], task_id: str, task_type: str, user_id: str,
+             params: Dict, mark_processing: bool = True) -> bool:
+    """
+    Run one task handler and record status/result in TaskManager
+
+    job_queue 워커와 worker.py(별도 프로세스)가 공통으로 사용
+
+    Args:
+        mark_processing: False면 processing 전환 생략 (worker.py는 claim 시 이미 전환)
+
+    Returns:
+        True if the handler succeeded
+    """
+    from utils.task_manager import task_manager
+
+    started = time.monotonic()
+    try:
+        if mark_processing:
+            task_manager.update_task_status(task_id, 'processing')
+        result = handler(task_id, user_id, params)
+        task_manager.set_result(task_id, result)
+        if task_manager.is_cancel_requested(task_id):
+            # 취소 요청으로 중단 → 멈춘 시점까지의 부분 결과와 함께 cancelled
+            task_manager.update_task_status(task_id, 'cancelled')
+            metrics.incr(f'job_queue.{task_type}.cancelled')
+        else:
+            task_manager.update_task_status(task_id, 'completed')
+            metrics.incr(f'job_queue.{task_type}.completed')
+        return True
+    except Exception as e:
+        if task_manager.is_cancel_requested(task_id):
+            print(f"🛑 Task {task_id} ({task_type}) cancelled: {e}")
+            task_manager.update_task_status(task_id, 'cancelled', error=str(e))
+            metrics.incr(f'job_queue.{task_type}.cancelled')
+            return False
+        print(f"❌ Task {task_id} ({task_type}) failed: {e}")
+        import traceback
+        traceback.print_exc()
+        task_manager.set_error(task_id, str(e))
+        metrics.incr(f'job_queue.{task_type}.failed')
+        return False
+    finally:
+        task_manager.forget_cancel(task_id)
+        metrics.observe(f'job_queue.{task_type}.run_seconds', time.monotonic() - started)
+
+
+class _Job:
+    """Queued unit of work"""
+
+    __slots__ = ('task_id', 'task_type', 'user_id', 'params', 'on_done', 'enqueued_at')
+
+    def __init__(self, task_id: str, task_type: str, user_id: str, params: Dict,
+                 on_done: Optional[Callable[[], None]] = None):
+        self.task_id = task_id
+        self.task_type = task_type
+        self.user_id = user_id
+        self.params = params
+        self.on_done = on_done
+        self.enqueued_at = time.monotonic()
+
+
+class JobQueue:
+    """Fixed worker pool with a bounded FIFO and per-type concurrency limits"""
+
+    def __init__(self, workers: int, max_size: int, type_limits: Dict[str, int], serial_types: Optional[List[str]] = None):
+        self.workers = workers
+        self.max_size = max_size
+        self.type_limits = dict(type_limits)
+        self.serial_types = set(serial_types or [])
+        self._handlers: Dict[str, Callable[[str, str, Dict], Any]] = {}
+        self._queue: Deque[_Job] = deque()
+        self._running: Dict[str, int] = {}
+        self._running_accounts: Set[str] = set()  # serial 작업이 실행 중인 user_id (worker.py의 account_leases와 같은 기준)
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._accepting = True
+        self._stopping = False
+
+    def register(self, task_type: str, handler: Callable[[str, str, Dict], Any]):
+        """Register handler(task_id, user_id, params) -> result for a task type"""
+        self._handlers[task_type] = handler
+
+    def start(self):
+        """Start worker threads (idempotent)"""
+        with self._cond:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        print(f"👷 Job queue started ({self.workers} workers, max {self.max_size} queued, limits: {self.type_limits})")
+
+    def submit(self, task_id: str, task_type: str, user_id: str, params: Dict,
+               on_done: Optional[Callable[[], None]] = None) -> int:
+        """
+        Enqueue a task that already exists in TaskManager
+
+        Args:
+            on_done: 성공/실패와 관계없이 작업이 끝나면 호출 (대기열에서 제거될 때 포함)
+
+        Returns:
+            Queue position (1 = 다음 차례)
+
+        Raises:
+            QueueFull: 대기열이 가득 찼거나 서버가 종료 중일 때
+        """
+        if task_type not in self._handlers:
+            raise ValueError(f"No handler registered for task type: {task_type}")
+
+        self.start()
+        with self._cond:
+            if not self._accepting:
+                raise QueueFull("서버가 종료 중입니다. 잠시 후 다시 시도해주세요.")
+            if len(self._queue) >= self.max_size:
+                metrics.incr('job_queue.rejected')
+                raise QueueFull(f"대기 중인 작업이 너무 많습니다 ({len(self._queue)}개). 잠시 후 다시 시도해주세요.")
+            self._queue.append(_Job(task_id, task_type, user_id, params, on_done))
+            position = len(self._queue)
+            self._update_gauges()
+            self._cond.notify_all()
+
+        metrics.incr(f'job_queue.{task_type}.submitted')
+        print(f"📥 Queued task {task_id} ({task_type}) at position {position}")
+        return position
+
+    def position(self, task_id: str) -> Optional[int]:
+        """1-based queue position of a waiting task (None if not waiting)"""
+        with self._cond:
+            for index, job in enumerate(self._queue):
+                if job.task_id == task_id:
+                    return index + 1
+        return None
+
+    def cancel(self, task_id: str) -> bool:
+        """Remove a waiting task from the queue (False if it already started or is unknown)"""
+        with self._cond:
+            job = next((job for job in self._queue if job.task_id == task_id), None)
+            if job is None:
+                return False
+            self._queue.remove(job)
+            self._update_gauges()
+        
+        metrics.incr(f'job_queue.{job.task_type}.cancelled')
+        self._finish(job)
+        return True
+    
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'queued': len(self._queue),
+                'running': dict(self._running),
+                'type_limits': dict(self.type_limits),
+                'serial_types': sorted(self.serial_types),
+                'accepting': self._accepting
+            }
+
+    def shutdown(self, timeout: float):
+        """Stop accepting jobs and let workers drain the queue for up to `timeout` seconds"""
+        with self._cond:
+            self._accepting = False
+            pending = len(self._queue)
+            running = sum(self._running.values())
+            self._cond.notify_all()
+        print(f"🛑 Draining job queue ({pending} queued, {running} running, timeout {timeout}s)")
+
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while (self._queue or any(self._running.values())) and time.monotonic() < deadline:
+                self._cond.wait(timeout=max(0.0, deadline - time.monotonic()))
+            leftover = list(self._queue)
+            self._queue.clear()
+            self._stopping = True
+            self._update_gauges()
+            self._cond.notify_all()
+
+        # 시간 내 시작하지 못한 작업은 실패 처리 (클라이언트가 무한 대기하지 않도록)
+        if leftover:
+            from utils.task_manager import task_manager
+            for job in leftover:
+                task_manager.set_error(job.task_id, "서버 재시작으로 작업이 취소되었습니다. 다시 시도해주세요.")
+                self._finish(job)
+            print(f"⚠️ Cancelled {len(leftover)} queued task(s) on shutdown")
+
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        print("✅ Job queue stopped")
+
+    # ==================== Internal ====================
+
+    def _next_runnable(self) -> Optional[_Job]:
+        """Pop the oldest job whose type is under its limit and whose account is free (caller holds the lock)"""
+        for job in self._queue:
+            limit = self.type_limits.get(job.task_type)
+            if limit is not None and self._running.get(job.task_type, 0) >= limit:
+                continue
+            # 같은 계정의 serial 작업(타입 무관)이 실행 중이면 건너뜀 → 계정 안에서는 제출 순서대로
+            if job.task_type in self.serial_types and job.user_id in self._running_accounts:
+                continue
+            self._queue.remove(job)
+            return job
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                job = self._next_runnable()
+                while job is None:
+                    if self._stopping:
+                        return
+                    self._cond.wait()
+                    job = self._next_runnable()
+                self._running[job.task_type] = self._running.get(job.task_type, 0) + 1
+                if job.task_type in self.serial_types:
+                    self._running_accounts.add(job.user_id)
+                self._update_gauges()
+
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self._running[job.task_type] -= 1
+                    if job.task_type in self.serial_types:
+                        self._running_accounts.discard(job.user_id)
+                    self._update_gauges()
+                    self._cond.notify_all()
+
+    def _run(self, job: _Job):
+        """Execute one job and record status/result in TaskManager"""
+        wait_seconds = time.monotonic() - job.enqueued_at
+        metrics.observe(f'job_queue.{job.task_type}.wait_seconds', wait_seconds)
+        print(f"▶️ Running task {job.task_id} ({job.task_type}) after {wait_seconds:.1f}s in queue")
+
+        try:
+            run_task(self._handlers[job.task_type], job.task_id, job.task_type, job.user_id, job.params)
+        finally:
+            self._finish(job)
+
+    def _finish(self, job: _Job):
+        if job.on_done is not None:
+            try:
+                job.on_done()
+            except Exception as e:
+                print(f"⚠️ on_done callback failed for task {job.task_id}: {e}")
+
+    def _update_gauges(self):
+        metrics.set_gauge('job_queue.queued', len(self._queue))
+        metrics.set_gauge('job_queue.running', sum(self._running.values()))
+
+
+# Singleton instance
+job_queue = JobQueue(
+    workers=settings.job_queue_workers,
+    max_size=settings.job_queue_max_size,
+    type_limits=settings.job_queue_type_limits,
+    serial_types=settings.job_queue_serial_types
+)
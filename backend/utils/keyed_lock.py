@@ -0,0 +1,50 @@
+"""
+Keyed Locks
+키(네이버 계정 등)마다 따로 잡는 락 - 다른 키끼리는 병렬, 같은 키는 하나씩
+
+- 아무도 사용하지 않는 키의 락은 바로 제거 (계정 수만큼 쌓이지 않음)
+- 대기 시간은 metrics에 기록 (<name>.wait_seconds)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Hashable, List
+from utils.metrics import metrics
+
+
+class KeyedLock:
+    """One mutex per key, created on demand"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._guard = threading.Lock()
+        self._locks: Dict[Hashable, List] = {}  # key -> [lock, 사용 중인 스레드 수]
+
+    @contextmanager
+    def hold(self, key: Hashable):
+        """Hold the lock of `key` for the duration of the block"""
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+
+        started = time.monotonic()
+        entry[0].acquire()
+        waited = time.monotonic() - started
+        metrics.observe(f'{self.name}.wait_seconds', waited)
+        if waited > 1:
+            print(f"⏳ [{self.name}] Waited {waited:.1f}s for {key}")
+
+        try:
+            yield
+        finally:
+            entry[0].release()
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def is_locked(self, key: Hashable) -> bool:
+        with self._guard:
+            entry = self._locks.get(key)
+        return entry is not None and entry[0].locked()
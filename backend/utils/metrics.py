@@ -0,0 +1,68 @@
+"""
+In-process Metrics
+캐시 무효화, 작업 처리 시간 등 운영 지표를 프로세스 메모리에 집계
+GET /metrics 로 조회
+"""
+
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict
+
+
+class Metrics:
+    """Thread-safe counters, gauges and timings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, Dict] = {}
+        self._started_at = datetime.utcnow()
+
+    def incr(self, name: str, value: float = 1):
+        """Increment a counter"""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float):
+        """Set a gauge to the current value"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        """Record a duration sample (count/sum/min/max/last)"""
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = {'count': 0, 'sum': 0.0, 'min': seconds, 'max': seconds, 'last': seconds}
+                self._timings[name] = timing
+            timing['count'] += 1
+            timing['sum'] += seconds
+            timing['min'] = min(timing['min'], seconds)
+            timing['max'] = max(timing['max'], seconds)
+            timing['last'] = seconds
+
+    def get_counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict:
+        """Return a JSON-serializable copy of all metrics"""
+        with self._lock:
+            timings = {}
+            for name, timing in self._timings.items():
+                timings[name] = {
+                    **timing,
+                    'avg': timing['sum'] / timing['count'] if timing['count'] else 0.0
+                }
+            return {
+                'started_at': self._started_at.isoformat(),
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'timings': timings
+            }
+
+
+# Singleton instance
+metrics = Metrics()
@@ -0,0 +1,70 @@
+"""
+Token Bucket Rate Limiter
+키(네이버 계정)마다 토큰 버킷 - 게시 전에 토큰을 받고, 없으면 그 계정의 다음 게시만 대기
+
+- capacity: 연속으로 바로 게시할 수 있는 수 (burst)
+- interval_seconds: 토큰 하나가 다시 채워지는 시간 (평균 게시 간격)
+- 대기 시간은 metrics에 기록 (<name>.wait_seconds), 상태는 stats()로 조회
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional
+from utils.metrics import metrics
+
+
+class TokenBucketLimiter:
+    """One token bucket per key, created on demand"""
+
+    def __init__(self, name: str, capacity: int, interval_seconds: float):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.interval_seconds = max(0.0, interval_seconds)
+        self._lock = threading.Lock()
+        self._buckets: Dict[Hashable, list] = {}  # key -> [tokens, 마지막 충전 시각 (monotonic)]
+
+    def _refill(self, key: Hashable, now: float) -> list:
+        bucket = self._buckets.setdefault(key, [float(self.capacity), now])
+        if self.interval_seconds > 0:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) / self.interval_seconds)
+        else:
+            bucket[0] = float(self.capacity)
+        bucket[1] = now
+        return bucket
+
+    def acquire(self, key: Hashable, cancel_check: Optional[Callable[[], bool]] = None) -> Optional[float]:
+        """
+        Take one token for `key`, waiting until one is refilled
+
+        Returns: 대기한 시간(초), cancel_check가 True를 반환하면 토큰 없이 None
+        """
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                bucket = self._refill(key, now)
+                if bucket[0] >= 1:
+                    bucket[0] -= 1
+                    break
+                wait = (1 - bucket[0]) * self.interval_seconds
+            if cancel_check is not None and cancel_check():
+                return None
+            # 취소 확인을 위해 최대 0.5초씩 나눠서 대기
+            time.sleep(min(wait, 0.5))
+
+        waited = time.monotonic() - started
+        metrics.observe(f'{self.name}.wait_seconds', waited)
+        if waited > 0.05:
+            print(f"⏳ [{self.name}] Waited {waited:.1f}s for {key}")
+        return waited
+
+    def stats(self) -> Dict:
+        """Bucket settings and the current tokens of every key"""
+        with self._lock:
+            now = time.monotonic()
+            buckets = {str(key): round(self._refill(key, now)[0], 2) for key in list(self._buckets)}
+        return {
+            'capacity': self.capacity,
+            'interval_seconds': self.interval_seconds,
+            'tokens': buckets
+        }
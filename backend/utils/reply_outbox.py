@@ -0,0 +1,300 @@
+"""
+Reply Outbox
+재시도 가능한 이유로 실패한 답글을 DB(reply_outbox 컬렉션)에 보관하고, 백오프 후 자동으로 다시 게시
+
+- 재시도 대상: 리뷰를 못 찾음(max_scrolls), 세션 만료, Chrome 크래시 등 (classify_error)
+  + 워커가 중단된 답글 작업의 답글 (worker.py sweep → naver_tasks.requeue_abandoned_replies)
+  이미 답글이 있는 리뷰 등은 넣지 않음 (다시 시도해도 같은 결과)
+- 재시도 중 이미 답글이 있으면 이전 시도가 게시한 것으로 보고 sent (already_replied)
+  게시는 미답글 목록에서 리뷰를 찾으므로 이미 게시된 답글은 'Could not find review'로 실패
+  → run_reply_outbox가 답글 등록된 목록(hasReply=true) / 저장된 리뷰 목록에서 확인
+- 재시도 간격: REPLY_OUTBOX_BASE_DELAY_SECONDS * 2^(시도 횟수 - 1), 최대 REPLY_OUTBOX_MAX_DELAY_SECONDS
+- dispatcher 스레드가 기한이 된 항목을 (계정, 매장)별로 묶어 reply_outbox 작업 하나로 실행
+  → 브라우저 준비와 미답글 목록 로드는 묶음당 한 번 (post_replies_batch)
+- REPLY_OUTBOX_MAX_ATTEMPTS번 실패하면 dead (GET /api/naver/reviews/outbox에서 확인 후 재시도/삭제)
+
+상태: pending → sending → sent / pending(재시도) / dead
+"""
+
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from config import settings
+from utils.db import get_db, is_db_available
+from utils.metrics import metrics
+
+
+# 다시 시도하면 성공할 수 있는 오류 (메시지 일부)
+RETRYABLE_ERRORS = (
+    'Could not find review',  # max_scrolls 안에 리뷰를 못 찾음 (로딩 지연 / 새 리뷰로 밀림)
+    'Reply verification failed',  # 게시 확인 실패 (이미 게시됐다면 재시도 시 답글 등록된 목록에서 확인 후 종료)
+    'Failed to fill textarea',
+    'Textarea empty before submit',
+    '답글 버튼을 찾을 수 없습니다',
+    '등록 버튼이 비활성화',
+    'invalid session id',  # Chrome 크래시 / 세션 종료
+    'chrome not reachable',
+    'session deleted',
+    'disconnected',
+    'no such window',
+    'timed out',
+    'Timeout',
+    'Connection refused',
+    'Not logged in',
+    'nidlogin',  # 네이버 로그인 페이지로 이동 (세션 만료)
+    '세션',
+    '로그인',
+)
+
+# 다시 시도해도 같은 결과인 오류 (RETRYABLE_ERRORS보다 먼저 확인)
+PERMANENT_ERRORS = (
+    '이미 답글이 존재',
+    '답글 생성 실패',
+)
+
+
+def classify_error(error: str) -> bool:
+    """True if a failed post is worth retrying later"""
+    if any(marker in error for marker in PERMANENT_ERRORS):
+        return False
+    return any(marker in error for marker in RETRYABLE_ERRORS)
+
+
+class ReplyOutbox:
+    """Durable queue of replies waiting for another posting attempt"""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def collection(self):
+        return get_db().reply_outbox if is_db_available() else None
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = min(settings.reply_outbox_max_delay_seconds,
+                    settings.reply_outbox_base_delay_seconds * (2 ** max(0, attempts - 1)))
+        return timedelta(seconds=delay * random.uniform(1.0, 1.1))  # 같은 시각에 몰리지 않도록 지터
+
+    # ==================== Entries ====================
+
+    def add(self, user_id: str, place_id: str, item: Dict, error: str, source_task_id: Optional[str] = None) -> Optional[str]:
+        """
+        Keep a failed reply for a later retry (item: author, date, content, reply_text)
+
+        Returns: outbox id (같은 답글이 이미 대기 중이면 그 id), DB가 없거나 비활성화면 None
+        """
+        collection = self.collection
+        if collection is None or not settings.reply_outbox_enabled:
+            return None
+
+        now = datetime.utcnow()
+        existing = collection.find_one({
+            'user_id': user_id,
+            'place_id': place_id,
+            'author': item['author'],
+            'date': item['date'],
+            'reply_text': item['reply_text'],
+            'status': {'$in': ['pending', 'sending']}
+        })
+        if existing is not None:
+            return existing['_id']
+
+        entry_id = str(uuid.uuid4())
+        next_attempt_at = now + self._backoff(1)
+        collection.insert_one({
+            '_id': entry_id,
+            'user_id': user_id,
+            'place_id': place_id,
+            'author': item['author'],
+            'date': item['date'],
+            'content': (item.get('content') or "")[:100],
+            'reply_text': item['reply_text'],
+            'status': 'pending',
+            'attempts': 1,  # 실패한 원래 게시 포함
+            'last_error': error,
+            'next_attempt_at': next_attempt_at,
+            'source_task_id': source_task_id,
+            'task_id': None,
+            'created_at': now,
+            'updated_at': now
+        })
+        metrics.incr('reply_outbox.added')
+        print(f"📮 Reply queued for retry at {next_attempt_at:%H:%M:%S} UTC ({item['author']}, {place_id}): {error[:80]}")
+        return entry_id
+
+    def list(self, user_id: str, status: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        collection = self.collection
+        if collection is None:
+            return []
+        query = {'user_id': user_id}
+        if status:
+            query['status'] = status
+        return list(collection.find(query).sort('created_at', -1).limit(limit))
+
+    def retry_now(self, entry_id: str, user_id: str) -> bool:
+        """Move a pending/dead entry to the front (dead은 시도 횟수 초기화)"""
+        collection = self.collection
+        if collection is None:
+            return False
+        entry = collection.find_one({'_id': entry_id, 'user_id': user_id})
+        if entry is None or entry['status'] not in ('pending', 'dead'):
+            return False
+        update = {'status': 'pending', 'next_attempt_at': datetime.utcnow(), 'updated_at': datetime.utcnow()}
+        if entry['status'] == 'dead':
+            update['attempts'] = 0
+        collection.update_one({'_id': entry_id}, {'$set': update})
+        self._wake.set()
+        return True
+
+    def discard(self, entry_id: str, user_id: str) -> bool:
+        collection = self.collection
+        if collection is None:
+            return False
+        return collection.delete_one({'_id': entry_id, 'user_id': user_id, 'status': {'$ne': 'sending'}}).deleted_count > 0
+
+    # ==================== Dispatch ====================
+
+    def claim_due(self) -> List[Tuple[str, str, List[Dict]]]:
+        """
+        Claim due entries grouped by (user_id, place_id) -> [(user_id, place_id, entries)]
+
+        update_many(status=pending 조건)로 가져가므로 웹 프로세스가 여러 개여도 한 곳에서만 실행
+        """
+        collection = self.collection
+        if collection is None:
+            return []
+
+        now = datetime.utcnow()
+        due = list(collection.find({'status': 'pending', 'next_attempt_at': {'$lte': now}}).sort('next_attempt_at', 1).limit(500))
+        groups: Dict[Tuple[str, str], List[Dict]] = {}
+        for entry in due:
+            group = groups.setdefault((entry['user_id'], entry['place_id']), [])
+            if len(group) < settings.reply_outbox_batch_size:
+                group.append(entry)
+
+        claimed = []
+        for (user_id, place_id), entries in groups.items():
+            claim_id = str(uuid.uuid4())
+            collection.update_many(
+                {'_id': {'$in': [entry['_id'] for entry in entries]}, 'status': 'pending'},
+                {'$set': {'status': 'sending', 'task_id': claim_id, 'updated_at': now}}
+            )
+            mine = list(collection.find({'task_id': claim_id, 'status': 'sending'}).sort('created_at', 1))
+            if mine:
+                claimed.append((user_id, place_id, mine))
+        return claimed
+
+    def attach_task(self, entries: List[Dict], task_id: str):
+        self.collection.update_many(
+            {'_id': {'$in': [entry['_id'] for entry in entries]}},
+            {'$set': {'task_id': task_id, 'updated_at': datetime.utcnow()}}
+        )
+
+    def claimed(self, task_id: str) -> List[Dict]:
+        """Entries the reply_outbox task `task_id` should post"""
+        collection = self.collection
+        if collection is None:
+            return []
+        return list(collection.find({'task_id': task_id, 'status': 'sending'}).sort('created_at', 1))
+
+    def release(self, entries: List[Dict], error: Optional[str] = None):
+        """Put claimed entries back to pending without counting an attempt (예: 대기열 가득 참)"""
+        update = {'status': 'pending', 'task_id': None, 'next_attempt_at': datetime.utcnow() + self._backoff(1),
+                  'updated_at': datetime.utcnow()}
+        if error:
+            update['last_error'] = error
+        self.collection.update_many({'_id': {'$in': [entry['_id'] for entry in entries]}}, {'$set': update})
+
+    def record(self, entry: Dict, status: str, error: Optional[str] = None):
+        """
+        Record the outcome of one retry
+
+        status: posted → sent, cancelled → pending (시도 횟수 유지), failed → 백오프 후 pending 또는 dead
+        already_replied (답글 등록된 목록에서 확인됨) 또는 '이미 답글이 존재'로 실패하면 sent + already_replied
+        """
+        now = datetime.utcnow()
+        if status == 'posted':
+            update = {'status': 'sent', 'sent_at': now, 'last_error': None}
+            metrics.incr('reply_outbox.sent')
+        elif status == 'already_replied' or '이미 답글이 존재' in (error or ''):
+            # 이전 시도(검증 실패 / 중단된 워커)가 실제로는 게시했던 경우 → 다시 게시하지 않고 종료
+            update = {'status': 'sent', 'sent_at': now, 'already_replied': True, 'last_error': error}
+            metrics.incr('reply_outbox.already_replied')
+        elif status == 'cancelled':
+            update = {'status': 'pending', 'next_attempt_at': now + self._backoff(1)}
+        else:
+            attempts = entry.get('attempts', 0) + 1
+            retryable = classify_error(error or '')
+            if retryable and attempts < settings.reply_outbox_max_attempts:
+                update = {'status': 'pending', 'attempts': attempts, 'next_attempt_at': now + self._backoff(attempts)}
+                metrics.incr('reply_outbox.retry_scheduled')
+            else:
+                update = {'status': 'dead', 'attempts': attempts}
+                metrics.incr('reply_outbox.dead')
+                print(f"💀 Reply gave up after {attempts} attempts ({entry['author']}, {entry['place_id']}): {(error or '')[:80]}")
+            update['last_error'] = error
+        update.update({'task_id': None, 'updated_at': now})
+        self.collection.update_one({'_id': entry['_id']}, {'$set': update})
+
+    def release_stale(self):
+        """Entries left in 'sending' by a process that died → pending again"""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.reply_outbox_sending_timeout_seconds)
+        released = self.collection.update_many(
+            {'status': 'sending', 'updated_at': {'$lt': cutoff}},
+            {'$set': {'status': 'pending', 'task_id': None, 'next_attempt_at': datetime.utcnow(), 'updated_at': datetime.utcnow()}}
+        ).modified_count
+        if released:
+            print(f"📮 Released {released} stale outbox entries")
+
+    def dispatch_once(self) -> int:
+        """Start one reply_outbox task per (account, place) with due entries -> number of tasks"""
+        from utils.task_manager import task_manager
+        from utils.job_queue import job_queue, QueueFull
+        import services.naver_tasks  # noqa: F401 - 작업 핸들러 등록
+
+        self.release_stale()
+        started = 0
+        for user_id, place_id, entries in self.claim_due():
+            params = {'place_id': place_id, 'entry_ids': [entry['_id'] for entry in entries]}
+            task_id = task_manager.create_task('reply_outbox', user_id, params)
+            self.attach_task(entries, task_id)
+            if settings.task_execution_mode != "worker":
+                try:
+                    job_queue.submit(task_id, 'reply_outbox', user_id, params)
+                except QueueFull as e:
+                    task_manager.set_error(task_id, str(e))
+                    self.release(entries, str(e))
+                    continue
+            started += 1
+            metrics.incr('reply_outbox.dispatched', len(entries))
+            print(f"📮 Retrying {len(entries)} replies for {user_id} ({place_id}) → task {task_id}")
+        return started
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.dispatch_once()
+            except Exception as e:
+                print(f"⚠️ Reply outbox dispatch error: {e}")
+            self._wake.wait(settings.reply_outbox_poll_seconds)
+            self._wake.clear()
+
+    def start(self):
+        """Start the dispatcher thread (web process startup)"""
+        if self._thread is not None or not settings.reply_outbox_enabled or not is_db_available():
+            return
+        self._thread = threading.Thread(target=self._loop, name="reply-outbox", daemon=True)
+        self._thread.start()
+        print(f"📮 Reply outbox dispatcher started (every {settings.reply_outbox_poll_seconds}s)")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+# Singleton instance
+reply_outbox = ReplyOutbox()
@@ -0,0 +1,81 @@
+"""
+Single-flight request coalescing
+동일한 키의 작업이 이미 실행 중이면 새로 실행하지 않고 진행 중인 작업의 결과를 공유
+(같은 매장 리뷰를 동시에 두 번 스크래핑하는 것 방지)
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+from utils.metrics import metrics
+
+
+def record_coalescing(name: str, coalesced: bool):
+    """Count a call and update the coalescing rate gauge for `name`"""
+    metrics.incr(f'singleflight.{name}.calls')
+    if coalesced:
+        metrics.incr(f'singleflight.{name}.coalesced')
+    calls = metrics.get_counter(f'singleflight.{name}.calls')
+    shared = metrics.get_counter(f'singleflight.{name}.coalesced')
+    metrics.set_gauge(f'singleflight.{name}.coalesce_rate', shared / calls if calls else 0.0)
+
+
+class _Call:
+    """In-flight call shared by the leader and its waiters"""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls (thread-based)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once per key at a time
+
+        이미 같은 key로 실행 중이면 그 결과(또는 예외)를 그대로 공유
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.waiters += 1
+
+        record_coalescing(self.name, coalesced=not leader)
+
+        if not leader:
+            print(f"🔗 [{self.name}] Attached to in-flight call: {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.waiters:
+                print(f"🔗 [{self.name}] Shared result with {call.waiters} waiter(s): {key}")
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
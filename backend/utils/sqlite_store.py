@@ -0,0 +1,555 @@
+"""
+Embedded SQLite Document Store
+MongoDB를 사용하지 않을 때 get_db()가 반환하는 로컬 저장소 (단일 서버 / 로컬 개발용)
+
+- pymongo와 같은 방식으로 사용: db.tasks.find_one({...}), db.naver_sessions.update_one(..., upsert=True)
+- 컬렉션 = 테이블 (_id TEXT PRIMARY KEY, doc JSON + 자주 조회하는 최상위 필드의 인덱스 컬럼)
+- 인덱스 컬럼(status, type, user_id, task_id, lease_expires_at ...)에 대한 값 비교/$in/범위 조건과
+  _id 조회는 SQL WHERE로 먼저 거르고, 나머지 조건은 디코딩한 문서에서 확인
+- WAL 모드 → 읽기와 쓰기가 서로 막지 않음, 여러 프로세스(worker.py)에서 같은 파일 사용 가능
+- 지원하는 쿼리: 값 비교(점 표기, 배열 포함), $or/$and/$nor, $eq/$ne/$in/$nin/$lt/$lte/$gt/$gte/$exists
+- 지원하는 업데이트: $set, $setOnInsert, $inc, $unset
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+# ==================== JSON (datetime 보존) ====================
+
+def _encode(value: Any):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj: Dict):
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def _dumps(doc: Dict) -> str:
+    return json.dumps(doc, default=_encode, ensure_ascii=False)
+
+
+def _loads(raw: str) -> Dict:
+    return json.loads(raw, object_hook=_decode)
+
+
+# ==================== Indexed Columns ====================
+
+# 별도 컬럼으로 저장하는 최상위 필드 (모든 컬렉션 공통, 없는 필드는 NULL)
+INDEXED_FIELDS = ('status', 'type', 'user_id', 'place_id', 'task_id', 'chunk', 'idempotency_key',
+                  'lease_owner', 'lease_expires_at', 'next_attempt_at', 'created_at')
+
+# SQLite 인덱스를 만드는 컬럼 (claim_task, find_duplicate, reply_outbox.claim_due, task_results 페이지 조회)
+INDEXED_COLUMNS = ('status', 'type', 'user_id', 'task_id', 'idempotency_key', 'lease_expires_at', 'next_attempt_at')
+
+# 배열/객체 값 표시 (값 비교 조건에서는 후보로 남기고 문서에서 다시 확인)
+_COMPLEX = '\x00complex'
+
+
+def _column(field: str) -> str:
+    return f'"f_{field}"'
+
+
+def _column_value(value: Any):
+    """Value stored in an indexed column (datetime은 정렬 가능한 ISO 문자열)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat(timespec='microseconds')
+    if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+        return _COMPLEX
+    if isinstance(value, (str, int, float)):
+        return value
+    return _COMPLEX
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (str, int, float, datetime)) and _column_value(value) is not _COMPLEX
+
+
+def _sql_condition(field: str, condition) -> Tuple[List[str], List]:
+    """SQL terms for one field condition (결과는 항상 _matches 결과의 상위 집합)"""
+    if field == '_id':
+        column, encode = 'id', str
+    elif field in INDEXED_FIELDS:
+        column, encode = _column(field), _column_value
+    else:
+        return [], []
+
+    if not (isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition)):
+        condition = {'$eq': condition}
+
+    terms, params = [], []
+    for op, arg in condition.items():
+        if op == '$eq':
+            if arg is None and column != 'id':
+                terms.append(f"({column} IS NULL OR {column} = ?)")
+                params.append(_COMPLEX)
+            elif _is_scalar(arg):
+                terms.append(f"{column} IN (?, ?)" if column != 'id' else "id = ?")
+                params.extend([encode(arg), _COMPLEX] if column != 'id' else [encode(arg)])
+        elif op == '$in':
+            if isinstance(arg, (list, tuple)) and all(_is_scalar(item) for item in arg):
+                values = [encode(item) for item in arg] + ([_COMPLEX] if column != 'id' else [])
+                if values:
+                    terms.append(f"{column} IN ({', '.join('?' * len(values))})")
+                    params.extend(values)
+                else:
+                    terms.append("0")
+        elif op in ('$lt', '$lte', '$gt', '$gte') and column != 'id':
+            if _is_scalar(arg) and not isinstance(arg, bool):
+                sql_op = {'$lt': '<', '$lte': '<=', '$gt': '>', '$gte': '>='}[op]
+                terms.append(f"{column} {sql_op} ?")
+                params.append(encode(arg))
+    return terms, params
+
+
+def _sql_filter(query: Optional[Dict]) -> Tuple[List[str], List]:
+    """WHERE terms (AND) for the indexable part of a query - 나머지는 _matches가 확인"""
+    terms, params = [], []
+    for key, condition in (query or {}).items():
+        if key == '$and':
+            for sub in condition:
+                sub_terms, sub_params = _sql_filter(sub)
+                terms.extend(sub_terms)
+                params.extend(sub_params)
+        elif key == '$or':
+            branches = [_sql_filter(sub) for sub in condition]
+            # 조건을 못 옮긴 분기가 하나라도 있으면 전체가 후보
+            if branches and all(branch_terms for branch_terms, _ in branches):
+                terms.append('(' + ' OR '.join('(' + ' AND '.join(t) + ')' for t, _ in branches) + ')')
+                for _, branch_params in branches:
+                    params.extend(branch_params)
+        elif not key.startswith('$'):
+            field_terms, field_params = _sql_condition(key, condition)
+            terms.extend(field_terms)
+            params.extend(field_params)
+    return terms, params
+
+
+# ==================== Query Matching ====================
+
+_MISSING = object()
+
+
+def _get_path(doc: Dict, path: str):
+    value = doc
+    for part in path.split('.'):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+
+def _compare(value, arg, op) -> bool:
+    if value is _MISSING or value is None or arg is None:
+        return False
+    try:
+        return op(value, arg)
+    except TypeError:
+        return False
+
+
+def _equals(value, expected) -> bool:
+    if value is _MISSING:
+        return expected is None
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+_OPERATORS = {
+    '$eq': _equals,
+    '$ne': lambda v, a: not _equals(v, a),
+    '$in': lambda v, a: any(_equals(v, item) for item in a),
+    '$nin': lambda v, a: not any(_equals(v, item) for item in a),
+    '$lt': lambda v, a: _compare(v, a, lambda x, y: x < y),
+    '$lte': lambda v, a: _compare(v, a, lambda x, y: x <= y),
+    '$gt': lambda v, a: _compare(v, a, lambda x, y: x > y),
+    '$gte': lambda v, a: _compare(v, a, lambda x, y: x >= y),
+    '$exists': lambda v, a: (v is not _MISSING) == bool(a),
+}
+
+
+def _matches(doc: Dict, query: Optional[Dict]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == '$or':
+            if not any(_matches(doc, sub) for sub in condition):
+                return False
+            continue
+        if key == '$and':
+            if not all(_matches(doc, sub) for sub in condition):
+                return False
+            continue
+        if key == '$nor':
+            if any(_matches(doc, sub) for sub in condition):
+                return False
+            continue
+
+        value = _get_path(doc, key)
+        if isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition):
+            for op, arg in condition.items():
+                if op not in _OPERATORS:
+                    raise ValueError(f"Unsupported query operator: {op}")
+                if not _OPERATORS[op](value, arg):
+                    return False
+        elif not _equals(value, condition):
+            return False
+    return True
+
+
+# ==================== Updates ====================
+
+def _set_path(doc: Dict, path: str, value: Any):
+    parts = path.split('.')
+    target = doc
+    for part in parts[:-1]:
+        if not isinstance(target.get(part), dict):
+            target[part] = {}
+        target = target[part]
+    target[parts[-1]] = value
+
+
+def _unset_path(doc: Dict, path: str):
+    parts = path.split('.')
+    target = doc
+    for part in parts[:-1]:
+        target = target.get(part)
+        if not isinstance(target, dict):
+            return
+    target.pop(parts[-1], None)
+
+
+def _apply_update(doc: Dict, update: Dict, inserting: bool = False) -> Dict:
+    for op, fields in update.items():
+        if op == '$set':
+            for path, value in fields.items():
+                _set_path(doc, path, value)
+        elif op == '$setOnInsert':
+            if inserting:
+                for path, value in fields.items():
+                    _set_path(doc, path, value)
+        elif op == '$inc':
+            for path, amount in fields.items():
+                current = _get_path(doc, path)
+                _set_path(doc, path, (0 if current is _MISSING or current is None else current) + amount)
+        elif op == '$unset':
+            for path in fields:
+                _unset_path(doc, path)
+        else:
+            raise ValueError(f"Unsupported update operator: {op}")
+    return doc
+
+
+def _project(doc: Dict, projection: Optional[Dict]) -> Dict:
+    if not projection:
+        return doc
+    include = {key for key, flag in projection.items() if flag}
+    if include:
+        result = {'_id': doc['_id']} if projection.get('_id', 1) and '_id' in doc else {}
+        for path in include:
+            value = _get_path(doc, path)
+            if value is not _MISSING:
+                _set_path(result, path, value)
+        return result
+    result = dict(doc)
+    for path in projection:
+        _unset_path(result, path)
+    return result
+
+
+def _sort_key(path: str):
+    def key(doc: Dict):
+        value = _get_path(doc, path)
+        # Mongo처럼 None/없는 값이 오름차순에서 먼저
+        return (0, 0) if value is _MISSING or value is None else (1, value)
+    return key
+
+
+# ==================== Results ====================
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class InsertManyResult:
+    def __init__(self, inserted_ids: List):
+        self.inserted_ids = inserted_ids
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int, modified_count: int, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+
+
+class Cursor:
+    """Lazy result set supporting sort / skip / limit like pymongo"""
+
+    def __init__(self, docs: List[Dict], projection: Optional[Dict]):
+        self._docs = docs
+        self._projection = projection
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list: Union[str, List[Tuple[str, int]]], direction: int = 1) -> 'Cursor':
+        keys = [(key_or_list, direction)] if isinstance(key_or_list, str) else list(key_or_list)
+        for path, order in reversed(keys):
+            self._docs.sort(key=_sort_key(path), reverse=order < 0)
+        return self
+
+    def skip(self, count: int) -> 'Cursor':
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> 'Cursor':
+        self._limit = count
+        return self
+
+    def __iter__(self) -> Iterator[Dict]:
+        docs = self._docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return iter(_project(doc, self._projection) for doc in docs)
+
+
+# ==================== Collection / Database ====================
+
+class SQLiteCollection:
+    """Mongo-style collection backed by one SQLite table"""
+
+    def __init__(self, store: 'SQLiteStore', name: str):
+        self._store = store
+        self.name = name
+        self._table = f'"{name}"'
+        columns = ''.join(f", {_column(field)}" for field in INDEXED_FIELDS)
+        with store.transaction():
+            store._conn.execute(f"CREATE TABLE IF NOT EXISTS {self._table} (id TEXT PRIMARY KEY, doc TEXT NOT NULL{columns})")
+            self._migrate()
+            for field in INDEXED_COLUMNS:
+                store._conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{name}_{field}" ON {self._table} ({_column(field)})'
+                )
+
+    def _migrate(self):
+        """Add indexed columns to a table created before they existed and fill them from the documents"""
+        conn = self._store._conn
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({self._table})")}
+        missing = [field for field in INDEXED_FIELDS if f"f_{field}" not in existing]
+        if not missing:
+            return
+        for field in missing:
+            conn.execute(f"ALTER TABLE {self._table} ADD COLUMN {_column(field)}")
+        rows = conn.execute(f"SELECT doc FROM {self._table}").fetchall()
+        for (raw,) in rows:
+            self._write(_loads(raw))
+        print(f"🗄️ SQLite {self.name}: added indexed columns {', '.join(missing)} ({len(rows)} rows)")
+
+    # --- internal ---
+
+    def _load(self, query: Optional[Dict]) -> List[Dict]:
+        """Matching documents (인덱스 컬럼 / _id 조건은 SQL에서 먼저 거름)"""
+        terms, params = _sql_filter(query)
+        sql = f"SELECT doc FROM {self._table}"
+        if terms:
+            sql += " WHERE " + " AND ".join(terms)
+        docs = [_loads(row[0]) for row in self._store._conn.execute(sql, params)]
+        return [doc for doc in docs if _matches(doc, query)]
+
+    def _write(self, doc: Dict):
+        columns = ''.join(f", {_column(field)}" for field in INDEXED_FIELDS)
+        placeholders = ', ?' * len(INDEXED_FIELDS)
+        self._store._conn.execute(
+            f"INSERT OR REPLACE INTO {self._table} (id, doc{columns}) VALUES (?, ?{placeholders})",
+            (str(doc['_id']), _dumps(doc), *(_column_value(doc.get(field)) for field in INDEXED_FIELDS))
+        )
+
+    def _upsert_doc(self, query: Dict) -> Dict:
+        """New document seeded from the equality fields of an upsert filter"""
+        doc = {}
+        for key, value in (query or {}).items():
+            if not key.startswith('$') and not (isinstance(value, dict) and any(k.startswith('$') for k in value)):
+                _set_path(doc, key, value)
+        doc.setdefault('_id', uuid.uuid4().hex)
+        return doc
+
+    # --- reads ---
+
+    def find_one(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> Optional[Dict]:
+        with self._store._lock:
+            docs = self._load(query)
+        return _project(docs[0], projection) if docs else None
+
+    def find(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> Cursor:
+        with self._store._lock:
+            docs = self._load(query)
+        return Cursor(docs, projection)
+
+    def count_documents(self, query: Optional[Dict] = None) -> int:
+        with self._store._lock:
+            return len(self._load(query))
+
+    # --- writes ---
+
+    def insert_one(self, doc: Dict) -> InsertOneResult:
+        doc.setdefault('_id', uuid.uuid4().hex)
+        with self._store.transaction():
+            if self._load({'_id': doc['_id']}):
+                raise ValueError(f"Duplicate key: {doc['_id']}")
+            self._write(doc)
+        return InsertOneResult(doc['_id'])
+
+    def insert_many(self, docs: List[Dict]) -> InsertManyResult:
+        with self._store.transaction():
+            for doc in docs:
+                doc.setdefault('_id', uuid.uuid4().hex)
+                if self._load({'_id': doc['_id']}):
+                    raise ValueError(f"Duplicate key: {doc['_id']}")
+                self._write(doc)
+        return InsertManyResult([doc['_id'] for doc in docs])
+
+    def replace_one(self, query: Dict, replacement: Dict, upsert: bool = False) -> UpdateResult:
+        with self._store.transaction():
+            docs = self._load(query)
+            if docs:
+                new_doc = dict(replacement)
+                new_doc['_id'] = docs[0]['_id']
+                self._write(new_doc)
+                return UpdateResult(1, 1)
+            if upsert:
+                new_doc = dict(replacement)
+                new_doc.setdefault('_id', self._upsert_doc(query)['_id'])
+                self._write(new_doc)
+                return UpdateResult(0, 0, new_doc['_id'])
+        return UpdateResult(0, 0)
+
+    def update_one(self, query: Dict, update: Dict, upsert: bool = False) -> UpdateResult:
+        with self._store.transaction():
+            docs = self._load(query)
+            if docs:
+                self._write(_apply_update(docs[0], update))
+                return UpdateResult(1, 1)
+            if upsert:
+                doc = _apply_update(self._upsert_doc(query), update, inserting=True)
+                self._write(doc)
+                return UpdateResult(0, 0, doc['_id'])
+        return UpdateResult(0, 0)
+
+    def update_many(self, query: Dict, update: Dict) -> UpdateResult:
+        with self._store.transaction():
+            docs = self._load(query)
+            for doc in docs:
+                self._write(_apply_update(doc, update))
+        return UpdateResult(len(docs), len(docs))
+
+    def find_one_and_update(self, query: Dict, update: Dict, sort: Optional[List[Tuple[str, int]]] = None,
+                            return_document: bool = False, upsert: bool = False) -> Optional[Dict]:
+        """Atomic read-modify-write (BEGIN IMMEDIATE → 다른 프로세스와도 원자적)
+
+        return_document: True(= pymongo ReturnDocument.AFTER)면 수정 후 문서 반환
+        """
+        with self._store.transaction():
+            docs = self._load(query)
+            if sort:
+                docs = list(Cursor(docs, None).sort(sort))
+            if not docs:
+                if not upsert:
+                    return None
+                doc = _apply_update(self._upsert_doc(query), update, inserting=True)
+                self._write(doc)
+                return doc if return_document else None
+            before = _loads(_dumps(docs[0]))
+            after = _apply_update(docs[0], update)
+            self._write(after)
+        return after if return_document else before
+
+    def delete_one(self, query: Dict) -> DeleteResult:
+        with self._store.transaction():
+            docs = self._load(query)
+            if not docs:
+                return DeleteResult(0)
+            self._store._conn.execute(f"DELETE FROM {self._table} WHERE id = ?", (str(docs[0]['_id']),))
+        return DeleteResult(1)
+
+    def delete_many(self, query: Dict) -> DeleteResult:
+        with self._store.transaction():
+            docs = self._load(query)
+            self._store._conn.executemany(
+                f"DELETE FROM {self._table} WHERE id = ?",
+                [(str(doc['_id']),) for doc in docs]
+            )
+        return DeleteResult(len(docs))
+
+
+class SQLiteStore:
+    """Database handle: attribute access returns a collection (db.tasks, db.naver_sessions ...)"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._collections: Dict[str, SQLiteCollection] = {}
+
+    def transaction(self):
+        return _Transaction(self)
+
+    def __getattr__(self, name: str) -> SQLiteCollection:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name: str) -> SQLiteCollection:
+        if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', name):
+            raise ValueError(f"Invalid collection name: {name}")
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = SQLiteCollection(self, name)
+                self._collections[name] = collection
+            return collection
+
+
+class _Transaction:
+    """Write transaction (thread lock + BEGIN IMMEDIATE for cross-process safety)"""
+
+    def __init__(self, store: SQLiteStore):
+        self._store = store
+
+    def __enter__(self):
+        self._store._lock.acquire()
+        try:
+            self._store._conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self._store._lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._store._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._store._lock.release()
+        return False
@@ -0,0 +1,57 @@
+"""
+Task Event Bus (in-process pub/sub)
+작업 진행률을 스크래퍼에서 SSE 구독자에게 바로 전달
+
+- 워커 스레드에서 publish → 각 구독자의 asyncio 이벤트 루프로 전달 (call_soon_threadsafe)
+- GET /api/naver/tasks/{task_id}/events 에서 사용
+"""
+
+import asyncio
+import threading
+from typing import Dict, List, Tuple
+from utils.metrics import metrics
+
+
+class TaskEventBus:
+    """Fan out task events from worker threads to asyncio subscribers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def publish(self, task_id: str, event: str, data: Dict):
+        """Publish an event ('progress' / 'status') for a task (thread-safe)"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(task_id, []))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+            except RuntimeError:
+                # 구독자의 이벤트 루프가 이미 종료됨
+                pass
+        metrics.incr(f'task_events.{event}')
+
+    def subscribe(self, task_id: str) -> asyncio.Queue:
+        """Subscribe from inside a running event loop"""
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(task_id, []).append((loop, queue))
+            count = sum(len(subs) for subs in self._subscribers.values())
+        metrics.set_gauge('task_events.subscribers', count)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = [sub for sub in self._subscribers.get(task_id, []) if sub[1] is not queue]
+            if subscribers:
+                self._subscribers[task_id] = subscribers
+            else:
+                self._subscribers.pop(task_id, None)
+            count = sum(len(subs) for subs in self._subscribers.values())
+        metrics.set_gauge('task_events.subscribers', count)
+
+
+# Singleton instance
+task_events = TaskEventBus()
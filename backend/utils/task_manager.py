@@ -1,22 +1,179 @@
 """
 Task Manager for Background Jobs
-MongoDB-based task queue for handling long-running operations
+Database-backed task queue for handling long-running operations (MongoDB or SQLite)
+
+- 이 프로세스에서 실행 중인 작업은 메모리에 보관 (get_task는 dict 조회)
+- 변경 사항은 모아서 백그라운드 스레드가 MongoDB에 기록 (write-behind)
+  - 진행률: TASK_FLUSH_INTERVAL_SECONDS마다 최신 값만 기록
+  - 생성/상태 전환/결과/오류: 즉시 flush 요청
+- 진행률은 task_events로 실시간 전달 (SSE)
+- 리뷰 목록 같은 큰 결과는 task_results 컬렉션에 청크로 저장, task에는 요약 + 참조(result_ref)만
+- 취소: cancel_requested 기록 + 작업 스레드의 취소 Event 설정 → 스크래퍼가 루프에서 확인 후 부분 결과 반환
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
 import uuid
-from utils.db import get_db
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from config import settings
+from utils.db import get_db, is_db_available
+from utils.metrics import metrics
+from utils.task_events import task_events
+
+
+# 더 이상 진행되지 않는 상태
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+# 결과 dict에서 task_results로 분리해 저장할 목록 필드
+RESULT_ITEM_FIELDS = ('reviews',)
+
+
+def _split_result(result: Any) -> Tuple[Any, Optional[List], Optional[str]]:
+    """Split a result into (summary, items, field); items is None for small results kept inline"""
+    if isinstance(result, list):
+        return {}, result, None
+    if isinstance(result, dict):
+        for field in RESULT_ITEM_FIELDS:
+            if isinstance(result.get(field), list):
+                return {k: v for k, v in result.items() if k != field}, result[field], field
+    return result, None, None
+
+
+def make_idempotency_key(task_type: str, user_id: str, values: Dict) -> str:
+    """Derive a dedup key from the request fields that identify the same operation"""
+    raw = json.dumps([task_type, user_id, values], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
 
 
 class TaskManager:
     """Manage background tasks using MongoDB"""
     
     def __init__(self):
-        self.db = get_db()
+        self.db = get_db() if is_db_available() else None  # 파일 모드: 메모리에만 보관
         self.collection = self.db.tasks if self.db is not None else None
+        
+        self._lock = threading.RLock()
+        self._live: Dict[str, Dict] = {}  # task_id -> task document (이 프로세스에서 실행 중/최근 완료)
+        self._new: Dict[str, Dict] = {}  # 아직 insert 되지 않은 작업
+        self._dirty: Dict[str, Dict] = {}  # task_id -> 기록 대기 중인 $set 필드
+        self._evict_at: Dict[str, float] = {}  # 완료된 작업을 메모리에서 내릴 시각 (monotonic)
+        self._result_items: Dict[str, List] = {}  # 메모리에 있는 작업의 결과 목록 (task_results와 동일)
+        self._cancel_events: Dict[str, threading.Event] = {}  # 이 프로세스에서 실행 중인 작업의 취소 신호
+        self._lease_owners: Dict[str, str] = {}  # task_id -> worker_id (worker.py가 가져간 작업은 lease가 있을 때만 기록)
+        self._account_leases: Dict[str, str] = {}  # task_id -> user_id (serial 타입 작업이 잡고 있는 계정 임대)
+        self._flush_requested = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+    
+    # ==================== Write-behind ====================
+    
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            with self._lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, name="task-flusher", daemon=True)
+                    self._flusher.start()
+    
+    def _flush_loop(self):
+        while True:
+            self._flush_requested.wait(settings.task_flush_interval_seconds)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+                self._evict_finished()
+            except Exception as e:
+                print(f"⚠️ Task flush error: {e}")
     
-    def create_task(self, task_type: str, user_id: str, params: Dict) -> str:
+    def _apply(self, task_id: str, fields: Dict, urgent: bool = False):
+        """Apply $set-style fields to the in-memory task and queue them for MongoDB"""
+        with self._lock:
+            task = self._live.get(task_id)
+            if task is not None:
+                for key, value in fields.items():
+                    if key.startswith('progress.'):
+                        task.setdefault('progress', {})[key.split('.', 1)[1]] = value
+                    else:
+                        task[key] = value
+            if task_id not in self._new and self.collection is not None:
+                self._dirty.setdefault(task_id, {}).update(fields)
+        
+        self._ensure_flusher()
+        if urgent:
+            self._flush_requested.set()
+    
+    def flush(self):
+        """Write pending inserts/updates to MongoDB (flusher thread, shutdown)"""
+        if self.collection is None:
+            return
+        
+        with self._lock:
+            inserts = [dict(task) for task in self._new.values()]
+            updates = self._dirty
+            self._new = {}
+            self._dirty = {}
+        if not inserts and not updates:
+            return
+        
+        started = time.monotonic()
+        for task in inserts:
+            try:
+                self.collection.insert_one(task)
+            except Exception as e:
+                print(f"⚠️ Task insert failed ({task['_id']}), will retry: {e}")
+                with self._lock:
+                    self._new.setdefault(task['_id'], self._live.get(task['_id'], task))
+        
+        for task_id, fields in updates.items():
+            with self._lock:
+                owner = self._lease_owners.get(task_id)
+            query = {'_id': task_id}
+            if owner:
+                # lease를 잃은 뒤(다른 워커가 재시도 / sweep이 실패 처리)에는 기록하지 않음
+                query['lease_owner'] = owner
+            try:
+                result = self.collection.update_one(query, {'$set': fields})
+            except Exception as e:
+                print(f"⚠️ Task update failed ({task_id}), will retry: {e}")
+                with self._lock:
+                    # 그 사이 들어온 더 새로운 값은 유지
+                    self._dirty[task_id] = {**fields, **self._dirty.get(task_id, {})}
+                continue
+            if owner and result.matched_count == 0:
+                print(f"⚠️ Lease lost for task {task_id} - dropped update ({', '.join(sorted(fields))})")
+                metrics.incr('task_manager.lease_lost_writes')
+            if owner and fields.get('status') in TERMINAL_STATUSES:
+                with self._lock:
+                    self._lease_owners.pop(task_id, None)
+        
+        metrics.incr('task_manager.flush.writes', len(inserts) + len(updates))
+        metrics.observe('task_manager.flush_seconds', time.monotonic() - started)
+    
+    def _finish_live(self, task_id: str):
+        """Keep a finished task in memory briefly (최종 결과 조회용), then evict"""
+        with self._lock:
+            if task_id in self._live:
+                self._evict_at[task_id] = time.monotonic() + settings.task_live_retention_seconds
+    
+    def _evict_finished(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                task_id for task_id, deadline in self._evict_at.items()
+                if deadline <= now and task_id not in self._dirty and task_id not in self._new
+            ]
+            for task_id in expired:
+                self._live.pop(task_id, None)
+                self._result_items.pop(task_id, None)
+                del self._evict_at[task_id]
+            metrics.set_gauge('task_manager.live_tasks', len(self._live))
+    
+    # ==================== Tasks ====================
+    
+    def create_task(self, task_type: str, user_id: str, params: Dict, idempotency_key: Optional[str] = None) -> str:
         """
         Create a new background task
         
@@ -24,6 +181,7 @@ class TaskManager:
             task_type: Type of task ('review_load', 'reply_post', etc.)
             user_id: User ID for multi-account support
             params: Task parameters (place_id, load_count, etc.)
+            idempotency_key: 중복 제출 확인용 키 (find_duplicate 참고)
         
         Returns:
             task_id: Unique task ID
@@ -46,15 +204,99 @@ class TaskManager:
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow(),
             'started_at': None,
-            'completed_at': None
+            'completed_at': None,
+            # 워커 프로세스 임대(lease) 정보 - worker.py 참고
+            # inprocess 모드는 웹 프로세스가 실행하므로 처음부터 점유 표시 (worker.py가 가져가지 않도록)
+            'lease_owner': None if settings.task_execution_mode == "worker" else 'inprocess',
+            'lease_expires_at': None,
+            'attempts': 0,
+            'idempotency_key': idempotency_key
         }
         
-        if self.collection is not None:
+        if self.collection is not None and settings.task_execution_mode == "worker":
+            # 다른 프로세스(worker.py)가 실행하므로 바로 저장하고 메모리에 두지 않음
             self.collection.insert_one(task)
-            print(f"✅ Task created: {task_id} ({task_type})")
+        else:
+            # DB가 없으면(파일 모드) 메모리에만 보관 - 이 프로세스의 get_task / 결과 조회는 그대로 동작
+            with self._lock:
+                self._live[task_id] = task
+                if self.collection is not None:
+                    self._new[task_id] = task
+            self._ensure_flusher()
+            self._flush_requested.set()
+        print(f"✅ Task created: {task_id} ({task_type})")
         
         return task_id
     
+    def find_duplicate(self, task_type: str, user_id: str, idempotency_key: str, window_seconds: int,
+                       active_only: bool = False) -> Optional[Dict]:
+        """
+        Most recent task with the same idempotency key inside the dedup window
+        
+        실패한 작업은 제외 (다시 시도 가능해야 하므로)
+        
+        Args:
+            active_only: True면 대기/실행 중인 작업만 (완료된 작업은 재사용하지 않음)
+        """
+        statuses = ['pending', 'processing'] if active_only else ['pending', 'processing', 'completed']
+        cutoff = datetime.utcnow() - timedelta(seconds=window_seconds)
+        
+        with self._lock:
+            candidates = [
+                task for task in self._live.values()
+                if task.get('idempotency_key') == idempotency_key and task['type'] == task_type
+                and task['user_id'] == user_id and task['status'] in statuses and task['created_at'] >= cutoff
+            ]
+        if candidates:
+            return max(candidates, key=lambda task: task['created_at'])
+        
+        if self.collection is None:
+            return None
+        found = list(self.collection.find({
+            'idempotency_key': idempotency_key,
+            'type': task_type,
+            'user_id': user_id,
+            'status': {'$in': statuses},
+            'created_at': {'$gte': cutoff}
+        }).sort('created_at', -1).limit(1))
+        return found[0] if found else None
+    
+    def find_latest(self, task_type: str, user_id: str, params_match: Dict, status: str = 'completed') -> Optional[Dict]:
+        """Most recent task of a type whose params match (예: 같은 매장의 마지막 리뷰 로드 결과)"""
+        def matches(task: Dict) -> bool:
+            params = task.get('params') or {}
+            return all(params.get(key) == value for key, value in params_match.items())
+        
+        with self._lock:
+            candidates = [
+                task for task in self._live.values()
+                if task['type'] == task_type and task['user_id'] == user_id and task['status'] == status and matches(task)
+            ]
+        if candidates:
+            return max(candidates, key=lambda task: task['created_at'])
+        
+        if self.collection is None:
+            return None
+        query = {'type': task_type, 'user_id': user_id, 'status': status}
+        query.update({f'params.{key}': value for key, value in params_match.items()})
+        found = list(self.collection.find(query).sort('created_at', -1).limit(1))
+        return found[0] if found else None
+    
+    def adopt_task(self, task: Dict):
+        """Track a task claimed from MongoDB (worker.py) in memory - 이후 기록은 lease_owner 조건부"""
+        with self._lock:
+            self._live[task['_id']] = task
+            if task.get('lease_owner'):
+                self._lease_owners[task['_id']] = task['lease_owner']
+    
+    def holds_lease(self, task_id: str) -> bool:
+        """False if a task claimed by this process lost its lease (worker.py 작업이 아니면 항상 True)"""
+        with self._lock:
+            owner = self._lease_owners.get(task_id)
+        if owner is None or self.collection is None:
+            return True
+        return self.collection.find_one({'_id': task_id, 'lease_owner': owner}, {'_id': 1}) is not None
+    
     def update_task_status(self, task_id: str, status: str, **kwargs):
         """Update task status and other fields"""
         update_fields = {
@@ -65,86 +307,401 @@ class TaskManager:
         if status == 'processing' and 'started_at' not in kwargs:
             update_fields['started_at'] = datetime.utcnow()
         
-        if status in ['completed', 'failed']:
+        if status in TERMINAL_STATUSES:
             update_fields['completed_at'] = datetime.utcnow()
+            update_fields['lease_owner'] = None
+            update_fields['lease_expires_at'] = None
         
         # Add any additional fields
         update_fields.update(kwargs)
         
-        if self.collection is not None:
-            self.collection.update_one(
-                {'_id': task_id},
-                {'$set': update_fields}
-            )
-            print(f"🔄 Task {task_id}: {status}")
+        self._apply(task_id, update_fields, urgent=True)
+        print(f"🔄 Task {task_id}: {status}")
+        
+        task_events.publish(task_id, 'status', {'status': status})
+        if status in TERMINAL_STATUSES:
+            self._finish_live(task_id)
     
     def update_progress(self, task_id: str, current: int, message: str, total: Optional[int] = None):
         """Update task progress
         
+        구독자(SSE)에게 바로 전달하고, MongoDB에는 TASK_FLUSH_INTERVAL_SECONDS마다 최신 값만 기록
+        
         Args:
             task_id: Task ID
             current: Current progress count
             message: Progress message
             total: Total count (optional, only update if provided)
         """
-        if self.collection is not None:
-            update_fields = {
-                'progress.current': current,
-                'progress.message': message,
-                'updated_at': datetime.utcnow()
-            }
-            
-            # total이 제공되면 업데이트
-            if total is not None:
-                update_fields['progress.total'] = total
-            
-            self.collection.update_one(
-                {'_id': task_id},
-                {'$set': update_fields}
-            )
+        update_fields = {
+            'progress.current': current,
+            'progress.message': message,
+            'updated_at': datetime.utcnow()
+        }
+        
+        # total이 제공되면 업데이트
+        if total is not None:
+            update_fields['progress.total'] = total
+        
+        self._apply(task_id, update_fields)
+        
+        with self._lock:
+            task = self._live.get(task_id)
+            progress = dict(task['progress']) if task else {k.split('.', 1)[1]: v for k, v in update_fields.items() if k.startswith('progress.')}
+        task_events.publish(task_id, 'progress', progress)
     
     def get_task(self, task_id: str) -> Optional[Dict]:
-        """Get task by ID"""
+        """Get task by ID (이 프로세스에서 실행 중인 작업은 메모리에서 조회)"""
+        with self._lock:
+            task = self._live.get(task_id)
+            if task is not None:
+                metrics.incr('task_manager.get.memory')
+                return {**task, 'progress': dict(task.get('progress') or {})}
+        
         if self.collection is not None:
-            task = self.collection.find_one({'_id': task_id})
-            return task
+            metrics.incr('task_manager.get.db')
+            return self.collection.find_one({'_id': task_id})
         return None
     
     def set_result(self, task_id: str, result: any):
-        """Set task result"""
+        """Set task result
+        
+        리뷰 목록은 task_results에 청크로 먼저 저장하고, task에는 요약과 result_ref만 기록
+        (폴링마다 전체 목록을 내려주지 않도록 - 목록은 GET /tasks/{task_id}/result로 페이지 조회)
+        """
+        summary, items, field = _split_result(result)
+        if items is None:
+            self._apply(task_id, {
+                'result': result,
+                'updated_at': datetime.utcnow()
+            }, urgent=True)
+            return
+        
+        result_ref = self._store_result_items(task_id, items, field)
+        self._apply(task_id, {
+            'result': summary,
+            'result_ref': result_ref,
+            'updated_at': datetime.utcnow()
+        }, urgent=True)
+    
+    def _store_result_items(self, task_id: str, items: List, field: Optional[str]) -> Dict:
+        """Write result items as chunks (synchronously, before the task is marked completed)"""
+        chunk_size = max(1, settings.task_result_chunk_size)
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        
+        with self._lock:
+            if task_id in self._live:
+                self._result_items[task_id] = items
+        
         if self.collection is not None:
-            self.collection.update_one(
-                {'_id': task_id},
-                {
-                    '$set': {
-                        'result': result,
-                        'updated_at': datetime.utcnow()
-                    }
-                }
-            )
+            if not self.holds_lease(task_id):
+                print(f"⚠️ Lease lost for task {task_id} - result not stored")
+                metrics.incr('task_manager.lease_lost_writes')
+                return {'field': field, 'count': len(items), 'chunk_size': chunk_size, 'chunks': len(chunks)}
+            started = time.monotonic()
+            now = datetime.utcnow()
+            # 재시도된 작업(worker lease 만료)의 이전 결과 제거
+            self.db.task_results.delete_many({'task_id': task_id})
+            if chunks:
+                self.db.task_results.insert_many([
+                    {'_id': f"{task_id}:{index}", 'task_id': task_id, 'chunk': index, 'items': chunk, 'created_at': now}
+                    for index, chunk in enumerate(chunks)
+                ])
+            metrics.observe('task_manager.result_write_seconds', time.monotonic() - started)
+        
+        return {'field': field, 'count': len(items), 'chunk_size': chunk_size, 'chunks': len(chunks)}
+    
+    def get_result_page(self, task: Dict, offset: int, limit: int) -> Tuple[List, int]:
+        """
+        One page of a task's result items
+        
+        Returns:
+            (items, total) - result_ref가 없는 작업(작은 결과/이전 형식)은 task['result']에서 잘라서 반환
+        """
+        result_ref = task.get('result_ref')
+        if not result_ref:
+            _, items, _ = _split_result(task.get('result'))
+            items = items or []
+            return items[offset:offset + limit], len(items)
+        
+        total = result_ref['count']
+        with self._lock:
+            items = self._result_items.get(task['_id'])
+        if items is not None:
+            metrics.incr('task_manager.result_page.memory')
+            return items[offset:offset + limit], total
+        
+        if self.collection is None or offset >= total:
+            return [], total
+        
+        metrics.incr('task_manager.result_page.db')
+        chunk_size = result_ref['chunk_size']
+        first, last = offset // chunk_size, (min(offset + limit, total) - 1) // chunk_size
+        # 청크 _id는 "{task_id}:{index}" → 필요한 청크만 기본 키로 조회
+        chunks = self.db.task_results.find(
+            {'_id': {'$in': [f"{task['_id']}:{index}" for index in range(first, last + 1)]}}
+        ).sort('chunk', 1)
+        
+        items = [item for chunk in chunks for item in chunk['items']]
+        start = offset - first * chunk_size
+        return items[start:start + limit], total
     
     def set_error(self, task_id: str, error: str):
         """Set task error"""
-        if self.collection is not None:
-            self.collection.update_one(
-                {'_id': task_id},
+        self._apply(task_id, {
+            'error': error,
+            'status': 'failed',
+            'completed_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow(),
+            'lease_owner': None,
+            'lease_expires_at': None
+        }, urgent=True)
+        task_events.publish(task_id, 'status', {'status': 'failed', 'error': error})
+        self._finish_live(task_id)
+    
+    # ==================== Cancellation ====================
+    
+    def cancel_event(self, task_id: str) -> threading.Event:
+        """Cancellation signal for a task running in this process (handler에서 is_set으로 확인)"""
+        with self._lock:
+            return self._cancel_events.setdefault(task_id, threading.Event())
+    
+    def request_cancel(self, task_id: str):
+        """Ask a running task to stop (다른 프로세스의 작업은 worker가 DB의 cancel_requested를 확인)"""
+        self._apply(task_id, {'cancel_requested': True, 'updated_at': datetime.utcnow()}, urgent=True)
+        with self._lock:
+            running_here = task_id in self._live or task_id in self._cancel_events
+        if running_here:
+            self.cancel_event(task_id).set()
+        task_events.publish(task_id, 'status', {'status': 'cancelling'})
+        print(f"🛑 Cancel requested for task {task_id}")
+    
+    def is_cancel_requested(self, task_id: str) -> bool:
+        with self._lock:
+            event = self._cancel_events.get(task_id)
+        return event is not None and event.is_set()
+    
+    def poll_cancel_requested(self, task_id: str) -> bool:
+        """Sync the cancel flag from the database (worker.py - 웹 프로세스가 기록한 취소 요청)"""
+        if self.collection is None:
+            return False
+        task = self.collection.find_one({'_id': task_id}, {'cancel_requested': 1})
+        if task and task.get('cancel_requested'):
+            self.cancel_event(task_id).set()
+            return True
+        return False
+    
+    def cancel_pending(self, task_id: str) -> bool:
+        """Atomically cancel a task that no worker has claimed yet (worker 모드)"""
+        if self.collection is None:
+            return False
+        now = datetime.utcnow()
+        task = self.collection.find_one_and_update(
+            {'_id': task_id, 'status': 'pending'},
+            {'$set': {'status': 'cancelled', 'cancel_requested': True, 'completed_at': now, 'updated_at': now}}
+        )
+        if task is None:
+            return False
+        task_events.publish(task_id, 'status', {'status': 'cancelled'})
+        return True
+    
+    def forget_cancel(self, task_id: str):
+        with self._lock:
+            self._cancel_events.pop(task_id, None)
+    
+    # ==================== Worker Leasing ====================
+    
+    def claim_task(self, worker_id: str, task_types: List[str], lease_seconds: int, max_attempts: int,
+                   serial_types: Optional[List[str]] = None, no_retry_types: Optional[List[str]] = None) -> Optional[Dict]:
+        """
+        Atomically claim the oldest runnable task for a worker process
+        
+        pending 작업 또는 임대가 만료된 processing 작업(워커가 죽은 경우)을 가져옴
+        find_one_and_update로 한 작업은 한 워커만 가져가도록 보장
+        웹 프로세스가 실행하는 작업(lease_owner='inprocess')은 pending이어도 가져가지 않음
+        
+        Args:
+            serial_types: 같은 계정의 작업이 실행 중이면 가져가지 않는 타입 (예: reply_post)
+                → account_leases 문서(_id=user_id)를 먼저 원자적으로 잡은 워커만 작업을 가져감
+                  (워커 프로세스가 여러 개여도 한 계정의 serial 작업은 하나씩)
+            no_retry_types: lease가 만료돼도 다시 가져가지 않는 타입 (fail_abandoned_tasks가 정리)
+        
+        Returns:
+            Claimed task document (None if nothing to run)
+        """
+        if self.collection is None or not task_types:
+            return None
+        
+        now = datetime.utcnow()
+        expired = {'status': 'processing', 'lease_expires_at': {'$lt': now}, 'attempts': {'$lt': max_attempts}}
+        if no_retry_types:
+            expired['type'] = {'$nin': list(no_retry_types)}
+        query = {
+            'type': {'$in': task_types},
+            '$or': [
+                {'status': 'pending', 'lease_owner': None},
+                expired
+            ]
+        }
+        claim = {
+            '$set': {
+                'status': 'processing',
+                'lease_owner': worker_id,
+                'lease_expires_at': now + timedelta(seconds=lease_seconds),
+                'started_at': now,
+                'updated_at': now
+            },
+            '$inc': {'attempts': 1}
+        }
+        serial_types = [task_type for task_type in (serial_types or []) if task_type in task_types]
+        if not serial_types:
+            task = self.collection.find_one_and_update(query, claim, sort=[('created_at', 1)],
+                                                       return_document=ReturnDocument.AFTER)
+            if task is not None:
+                self.adopt_task(task)
+            return task
+        
+        # 계정 임대 → 작업 임대 순서로 가져옴 (작업을 못 가져가면 계정 임대 반환)
+        busy_accounts = {
+            lease['_id'] for lease in self.db.account_leases.find(
+                {'task_id': {'$ne': None}, 'expires_at': {'$gte': now}}, {'_id': 1}
+            )
+        }
+        for _ in range(5):
+            candidate_query = dict(query)
+            if busy_accounts:
+                candidate_query['$nor'] = [{'type': {'$in': serial_types}, 'user_id': {'$in': sorted(busy_accounts)}}]
+            candidates = list(self.collection.find(candidate_query, {'type': 1, 'user_id': 1}).sort('created_at', 1).limit(1))
+            if not candidates:
+                return None
+            candidate = candidates[0]
+            serial = candidate['type'] in serial_types
+            if serial and not self._acquire_account(candidate['user_id'], candidate['_id'], worker_id, lease_seconds):
+                busy_accounts.add(candidate['user_id'])
+                continue
+            
+            task = self.collection.find_one_and_update({**query, '_id': candidate['_id']}, claim,
+                                                       return_document=ReturnDocument.AFTER)
+            if task is None:
+                # 다른 워커가 먼저 가져감
+                if serial:
+                    self.release_account_lease(candidate['_id'])
+                continue
+            self.adopt_task(task)
+            return task
+        return None
+    
+    def _acquire_account(self, user_id: str, task_id: str, worker_id: str, lease_seconds: int) -> bool:
+        """Atomically take the per-account lease for a serial task (비어 있거나 만료된 경우만)"""
+        leases = self.db.account_leases
+        try:
+            leases.update_one({'_id': user_id}, {'$setOnInsert': {'task_id': None, 'expires_at': None}}, upsert=True)
+        except DuplicateKeyError:
+            pass  # 다른 워커가 동시에 만듦
+        now = datetime.utcnow()
+        acquired = leases.find_one_and_update(
+            {'_id': user_id, '$or': [{'task_id': None}, {'expires_at': {'$lt': now}}]},
+            {'$set': {'task_id': task_id, 'worker_id': worker_id, 'expires_at': now + timedelta(seconds=lease_seconds)}}
+        )
+        if acquired is None:
+            return False
+        with self._lock:
+            self._account_leases[task_id] = user_id
+        return True
+    
+    def release_account_lease(self, task_id: str):
+        """Free the account lease held by a finished serial task (worker.py)"""
+        with self._lock:
+            user_id = self._account_leases.pop(task_id, None)
+        if user_id is None or self.db is None:
+            return
+        self.db.account_leases.update_one(
+            {'_id': user_id, 'task_id': task_id},
+            {'$set': {'task_id': None, 'worker_id': None, 'expires_at': None}}
+        )
+    
+    def renew_lease(self, task_id: str, worker_id: str, lease_seconds: int) -> bool:
+        """Extend a held lease (heartbeat). False if the lease was lost."""
+        if self.collection is None:
+            return False
+        expires_at = datetime.utcnow() + timedelta(seconds=lease_seconds)
+        result = self.collection.update_one(
+            {'_id': task_id, 'status': 'processing', 'lease_owner': worker_id},
+            {'$set': {'lease_expires_at': expires_at}}
+        )
+        with self._lock:
+            user_id = self._account_leases.get(task_id)
+        if user_id is not None:
+            self.db.account_leases.update_one({'_id': user_id, 'task_id': task_id}, {'$set': {'expires_at': expires_at}})
+        return result.modified_count == 1
+    
+    def fail_abandoned_tasks(self, max_attempts: int, no_retry_types: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Fail tasks whose lease expired and that will not be retried
+        
+        - max_attempts번 가져갔는데도 끝나지 않은 작업 (워커가 반복해서 죽는 작업)
+        - no_retry_types: 첫 만료에서 바로 실패 처리 (답글 게시처럼 다시 실행하면 중복될 수 있는 작업)
+        
+        작업마다 find_one_and_update로 처리하므로 여러 워커가 동시에 sweep해도 한 곳에서만 반환
+        
+        Returns:
+            실패 처리한 작업 문서 (후속 처리용 - 예: 답글을 outbox로)
+        """
+        if self.collection is None:
+            return []
+        now = datetime.utcnow()
+        conditions = [{'attempts': {'$gte': max_attempts}}]
+        if no_retry_types:
+            conditions.append({'type': {'$in': list(no_retry_types)}})
+        query = {'status': 'processing', 'lease_expires_at': {'$lt': now}, '$or': conditions}
+        
+        failed = []
+        for candidate in self.collection.find(query, {'_id': 1, 'type': 1}):
+            if candidate['type'] in (no_retry_types or []):
+                error = '작업 처리 중 워커가 중단되었습니다. 게시되지 않은 답글은 자동 재시도됩니다.'
+            else:
+                error = '작업 처리 중 워커가 중단되었습니다. 다시 시도해주세요.'
+            task = self.collection.find_one_and_update(
+                {**query, '_id': candidate['_id']},
                 {
                     '$set': {
-                        'error': error,
                         'status': 'failed',
-                        'completed_at': datetime.utcnow(),
-                        'updated_at': datetime.utcnow()
+                        'error': error,
+                        'completed_at': now,
+                        'updated_at': now,
+                        'lease_owner': None,
+                        'lease_expires_at': None
                     }
                 }
             )
+            if task is not None:
+                task_events.publish(task['_id'], 'status', {'status': 'failed'})
+                failed.append(task)
+        if failed:
+            print(f"⚠️ Failed {len(failed)} abandoned task(s)")
+        return failed
+    
+    def get_queue_position(self, task_id: str) -> Optional[int]:
+        """1-based position among pending tasks of the same type (worker mode)"""
+        if self.collection is None:
+            return None
+        task = self.collection.find_one({'_id': task_id}, {'type': 1, 'status': 1, 'created_at': 1})
+        if not task or task['status'] != 'pending':
+            return None
+        return self.collection.count_documents({
+            'type': task['type'],
+            'status': 'pending',
+            'created_at': {'$lt': task['created_at']}
+        }) + 1
     
     def cleanup_old_tasks(self, days: int = 7):
-        """Delete tasks older than X days"""
+        """Delete tasks older than X days (MongoDB는 TTL 인덱스가 자동 삭제 - utils.db.ensure_indexes)"""
         if self.collection is not None:
             cutoff = datetime.utcnow() - timedelta(days=days)
             result = self.collection.delete_many({
                 'created_at': {'$lt': cutoff}
             })
+            self.db.task_results.delete_many({'created_at': {'$lt': cutoff}})
             print(f"🗑️ Cleaned up {result.deleted_count} old tasks")
 
 
@@ -0,0 +1,155 @@
+"""
+Standalone Task Worker
+웹 서버(uvicorn)와 별도 프로세스에서 Chrome 스크래핑 작업 처리
+
+- tasks 컬렉션의 pending 작업을 find_one_and_update로 원자적으로 가져옴 (lease, MongoDB 또는 SQLite)
+- 실행 중에는 하트비트로 lease 연장 → 워커가 죽으면 lease 만료 후 다른 워커가 재시도
+  (답글 게시 작업은 다시 실행하지 않고 실패 처리 후 답글을 outbox로 - TASK_NO_RETRY_TYPES)
+- lease를 잃은 작업의 진행률/결과는 기록하지 않음 (lease_owner 조건부 update)
+- 하트비트가 cancel_requested도 확인 → DELETE /api/naver/tasks/{id}로 취소된 작업은 부분 결과로 종료
+- 진행률/결과는 TaskManager로 기록 (웹 프로세스는 /api/naver/tasks/{id}로 조회)
+
+실행:
+    TASK_EXECUTION_MODE=worker 로 웹 서버를 띄우고 (워커도 같은 설정이 아니면 바로 종료)
+    python worker.py
+"""
+
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from typing import Dict
+
+from config import settings
+from utils.db import init_database
+from utils.metrics import metrics
+
+
+class TaskWorker:
+    """Claims tasks from the database and runs them with TASK_HANDLERS"""
+
+    def __init__(self, concurrency: int):
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency
+        self.type_limits = dict(settings.job_queue_type_limits)
+        self._running: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _claimable_types(self, handlers: Dict) -> list:
+        """Task types still under this process's per-type limit"""
+        with self._lock:
+            return [
+                task_type for task_type in handlers
+                if self._running.get(task_type, 0) < self.type_limits.get(task_type, self.concurrency)
+            ]
+
+    def _heartbeat(self, task_id: str, done: threading.Event):
+        """Renew the lease until the task finishes, and pick up cancel requests from the web process"""
+        from utils.task_manager import task_manager
+
+        last_renewed = time.monotonic()
+        cancel_seen = False
+        while not done.wait(settings.task_cancel_poll_seconds):
+            if not cancel_seen and task_manager.poll_cancel_requested(task_id):
+                print(f"🛑 Cancel requested for task {task_id}")
+                cancel_seen = True
+
+            if time.monotonic() - last_renewed < settings.task_heartbeat_seconds:
+                continue
+            last_renewed = time.monotonic()
+            if not task_manager.renew_lease(task_id, self.worker_id, settings.task_lease_seconds):
+                # 이후 진행률/결과는 기록되지 않음 (TaskManager.flush) → 작업도 멈춤
+                print(f"⚠️ Lost lease for task {task_id} (another worker may retry it) - stopping")
+                metrics.incr('worker.lease_lost')
+                task_manager.cancel_event(task_id).set()
+                return
+
+    def _slot_loop(self, slot: int):
+        from utils.task_manager import task_manager
+        from utils.job_queue import run_task
+        from services.naver_tasks import TASK_HANDLERS
+
+        while not self._stop.is_set():
+            task = task_manager.claim_task(
+                self.worker_id,
+                self._claimable_types(TASK_HANDLERS),
+                settings.task_lease_seconds,
+                settings.task_max_attempts,
+                serial_types=settings.job_queue_serial_types,
+                no_retry_types=settings.task_no_retry_types
+            )
+            if task is None:
+                self._stop.wait(settings.worker_poll_seconds)
+                continue
+
+            task_id, task_type = task['_id'], task['type']
+            print(f"▶️ [{self.worker_id}#{slot}] Claimed task {task_id} ({task_type}, attempt {task.get('attempts', 1)})")
+            with self._lock:
+                self._running[task_type] = self._running.get(task_type, 0) + 1
+
+            done = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(task_id, done), daemon=True)
+            heartbeat.start()
+            try:
+                run_task(TASK_HANDLERS[task_type], task_id, task_type, task['user_id'], task.get('params') or {},
+                         mark_processing=False)
+            finally:
+                done.set()
+                task_manager.release_account_lease(task_id)
+                with self._lock:
+                    self._running[task_type] -= 1
+
+    def _sweep_loop(self):
+        """Fail tasks that keep killing workers, and reply tasks whose worker died (답글은 outbox로)"""
+        from utils.task_manager import task_manager
+        from services.naver_tasks import requeue_abandoned_replies
+
+        while not self._stop.wait(settings.task_lease_seconds):
+            try:
+                abandoned = task_manager.fail_abandoned_tasks(settings.task_max_attempts, settings.task_no_retry_types)
+                for task in abandoned:
+                    if task['type'] in settings.task_no_retry_types:
+                        queued = requeue_abandoned_replies(task)
+                        print(f"📮 Abandoned {task['type']} task {task['_id']}: {queued} replies handed to the outbox")
+            except Exception as e:
+                print(f"⚠️ Sweep error: {e}")
+
+    def run(self):
+        print(f"👷 Worker {self.worker_id} started ({self.concurrency} slots, limits: {self.type_limits})")
+        threads = [threading.Thread(target=self._slot_loop, args=(i,), name=f"worker-slot-{i}") for i in range(self.concurrency)]
+        threads.append(threading.Thread(target=self._sweep_loop, name="worker-sweep", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        # 실행 중인 작업은 끝까지 처리하고 종료 (새 작업은 가져오지 않음)
+        while any(t.is_alive() for t in threads if not t.daemon):
+            time.sleep(0.5)
+
+        from utils.task_manager import task_manager
+        task_manager.flush()
+        print(f"✅ Worker {self.worker_id} stopped")
+
+    def stop(self, *_):
+        if not self._stop.is_set():
+            print(f"🛑 Worker {self.worker_id} stopping - finishing running tasks...")
+            self._stop.set()
+
+
+if __name__ == "__main__":
+    # inprocess 모드에서는 웹 프로세스의 job_queue가 작업을 실행 → 워커까지 돌면 같은 작업을 두 번 실행할 수 있음
+    if settings.task_execution_mode != "worker":
+        raise SystemExit("❌ worker.py requires TASK_EXECUTION_MODE=worker "
+                         f"(current: {settings.task_execution_mode}). Set it on both the web and worker processes.")
+
+    # SQLite는 WAL + BEGIN IMMEDIATE로 같은 서버의 웹 프로세스와 tasks를 공유
+    if init_database() == "file":
+        raise SystemExit("❌ worker.py requires a database (MongoDB or USE_SQLITE=true). "
+                         "Without one, tasks run inside the web process (TASK_EXECUTION_MODE=inprocess).")
+
+    worker = TaskWorker(concurrency=settings.worker_concurrency)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
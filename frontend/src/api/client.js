@@ -46,6 +46,37 @@ apiClient.interceptors.response.use(
   }
 )
 
+// 🚀 작업 진행 상황 실시간 스트림 (Server-Sent Events)
+// EventSource는 헤더를 보낼 수 없으므로 구글 이메일은 query param으로 (권한 확인용)
+export const openTaskEventStream = (taskId) => {
+  const googleEmail = localStorage.getItem('google_email')
+  const query = googleEmail ? `?google_email=${encodeURIComponent(googleEmail)}` : ''
+  return new EventSource(`${API_BASE_URL}/api/naver/tasks/${taskId}/events${query}`, { withCredentials: true })
+}
+
+// 🚀 결과가 있는 종료 상태 (cancelled는 중단 시점까지의 부분 결과)
+export const isTaskDone = (status) => status === 'completed' || status === 'cancelled'
+
+// 🚀 완료된 작업의 결과 목록 조회 (큰 결과는 task에 요약만 있고 목록은 페이지 단위로 조회)
+export const fetchTaskWithResult = async (task, pageSize = 500) => {
+  const ref = task?.result_ref
+  if (!isTaskDone(task?.status) || !ref) return task
+
+  const items = []
+  let offset = 0
+  while (offset < ref.count) {
+    const response = await apiClient.get(`/api/naver/tasks/${task.task_id}/result`, {
+      params: { offset, limit: pageSize }
+    })
+    items.push(...response.data.items)
+    if (!response.data.has_more || response.data.items.length === 0) break
+    offset += response.data.items.length
+  }
+
+  const result = ref.field ? { ...task.result, [ref.field]: items } : items
+  return { ...task, result }
+}
+
 export default apiClient
 
 
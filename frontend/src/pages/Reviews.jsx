@@ -1,7 +1,7 @@
-import React, { useState, useEffect } from 'react'
+import React, { useState, useEffect, useRef } from 'react'
 import { useNavigate, useSearchParams } from 'react-router-dom'
 import { useQuery } from '@tanstack/react-query'
-import apiClient from '../api/client'
+import apiClient, { openTaskEventStream, fetchTaskWithResult, isTaskDone } from '../api/client'
 import ReviewCard from '../components/ReviewCard'
 import AISettingsModal from '../components/AISettingsModal'
 import { ChevronLeft, Filter, AlertCircle, Loader2, Settings } from 'lucide-react'
@@ -34,6 +34,8 @@ export default function Reviews() {
   const [useAsyncLoading, setUseAsyncLoading] = useState(false)
   const [asyncTaskId, setAsyncTaskId] = useState(null)
   const [asyncProgress, setAsyncProgress] = useState(null)
+  const [useTaskPolling, setUseTaskPolling] = useState(false) // SSE 실패 시 폴링으로 전환
+  const activeTaskRef = useRef(null) // 페이지를 떠날 때 취소할 진행 중 작업
   
   // 🎨 AI Settings Modal
   const [showAISettingsModal, setShowAISettingsModal] = useState(false)
@@ -111,7 +113,7 @@ export default function Reviews() {
   // 🚀 Handle different data structures (including async result)
   let allReviewsData = platform === 'gbp' 
     ? gbpReviewsData 
-    : (asyncProgress?.status === 'completed' && asyncProgress?.result)
+    : (isTaskDone(asyncProgress?.status) && asyncProgress?.result)
       ? asyncProgress.result?.reviews || asyncProgress.result  // 비동기 로딩 완료 시
       : naverReviewsData?.reviews || naverReviewsData  // 동기 로딩
   
@@ -137,7 +139,7 @@ export default function Reviews() {
   
   const totalReviews = platform === 'gbp'
     ? gbpReviewsData?.total_count
-    : (asyncProgress?.status === 'completed' && asyncProgress?.result?.total)
+    : (isTaskDone(asyncProgress?.status) && asyncProgress?.result?.total)
       ? asyncProgress.result.total  // 비동기 완료 시 전체 개수
       : naverReviewsData?.total || (Array.isArray(allReviewsData) ? allReviewsData.length : 0)
   
@@ -223,21 +225,114 @@ export default function Reviews() {
     }
   }
   
-  // 🚀 작업 진행 상황 폴링
+  // 🛑 비동기 로딩 취소 (서버는 지금까지 불러온 리뷰를 결과로 남김)
+  const cancelAsyncLoading = async () => {
+    if (!asyncTaskId) return
+    try {
+      await apiClient.delete(`/api/naver/tasks/${asyncTaskId}`)
+      setAsyncProgress(prev => ({ ...prev, status: 'cancelling' }))
+    } catch (err) {
+      // 409: 이미 끝난 작업 - 완료 이벤트로 처리됨
+      if (err.response?.status !== 409) {
+        console.error('Failed to cancel task:', err)
+      }
+    }
+  }
+  
+  // 🛑 페이지를 떠나면 진행 중인 로딩 취소 (브라우저를 다른 작업에 바로 반환)
+  useEffect(() => {
+    activeTaskRef.current = useAsyncLoading ? asyncTaskId : null
+  }, [asyncTaskId, useAsyncLoading])
+  
+  useEffect(() => {
+    return () => {
+      if (activeTaskRef.current) {
+        apiClient.delete(`/api/naver/tasks/${activeTaskRef.current}`).catch(() => {})
+      }
+    }
+  }, [])
+  
+  // 🚀 작업 진행 상황 실시간 구독 (SSE) - 연결 실패 시 아래 폴링으로 전환
+  useEffect(() => {
+    if (!asyncTaskId || !useAsyncLoading) return
+    if (typeof EventSource === 'undefined') {
+      setUseTaskPolling(true)
+      return
+    }
+    
+    setUseTaskPolling(false)
+    const source = openTaskEventStream(asyncTaskId)
+    let finished = false
+    
+    // 완료/실패 시 결과 포함 최종 상태를 한 번 조회
+    const finish = async () => {
+      finished = true
+      source.close()
+      try {
+        const response = await apiClient.get(`/api/naver/tasks/${asyncTaskId}`)
+        const task = await fetchTaskWithResult(response.data)
+        setAsyncProgress(task)
+        if (isTaskDone(task.status) && task.result) {
+          setUseAsyncLoading(false)
+          setAsyncTaskId(null)
+        }
+      } catch (err) {
+        console.error('Failed to fetch task result:', err)
+        setUseTaskPolling(true)
+      }
+    }
+    
+    source.addEventListener('snapshot', (event) => {
+      const data = JSON.parse(event.data)
+      setAsyncProgress(prev => ({ ...prev, ...data }))
+      if (isTaskDone(data.status) || data.status === 'failed') finish()
+    })
+    
+    source.addEventListener('progress', (event) => {
+      const { queue_position, ...progress } = JSON.parse(event.data)
+      console.log(`📊 Task progress: ${progress.current || 0} - ${progress.message}`)
+      setAsyncProgress(prev => ({
+        ...prev,
+        status: 'processing',
+        queue_position: queue_position ?? null,
+        progress: { ...prev?.progress, ...progress }
+      }))
+    })
+    
+    source.addEventListener('status', (event) => {
+      const data = JSON.parse(event.data)
+      if (isTaskDone(data.status) || data.status === 'failed') {
+        finish()
+      } else {
+        setAsyncProgress(prev => ({ ...prev, status: data.status, queue_position: null }))
+      }
+    })
+    
+    source.onerror = () => {
+      if (finished) return
+      console.warn('⚠️ Task event stream failed - falling back to polling')
+      source.close()
+      setUseTaskPolling(true)
+    }
+    
+    return () => source.close()
+  }, [asyncTaskId, useAsyncLoading])
+  
+  // 🚀 작업 진행 상황 폴링 (SSE를 사용할 수 없을 때만)
   const { data: taskStatus } = useQuery({
     queryKey: ['task-status', asyncTaskId],
     queryFn: async () => {
       if (!asyncTaskId) return null
       
       const response = await apiClient.get(`/api/naver/tasks/${asyncTaskId}`)
-      const task = response.data
+      const task = await fetchTaskWithResult(response.data)
       
       console.log(`📊 Task progress: ${task.progress?.current || 0}/${task.progress?.total || 0} - ${task.status}`)
       
       setAsyncProgress(task)
       
       // 완료되면 폴링 중지하고 결과 표시
-      if (task.status === 'completed' && task.result) {
+      if (isTaskDone(task.status) && task.result) {
         setUseAsyncLoading(false)
         setAsyncTaskId(null)
         // 결과를 캐시에 저장
@@ -246,7 +341,7 @@ export default function Reviews() {
       
       return task
     },
-    enabled: !!asyncTaskId && useAsyncLoading,
+    enabled: !!asyncTaskId && useAsyncLoading && useTaskPolling,
     refetchInterval: 2000, // 2초마다 폴링
     retry: false
   })
@@ -637,7 +732,7 @@ export default function Reviews() {
               </div>
             )}
           </div>
-        ) : asyncProgress && asyncProgress.status !== 'completed' ? (
+        ) : asyncProgress && !isTaskDone(asyncProgress.status) ? (
           /* 🚀 비동기 로딩 진행률 표시 */
           <div className="bg-gradient-to-br from-green-50 to-emerald-50 border-2 border-green-200 rounded-lg p-8">
             <div className="max-w-md mx-auto">
@@ -647,7 +742,9 @@ export default function Reviews() {
                   리뷰 로딩 중...
                 </h3>
                 <p className="text-sm text-gray-600">
-                  {asyncProgress.progress?.message || '준비 중...'}
+                  {asyncProgress.queue_position
+                    ? `대기열 ${asyncProgress.queue_position}번째 - 앞선 작업이 끝나면 시작합니다`
+                    : (asyncProgress.progress?.message || '준비 중...')}
                 </p>
               </div>
               
@@ -674,6 +771,16 @@ export default function Reviews() {
                 <p>타임아웃 걱정 없이 안전하게 로딩 중입니다</p>
                 <p className="mt-1">잠시만 기다려주세요... ☕</p>
               </div>
+              
+              <div className="text-center mt-4">
+                <button
+                  onClick={cancelAsyncLoading}
+                  disabled={asyncProgress.status === 'cancelling'}
+                  className="px-4 py-2 text-sm text-gray-700 bg-white border border-gray-300 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+                >
+                  {asyncProgress.status === 'cancelling' ? '중단하는 중...' : '로딩 중단 (지금까지 불러온 리뷰 보기)'}
+                </button>
+              </div>
             </div>
           </div>
         ) : error ? (